@@ -1,34 +1,64 @@
+import functools
 import os
-from typing import TypedDict, Annotated, Sequence
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional, TypedDict, Annotated, Sequence
 from langchain.agents import create_agent
-from langchain.agents.middleware import PIIMiddleware
-from langchain_chroma import Chroma
 from langchain.tools import tool
 from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
 from langchain_core.vectorstores import VectorStore
 from langchain_core.retrievers import BaseRetriever
-from langchain_ollama import OllamaEmbeddings, ChatOllama
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
-from langchain_core.messages import HumanMessage, AIMessage, BaseMessage
+from langchain_core.messages import HumanMessage, AIMessage, AIMessageChunk, BaseMessage
 import operator
 
 from pydantic import BaseModel, Field
 
+if TYPE_CHECKING:
+    from data.session_store import SessionCheckpointer
+    from knowledge_base.answer_cache import SemanticAnswerCache
+
+from history import HistoryCompactor
+from redaction import PIIRedactionMiddleware, StreamRedactor, redact_value
 from tools import (
+    MAX_TOOL_CONCURRENCY,
     search_flights,
+    search_fare_calendar,
     search_hotels,
     create_booking,
     lookup_booking,
+    find_customer_bookings,
     get_weather_forecast
 )
 
+# Seconds spent in each setup step of the last create_travel_agent call,
+# reported by `python main.py --profile-startup`
+STARTUP_TIMINGS: Dict[str, float] = {}
+
 
 class TravelAgentState(TypedDict):
     """State for the travel booking agent."""
     messages: Annotated[Sequence[BaseMessage], operator.add]
+    # Running summary of messages[:summarized], sent to the model in their place
+    summary: str
+    summarized: int
 
 def load_vector_store(embeddings: Embeddings) -> VectorStore:
-    """Loads the Chroma vector store if it exists."""
+    """Loads the Chroma vector store, or its NumPy export with VECTOR_STORE=numpy."""
+    if os.getenv("VECTOR_STORE", "chroma") == "numpy":
+        from knowledge_base.numpy_store import META_NAME, NumpyVectorStore
+
+        if os.path.exists(os.path.join("chroma_db", META_NAME)):
+            return NumpyVectorStore.load(Path("chroma_db"), embeddings)
+        raise ValueError("Knowledge base not initialized. Run 'python setup_kb.py' first.")
+
+    # chromadb takes most of a second to import, so it is only loaded here
+    from langchain_chroma import Chroma
+
     if os.path.exists("chroma_db"):
         return Chroma(
             persist_directory="./chroma_db",
@@ -37,30 +67,83 @@ def load_vector_store(embeddings: Embeddings) -> VectorStore:
     else:
         raise ValueError("Knowledge base not initialized. Run 'python setup_kb.py' first.")
 
+@functools.lru_cache(maxsize=1)
+def create_embeddings() -> Embeddings:
+    """Creates the embeddings client shared by knowledge base search and the answer cache."""
+    from langchain_ollama import OllamaEmbeddings
+    from knowledge_base.embedding_cache import CachedEmbeddings
+
+    model_name = os.getenv("MODEL", "llama3.2")
+    # Repeated questions skip the embedding call, the slowest step of a search
+    cache_path = os.getenv("EMBEDDING_CACHE_PATH")
+    return CachedEmbeddings(
+        OllamaEmbeddings(model=model_name),
+        model=model_name,
+        max_entries=int(os.getenv("EMBEDDING_CACHE_SIZE", "4096")),
+        path=Path(cache_path) if cache_path else None,
+    )
+
 def create_knowledge_base_retriever() -> BaseRetriever:
     """Initializes embeddings and loads the vector store once."""
-    model_name = os.getenv("MODEL", "llama3.2")
-    embeddings = OllamaEmbeddings(model=model_name)
-    vectorstore = load_vector_store(embeddings)
+    vectorstore = load_vector_store(create_embeddings())
 
-    # Return 3 most similar docs
-    return vectorstore.as_retriever(search_kwargs={"k": 3})
+    # Return 3 most relevant docs, from keyword and vector search together
+    # when setup_kb has built the keyword index
+    from knowledge_base.lexical import LEXICAL_INDEX_NAME, BM25Index, HybridRetriever
+    index = BM25Index.load(Path("chroma_db") / LEXICAL_INDEX_NAME)
+    if index is None:
+        return vectorstore.as_retriever(search_kwargs={"k": 3})
+    return HybridRetriever(index=index, vector_retriever=vectorstore.as_retriever(search_kwargs={"k": 10}), k=3)
 
-class KnowledgeBaseInput(BaseModel):
-    query: str = Field(...)
+def create_chat_model() -> BaseChatModel:
+    """Creates the Ollama chat model client."""
+    from langchain_ollama import ChatOllama
 
-def create_travel_agent():
-    """Create the travel booking agent with LangChain."""
     model_name = os.getenv("MODEL", "llama3.2")
     temperature = float(os.getenv("MODEL_TEMPERATURE", "0"))
 
-    model = ChatOllama(
+    return ChatOllama(
         model=model_name,
         temperature=temperature,
         verbose=False,
     )
 
-    retriever = create_knowledge_base_retriever()
+def _timed(label: str, func):
+    start = time.perf_counter()
+    try:
+        return func()
+    finally:
+        STARTUP_TIMINGS[label] = time.perf_counter() - start
+
+class KnowledgeBaseInput(BaseModel):
+    query: str = Field(...)
+
+def format_documents(docs) -> str:
+    """Formats retrieved documents as the knowledge base tool's answer."""
+    results = []
+    for doc in docs:
+        results.append(f"Source: {doc.metadata.get('source', 'unknown')}\n{doc.page_content}\n")
+
+    return "\n---\n".join(results)
+
+def create_travel_agent(model: BaseChatModel = None, retriever: BaseRetriever = None):
+    """
+    Create the travel booking agent with LangChain.
+
+    The Ollama model and the Chroma retriever are created unless given.
+    """
+    # The model client and the vector store are independent, so their
+    # imports and setup overlap instead of running back to back
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        model_future = (
+            executor.submit(_timed, "model client", create_chat_model) if model is None else None
+        )
+        retriever_future = (
+            executor.submit(_timed, "knowledge base retriever", create_knowledge_base_retriever)
+            if retriever is None else None
+        )
+        model = model_future.result() if model_future else model
+        retriever = retriever_future.result() if retriever_future else retriever
 
     @tool("search_knowledge_base", args_schema=KnowledgeBaseInput)
     def search_knowledge_base(query: str) -> str:
@@ -73,19 +156,20 @@ def create_travel_agent():
         Returns:
             Relevant information from the knowledge base
         """
-        docs = retriever.invoke(query)
+        return format_documents(retriever.invoke(query))
 
-        results = []
-        for doc in docs:
-            results.append(f"Source: {doc.metadata.get('source', 'unknown')}\n{doc.page_content}\n")
+    async def asearch_knowledge_base(query: str) -> str:
+        return format_documents(await retriever.ainvoke(query))
 
-        return "\n---\n".join(results)
+    search_knowledge_base.coroutine = asearch_knowledge_base
 
     tools = [
         search_flights,
+        search_fare_calendar,
         search_hotels,
         create_booking,
         lookup_booking,
+        find_customer_bookings,
         get_weather_forecast,
         search_knowledge_base,
     ]
@@ -103,6 +187,8 @@ Guidelines:
 - Present options clearly with prices and key details
 - Confirm all details before creating a booking
 - Use the weather forecast tool when relevant
+- When a customer asks about all their bookings, ask for their full name and one of their booking IDs, then find them with find_customer_bookings
+- When the customer's dates are flexible, use the fare calendar to compare nearby days in one search
 - Redact sensitive information when displaying booking details
 
 When a customer wants to book:
@@ -111,90 +197,270 @@ When a customer wants to book:
 3. Once they confirm, create the booking
 4. Provide the booking confirmation"""
 
+    start = time.perf_counter()
     agent = create_agent(
         model=model,
         tools=tools,
         system_prompt=system_prompt,
-        middleware=[
-            PIIMiddleware(
-                "email",
-                strategy="redact",
-                apply_to_input=True,
-                apply_to_output=True
-            ),
-            PIIMiddleware(
-                "phone_number",
-                detector=r"(?:\+?\d{1,3}[\s.-]?)?(?:\(?\d{2,4}\)?[\s.-]?)?\d{3,4}[\s.-]?\d{4}",
-                strategy="redact",
-                apply_to_input=True,
-                apply_to_output=True
-            ),
-        ]
+        # The outer graph checkpoints each turn; the agent loop inside one
+        # turn is not resumed on its own, so it writes no checkpoints
+        checkpointer=False,
+        middleware=[PIIRedactionMiddleware()],
     )
+    STARTUP_TIMINGS["agent graph"] = time.perf_counter() - start
 
     return agent
 
 
-def create_travel_graph():
+def create_answer_cache() -> Optional["SemanticAnswerCache"]:
+    """Creates the semantic answer cache unless ANSWER_CACHE=false."""
+    if os.getenv("ANSWER_CACHE", "true") != "true":
+        return None
+    from knowledge_base.answer_cache import SemanticAnswerCache
+
+    return SemanticAnswerCache(
+        create_embeddings(),
+        threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95")),
+        ttl=float(os.getenv("ANSWER_CACHE_TTL", "86400")),
+    )
+
+def create_history_compactor(model: BaseChatModel) -> HistoryCompactor:
+    """Creates the history compactor, summarizing with the given model."""
+    return HistoryCompactor(
+        model,
+        token_budget=int(os.getenv("HISTORY_TOKEN_BUDGET", "2000")),
+        recent_turns=int(os.getenv("HISTORY_RECENT_TURNS", "3")),
+    )
+
+def create_checkpointer() -> "SessionCheckpointer":
+    """Creates the SQLite checkpointer that keeps conversations across restarts."""
+    from data.session_store import SESSIONS_PATH, SessionCheckpointer
+
+    return SessionCheckpointer(
+        SESSIONS_PATH,
+        max_sessions=int(os.getenv("SESSION_CACHE_SIZE", "1000")),
+    )
+
+def create_travel_graph(
+    model: BaseChatModel = None,
+    retriever: BaseRetriever = None,
+    answer_cache=None,
+    compactor: HistoryCompactor = None,
+    checkpointer=None,
+):
     """
     Create LangGraph workflow for travel booking.
 
     Graph structure:
-    [Entry] → [Agent] → [End]
+    [Entry] → [Compact] → [Agent] → [End]
+
+    The compact node keeps the history sent to the model within
+    HISTORY_TOKEN_BUDGET (see HistoryCompactor); the full conversation
+    stays in the state.
+
+    The graph runs with invoke/stream as well as ainvoke/astream. Either
+    way, the tool calls of one model message execute concurrently, at most
+    MAX_TOOL_CONCURRENCY at a time.
+
+    With an answer_cache (see create_answer_cache) a repeated knowledge
+    base question is answered without running the agent.
+
+    With a checkpointer (see create_checkpointer) the conversation is kept
+    per thread_id in config["configurable"], and each run only needs the
+    new message.
     """
 
-    agent = create_travel_agent()
+    agent = create_travel_agent(model, retriever)
+    agent_config = {"max_concurrency": MAX_TOOL_CONCURRENCY}
+    if compactor is None:
+        compactor = create_history_compactor(model or create_chat_model())
 
     workflow = StateGraph(TravelAgentState)
 
+    def compact_node(state: TravelAgentState):
+        return compactor.compact(state["messages"], state.get("summary", ""), state.get("summarized", 0))
+
+    async def acompact_node(state: TravelAgentState):
+        return await compactor.acompact(state["messages"], state.get("summary", ""), state.get("summarized", 0))
+
     def agent_node(state: TravelAgentState):
         """
         Node that runs the agent.
         """
         messages = state["messages"]
-        initial_count = len(messages)
 
-        response = agent.invoke({"messages": messages})
+        vector = None
+        if answer_cache is not None:
+            cached, vector = answer_cache.lookup(messages)
+            if cached is not None:
+                return {"messages": [cached]}
+
+        history = compactor.view(messages, state.get("summary", ""), state.get("summarized", 0))
+        response = agent.invoke({"messages": history}, agent_config)
 
-        new_messages = response["messages"][initial_count:]
+        new_messages = response["messages"][len(history):]
+        if answer_cache is not None:
+            answer_cache.store(messages, new_messages, vector)
         return {"messages": new_messages}
 
-    workflow.add_node("agent", agent_node)
+    async def aagent_node(state: TravelAgentState):
+        messages = state["messages"]
 
-    workflow.set_entry_point("agent")
+        vector = None
+        if answer_cache is not None:
+            cached, vector = await answer_cache.alookup(messages)
+            if cached is not None:
+                return {"messages": [cached]}
 
+        history = compactor.view(messages, state.get("summary", ""), state.get("summarized", 0))
+        response = await agent.ainvoke({"messages": history}, agent_config)
+
+        new_messages = response["messages"][len(history):]
+        if answer_cache is not None:
+            answer_cache.store(messages, new_messages, vector)
+        return {"messages": new_messages}
+
+    workflow.add_node("compact", RunnableLambda(compact_node, afunc=acompact_node, name="compact"))
+    workflow.add_node("agent", RunnableLambda(agent_node, afunc=aagent_node, name="agent"))
+
+    workflow.set_entry_point("compact")
+
+    workflow.add_edge("compact", "agent")
     workflow.add_edge("agent", END)
 
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
+
 
+def _stream_events(namespace, mode, chunk, streams: dict, new_messages: list, updates: dict):
+    """
+    Translate one (namespace, mode, chunk) stream item into CLI events.
 
-def run_agent_streaming(graph, query: str, state: TravelAgentState):
+    Tokens are the model's raw output, so they pass through a
+    StreamRedactor per message (streams, by message ID) before they are
+    shown; tool call arguments are redacted too.
+    """
+    if mode == "messages":
+        message, metadata = chunk
+        if (
+            isinstance(message, AIMessageChunk)
+            and metadata.get("langgraph_node") == "model"
+            and isinstance(message.content, str)
+            and message.content
+        ):
+            redactor = streams.setdefault(message.id, StreamRedactor())
+            content = redactor.feed(message.content)
+            if content:
+                yield {
+                    "type": "token",
+                    "content": content
+                }
+        return
+
+    for node_name, node_output in chunk.items():
+        if not node_output:
+            continue
+
+        if not namespace:
+            # Outer graph update: the messages the agent node appends to
+            # the conversation state, and the compact node's summary.
+            updates.update({key: value for key, value in node_output.items() if key != "messages"})
+            if node_name == "agent":
+                new_messages.extend(node_output["messages"])
+                for msg in node_output["messages"]:
+                    # Answered from the answer cache, so nothing was streamed
+                    if isinstance(msg, AIMessage) and "answer_cache" in msg.response_metadata:
+                        yield {
+                            "type": "response",
+                            "content": msg.content,
+                            "cached": True
+                        }
+            continue
+
+        if node_name != "model" or "messages" not in node_output:
+            continue
+
+        for msg in node_output["messages"]:
+            if not isinstance(msg, AIMessage):
+                continue
+            redactor = streams.get(msg.id)
+            if redactor is not None:
+                # The message is complete: emit the tail held back for redaction
+                content = redactor.flush()
+                if content:
+                    yield {
+                        "type": "token",
+                        "content": content
+                    }
+            if msg.tool_calls:
+                for tool_call in msg.tool_calls:
+                    yield {
+                        "type": "tool_call",
+                        "tool": tool_call.get("name", "unknown"),
+                        "args": redact_value(tool_call.get("args", {}))
+                    }
+            elif msg.content and redactor is None:
+                # The model did not stream this message, emit it whole
+                yield {
+                    "type": "response",
+                    "content": msg.content
+                }
+
+
+def _graph_input(graph, query: str, state: TravelAgentState) -> dict:
+    # A stable ID lets the PII redaction cache recognize the message in later turns
+    state["messages"].append(HumanMessage(content=query, id=str(uuid.uuid4())))
+    # A checkpointed graph already holds the conversation
+    if graph.checkpointer:
+        return {"messages": state["messages"][-1:]}
+    return state
+
+def run_agent_streaming(graph, query: str, state: TravelAgentState, config: Optional[dict] = None):
     """
     Run the agent with streaming output and update state.
-    
+
+    The graph is streamed exactly once. Token chunks from the inner agent's
+    model calls and its tool-call decisions are yielded as they happen, and
+    the final state is assembled from the outer graph's "updates" stream
+    instead of re-invoking the graph. config (e.g. {"configurable":
+    {"thread_id": ...}}) is passed to the graph and reaches the tools; a
+    checkpointed graph also loads and saves the conversation by it.
+
     Returns a generator of events and updates the state in-place.
     """
-    state["messages"].append(HumanMessage(content=query))
-
-    for event in graph.stream(state, stream_mode="updates"):
-        for node_name, node_output in event.items():
-            if node_name == "agent":
-                if "messages" in node_output:
-                    messages = node_output["messages"]
-                    for msg in messages:
-                        if isinstance(msg, AIMessage):
-                            if hasattr(msg, "tool_calls") and msg.tool_calls:
-                                for tool_call in msg.tool_calls:
-                                    yield {
-                                        "type": "tool_call",
-                                        "tool": tool_call.get("name", "unknown"),
-                                        "args": tool_call.get("args", {})
-                                    }
-                            elif msg.content:
-                                yield {
-                                    "type": "response",
-                                    "content": msg.content
-                                }
-
-    final_state = graph.invoke(state)
-    state["messages"] = final_state["messages"]
\ No newline at end of file
+    graph_input = _graph_input(graph, query, state)
+
+    new_messages = []
+    updates = {}
+    streams = {}
+
+    for namespace, mode, chunk in graph.stream(
+        graph_input,
+        config,
+        stream_mode=["messages", "updates"],
+        subgraphs=True,
+    ):
+        yield from _stream_events(namespace, mode, chunk, streams, new_messages, updates)
+
+    state.update(updates)
+    state["messages"] = list(state["messages"]) + new_messages
+
+
+async def arun_agent_streaming(graph, query: str, state: TravelAgentState, config: Optional[dict] = None):
+    """Async version of run_agent_streaming, driven by graph.astream."""
+    graph_input = _graph_input(graph, query, state)
+
+    new_messages = []
+    updates = {}
+    streams = {}
+
+    async for namespace, mode, chunk in graph.astream(
+        graph_input,
+        config,
+        stream_mode=["messages", "updates"],
+        subgraphs=True,
+    ):
+        for event in _stream_events(namespace, mode, chunk, streams, new_messages, updates):
+            yield event
+
+    state.update(updates)
+    state["messages"] = list(state["messages"]) + new_messages
@@ -0,0 +1,84 @@
+"""
+Benchmark repeated knowledge base questions with and without the answer cache.
+
+Usage:
+    python -m benchmarks.answer_cache --turns 100 --model-latency 0.5
+
+A scripted chat model that takes `model-latency` seconds per call searches
+the knowledge base, then answers. Each turn is the first message of a new
+conversation, drawn from the same skewed mix of FAQ questions as the
+embedding cache benchmark; questions about the customer's own bookings are
+never served from the cache.
+"""
+import argparse
+import time
+from typing import Any
+
+from langchain_core.documents import Document
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.retrievers import BaseRetriever
+
+from agent import create_travel_graph
+from benchmarks.embedding_cache import SlowEmbeddings, queries
+from knowledge_base.answer_cache import SemanticAnswerCache
+
+
+class SearchingChatModel(BaseChatModel):
+    """Searches the knowledge base for the question, then answers."""
+    latency: float
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "SearchingChatModel":
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.calls += 1
+        time.sleep(self.latency)
+        if isinstance(messages[-1], HumanMessage):
+            call = {"name": "search_knowledge_base", "args": {"query": messages[-1].content}, "id": "call_0"}
+            message = AIMessage(content="", tool_calls=[call])
+        else:
+            message = AIMessage(content=f"According to our policies: {messages[-1].content[:80]}")
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class StaticRetriever(BaseRetriever):
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        return [Document(page_content=f"Policy text for: {query.strip()}", metadata={"source": "faq.md"})]
+
+
+def run(label: str, graph, model: SearchingChatModel, turns):
+    model.calls = 0
+    start = time.perf_counter()
+    for question in turns:
+        graph.invoke({"messages": [HumanMessage(content=question)]})
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {len(turns)} turns in {elapsed:.2f}s ({elapsed / len(turns) * 1000:.0f}ms each), "
+          f"{model.calls} model calls")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer cache benchmark")
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--model-latency", type=float, default=0.5, help="Chat model call latency in seconds")
+    parser.add_argument("--embedding-latency", type=float, default=0.05, help="Embedding call latency in seconds")
+    args = parser.parse_args()
+
+    turns = queries(args.turns)
+    model = SearchingChatModel(latency=args.model_latency)
+    retriever = StaticRetriever()
+    run("uncached:", create_travel_graph(model, retriever), model, turns)
+
+    cache = SemanticAnswerCache(SlowEmbeddings(args.embedding_latency), version=lambda: "benchmark")
+    run("cached:", create_travel_graph(model, retriever, answer_cache=cache), model, turns)
+    print(f"{'':<10} {cache.cache_stats()}")
+
+
+if __name__ == "__main__":
+    main()
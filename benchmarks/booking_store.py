@@ -0,0 +1,132 @@
+"""
+Benchmark the SQLite booking store at millions of bookings.
+
+Usage:
+    python -m benchmarks.booking_store --bookings 1000000 --writers 16 --processes 4
+
+Measures bulk load, concurrent single-booking writes from threads (group
+commit vs. one transaction per write) and from several processes, and
+lookups by booking ID and by customer.
+"""
+import argparse
+import multiprocessing
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from data.booking_store import INSERT_SQL, BookingStore, _row
+
+
+def synthetic_booking(i: int, customers: int, start: datetime, prefix: str = "BK") -> dict:
+    customer = i % customers
+    return {
+        "booking_id": f"{prefix}{i:010d}",
+        "booking_type": ("flight", "hotel", "package")[i % 3],
+        "items": {"flight_id": f"FL{i % 5000:04d}"},
+        "customer_name": f"Customer {customer}",
+        "customer_email": f"customer{customer}@example.com",
+        "total_price": float(100 + i % 1900),
+        "status": "confirmed",
+        "created_at": (start + timedelta(seconds=i)).isoformat(),
+    }
+
+
+def timed_threads(count: int, target) -> float:
+    threads = [threading.Thread(target=target, args=(n,)) for n in range(count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def process_writer(path: str, worker: int, writes: int, customers: int):
+    store = BookingStore(Path(path))
+    start = datetime(2025, 6, 1)
+    for i in range(writes):
+        store.add(synthetic_booking(i, customers, start, prefix=f"PR{worker}-"))
+    store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Booking store benchmark")
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument("--writers", type=int, default=16, help="Concurrent writer threads")
+    parser.add_argument("--writes", type=int, default=200, help="Bookings written by each writer")
+    parser.add_argument("--processes", type=int, default=4, help="Concurrent writer processes")
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--path", type=Path, help="Database file (default: a temporary directory)")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    path = args.path or Path(tmp.name) / "bookings.sqlite"
+    customers = max(1, args.bookings // 5)
+    epoch = datetime(2024, 1, 1)
+    store = BookingStore(path)
+
+    start = time.perf_counter()
+    for chunk in range(0, args.bookings, 10_000):
+        store.add_many(synthetic_booking(i, customers, epoch) for i in range(chunk, min(chunk + 10_000, args.bookings)))
+    elapsed = time.perf_counter() - start
+    print(f"bulk load:           {args.bookings:,} bookings in {elapsed:.1f}s ({args.bookings / elapsed:,.0f}/s)")
+
+    def group_commit_writer(n):
+        for i in range(args.writes):
+            store.add(synthetic_booking(i, customers, epoch, prefix=f"GC{n}-"))
+
+    elapsed = timed_threads(args.writers, group_commit_writer)
+    total = args.writers * args.writes
+    print(f"group commit:        {total:,} writes from {args.writers} threads in {elapsed:.2f}s ({total / elapsed:,.0f}/s)")
+
+    def naive_writer(n):
+        conn = sqlite3.connect(str(path), timeout=60)
+        conn.execute("PRAGMA synchronous=FULL")
+        for i in range(args.writes):
+            with conn:
+                conn.execute(INSERT_SQL, _row(synthetic_booking(i, customers, epoch, prefix=f"TX{n}-")))
+        conn.close()
+
+    elapsed = timed_threads(args.writers, naive_writer)
+    print(f"commit per write:    {total:,} writes from {args.writers} threads in {elapsed:.2f}s ({total / elapsed:,.0f}/s)")
+
+    processes = [
+        multiprocessing.Process(target=process_writer, args=(str(path), n, args.writes, customers))
+        for n in range(args.processes)
+    ]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+    written = store._reader().execute("SELECT COUNT(*) FROM bookings WHERE booking_id LIKE 'PR%'").fetchone()[0]
+    print(f"multi-process:       {written:,}/{args.processes * args.writes:,} writes from {args.processes} processes "
+          f"in {elapsed:.2f}s")
+
+    rng = random.Random(0)
+    for label, lookup in (
+        ("lookup by ID", lambda: store.get(f"BK{rng.randrange(args.bookings):010d}")),
+        ("lookup by customer", lambda: store.find_by_customer(f"customer{rng.randrange(customers)}@example.com")),
+        ("lookup by name", lambda: store.find_by_customer(f"Customer {rng.randrange(customers)}")),
+    ):
+        timings = np.empty(args.lookups)
+        for n in range(args.lookups):
+            start = time.perf_counter()
+            lookup()
+            timings[n] = time.perf_counter() - start
+        p50, p99 = np.percentile(timings, [50, 99]) * 1e6
+        print(f"{label + ':':<20} {args.lookups / timings.sum():,.0f}/s, p50 {p50:.0f}µs, p99 {p99:.0f}µs")
+
+    store.close()
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark knowledge base searches with and without the embedding cache.
+
+Usage:
+    python -m benchmarks.embedding_cache --searches 300 --latency 0.05
+
+The knowledge base is indexed into a temporary Chroma collection with a
+stand-in embedding model that takes `latency` seconds per call (about what
+a local Ollama model takes). Searches replay a skewed mix of common
+questions, typed with varying case and spacing. A second cache opened on
+the same file shows the disk tier after a restart.
+"""
+import argparse
+import hashlib
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from knowledge_base.embedding_cache import CachedEmbeddings
+
+QUESTIONS = [
+    "What is the refund policy?",
+    "Can I cancel my flight within 24 hours?",
+    "How much baggage can I bring?",
+    "Do I need a visa for Japan?",
+    "What are the check-in times for hotels?",
+    "Can I change the name on my booking?",
+    "Is travel insurance included?",
+    "What is the best time to visit Paris?",
+    "How do I request a refund for a cancelled hotel?",
+    "Are pets allowed on flights?",
+    "What documents do I need for international travel?",
+    "Can I get a refund if my flight is delayed?",
+]
+
+
+class SlowEmbeddings(Embeddings):
+    """Deterministic pseudo-embeddings that take `latency` seconds per call."""
+
+    def __init__(self, latency: float, dimensions: int = 256):
+        self.latency = latency
+        self.dimensions = dimensions
+        self.calls = 0
+
+    def _vector(self, text: str) -> List[float]:
+        digest = hashlib.sha256(text.encode()).digest()
+        rng = random.Random(digest)
+        return [rng.uniform(-1, 1) for _ in range(self.dimensions)]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        time.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.calls += 1
+        time.sleep(self.latency)
+        return self._vector(text.lower().strip())
+
+
+def queries(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(QUESTIONS))]
+    typed = []
+    for question in rng.choices(QUESTIONS, weights, k=count):
+        if rng.random() < 0.3:
+            question = question.lower()
+        if rng.random() < 0.3:
+            question = f"  {question.replace(' ', '  ')} "
+        typed.append(question)
+    return typed
+
+
+def run(label: str, store: Chroma, searches: List[str]) -> float:
+    start = time.perf_counter()
+    for query in searches:
+        store.similarity_search(query, k=3)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {len(searches)} searches in {elapsed:.2f}s ({elapsed / len(searches) * 1000:.1f}ms each)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding cache benchmark")
+    parser.add_argument("--searches", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.05, help="Embedding call latency in seconds")
+    args = parser.parse_args()
+
+    kb_dir = Path(__file__).resolve().parent.parent / "knowledge_base"
+    documents = [
+        Document(page_content=chunk, metadata={"source": path.name})
+        for path in sorted(kb_dir.glob("*.md"))
+        for chunk in path.read_text(encoding="utf-8").split("\n\n") if chunk.strip()
+    ]
+    searches = queries(args.searches)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model = SlowEmbeddings(args.latency)
+        store = Chroma.from_documents(documents, model, persist_directory=str(Path(tmp) / "chroma"))
+        run("uncached:", store, searches)
+
+        cached = CachedEmbeddings(model, model="slow", path=Path(tmp) / "embeddings.sqlite")
+        store._embedding_function = cached
+        model.calls = 0
+        run("cached:", store, searches)
+        print(f"{'':<22} {model.calls} embedding calls, {cached.cache_stats()}")
+
+        restarted = CachedEmbeddings(model, model="slow", path=Path(tmp) / "embeddings.sqlite")
+        store._embedding_function = restarted
+        model.calls = 0
+        run("after restart (disk):", store, searches)
+        print(f"{'':<22} {model.calls} embedding calls, {restarted.cache_stats()}")
+
+
+if __name__ == "__main__":
+    main()
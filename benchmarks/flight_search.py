@@ -0,0 +1,105 @@
+"""
+Benchmark flight lookups against a large synthetic schedule.
+
+Usage:
+    python -m benchmarks.flight_search --rows 1000000
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from data.flight_index import FlightIndex
+
+
+def synthetic_flights_df(rows: int, airports: int, days: int = 90, seed: int = 0) -> pd.DataFrame:
+    """Build a dated flights table with the same columns as generate_flights_df."""
+    rng = np.random.default_rng(seed)
+    dates = np.datetime64("2025-01-01") + np.arange(days)
+    codes = np.array([f"A{i:03d}" for i in range(airports)])
+    origin = rng.integers(0, airports, rows)
+    destination = (origin + rng.integers(1, airports, rows)) % airports
+    dep_minutes = rng.integers(0, 24 * 60, rows)
+    duration = rng.integers(60, 14 * 60, rows)
+    arr_minutes = (dep_minutes + duration) % (24 * 60)
+
+    return pd.DataFrame({
+        "flight_id": [f"FL{i:07d}" for i in range(rows)],
+        "airline": rng.choice(["Delta", "United", "American", "British Airways", "Air France"], rows),
+        "origin": codes[origin],
+        "destination": codes[destination],
+        "departure_date": dates.astype(str)[rng.integers(0, days, rows)],
+        "departure_time": [f"{m // 60:02d}:{m % 60:02d}" for m in dep_minutes],
+        "arrival_time": [f"{m // 60:02d}:{m % 60:02d}" for m in arr_minutes],
+        "duration": [f"{d // 60}h {d % 60}m" for d in duration],
+        "price": rng.integers(80, 1500, rows),
+        "stops": rng.integers(0, 2, rows),
+        "class": "Economy",
+        "seats": 180,
+    })
+
+
+def full_scan(df: pd.DataFrame, origin: str, destination: str, departure_date: str) -> list:
+    """The original search_flights filter, for comparison."""
+    rows = df[
+        (df["origin"].str.upper() == origin.upper()) &
+        (df["destination"].str.upper() == destination.upper()) &
+        (df["departure_date"] == departure_date)
+    ]
+    return rows.to_dict("records")
+
+
+def report(label: str, latencies: list, extra: str = ""):
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(f"{label}: p50={p50:.3f}ms p99={p99:.3f}ms {extra}".rstrip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flight search benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--airports", type=int, default=100)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--scan-queries", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Generating {args.rows:,} flights over {args.airports} airports...")
+    df = synthetic_flights_df(args.rows, args.airports, args.days)
+
+    start = time.perf_counter()
+    index = FlightIndex(df)
+    print(f"Index build: {time.perf_counter() - start:.2f}s ({len(index.routes):,} routes)")
+
+    routes = list(index.routes)
+    dates = df["departure_date"].unique()
+    rng = random.Random(1)
+    queries = [(*rng.choice(routes), rng.choice(dates)) for _ in range(args.queries)]
+
+    found = 0
+    latencies = []
+    for origin, destination, departure_date in queries:
+        start = time.perf_counter()
+        found += len(index.search(origin.lower(), destination, departure_date))
+        latencies.append(time.perf_counter() - start)
+    report("Dated lookup", latencies, f"{found / len(queries):.1f} flights/query")
+
+    latencies = []
+    for origin, destination, departure_date in queries[:args.queries // 10]:
+        start = time.perf_counter()
+        index.fare_calendar(origin, destination, departure_date, 7)
+        latencies.append(time.perf_counter() - start)
+    report("Fare calendar (+/-7 days)", latencies)
+
+    start = time.perf_counter()
+    for origin, destination, departure_date in queries[:args.scan_queries]:
+        full_scan(df, origin, destination, departure_date)
+    scan_ms = (time.perf_counter() - start) / args.scan_queries * 1000
+    print(f"Full scan: mean={scan_ms:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
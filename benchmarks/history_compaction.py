@@ -0,0 +1,111 @@
+"""
+Benchmark per-turn latency over a long session with and without history compaction.
+
+Usage:
+    python -m benchmarks.history_compaction --turns 100 --prompt-tps 500
+
+A scripted chat model searches flights, hotels or the knowledge base each
+turn and then answers; every fifth turn is small talk without tools. The
+real tools produce the outputs. Local models spend most of a call
+processing the prompt, so each model call is charged prompt tokens /
+`prompt-tps` seconds of simulated time on top of the measured graph time.
+Summarization calls are charged the same way.
+"""
+import argparse
+import time
+from datetime import date, timedelta
+from statistics import mean
+from typing import Any, List
+
+from langchain_core.documents import Document
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.retrievers import BaseRetriever
+
+from agent import create_travel_graph, run_agent_streaming
+from history import SUMMARY_PROMPT, HistoryCompactor, history_tokens
+
+# Tokens of the tool schemas sent with every agent call (the messages include the system prompt)
+TOOL_SCHEMA_TOKENS = 600
+
+
+class SessionChatModel(BaseChatModel):
+    """Calls one tool per customer message, then answers; summarizes when asked."""
+    prompt_tps: float
+    simulated: float = 0.0
+    prompt_tokens: List[int] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "SessionChatModel":
+        return self
+
+    def _reply(self, messages) -> AIMessage:
+        if isinstance(messages[0], SystemMessage) and messages[0].content == SUMMARY_PROMPT:
+            return AIMessage(content="The customer is planning a trip from JFK to London and Paris. " * 8)
+        last = messages[-1]
+        if not isinstance(last, HumanMessage):
+            return AIMessage(content="Here are the best options I found. " * 6)
+        turn = int(last.content.split()[-1])
+        day = date.today() + timedelta(days=14 + turn % 30)
+        calls = [
+            ("search_flights", {"origin": "JFK", "destination": "LHR", "departure_date": day.isoformat()}),
+            ("search_hotels", {"city": "Paris", "check_in": day.isoformat(),
+                               "check_out": (day + timedelta(days=3)).isoformat()}),
+            ("search_knowledge_base", {"query": "baggage allowance"}),
+            ("search_flights", {"origin": "LHR", "destination": "CDG", "departure_date": day.isoformat()}),
+        ]
+        if turn % 5 == 4:
+            return AIMessage(content="Happy to help with anything else for your trip.")
+        name, args = calls[turn % 5]
+        return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": f"call_{turn}"}])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        tokens = history_tokens(messages) + TOOL_SCHEMA_TOKENS
+        self.prompt_tokens.append(tokens)
+        self.simulated += tokens / self.prompt_tps
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+
+class StaticRetriever(BaseRetriever):
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        return [Document(page_content="Economy fares include one 23kg checked bag. " * 10, metadata={"source": "faq.md"})]
+
+
+def session(label: str, budget: int, recent_turns: int, args) -> List[float]:
+    model = SessionChatModel(prompt_tps=args.prompt_tps, prompt_tokens=[])
+    compactor = HistoryCompactor(model, token_budget=budget, recent_turns=recent_turns)
+    graph = create_travel_graph(model, StaticRetriever(), compactor=compactor)
+    state = {"messages": []}
+    latencies = []
+    for turn in range(args.turns):
+        start, simulated = time.perf_counter(), model.simulated
+        for _ in run_agent_streaming(graph, f"Show me more options, request {turn}", state):
+            pass
+        latencies.append(time.perf_counter() - start + model.simulated - simulated)
+    windows = [(0, 10), (args.turns // 2 - 5, args.turns // 2 + 5), (args.turns - 10, args.turns)]
+    print(f"{label:<11} " + "  ".join(
+        f"turns {begin + 1}-{end}: {mean(latencies[begin:end]) * 1000:6.0f}ms" for begin, end in windows
+    ) + f"  max prompt {max(model.prompt_tokens):,} tokens, {compactor.stats['summaries']} summaries")
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="History compaction benchmark")
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--prompt-tps", type=float, default=500, help="Simulated prompt tokens processed per second")
+    parser.add_argument("--budget", type=int, default=2000, help="History token budget")
+    parser.add_argument("--recent-turns", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{args.turns}-turn session, mean turn latency (measured + {args.prompt_tps:.0f} prompt tokens/s simulated):")
+    # Without a budget or a window the whole history is sent verbatim
+    session("full:", 10 ** 9, 10 ** 9, args)
+    session("compacted:", args.budget, args.recent_turns, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark hybrid (BM25 + vector) retrieval against vector-only search.
+
+Usage:
+    python -m benchmarks.hybrid_retrieval --latency 0.05
+
+Indexes the real knowledge base with a stand-in embedding model that takes
+`latency` seconds per call, then runs keyword-style and natural-language
+questions through the vector retriever and the hybrid retriever. Reports
+latency, how many queries took the keyword fast path, and whether the
+expected document was among the keyword results. Broad one-word queries
+match many chunks about equally and must not take the fast path.
+"""
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+from pathlib import Path
+
+from langchain_chroma import Chroma
+
+from benchmarks.embedding_cache import SlowEmbeddings
+from knowledge_base.lexical import LEXICAL_INDEX_NAME, BM25Index, HybridRetriever
+from knowledge_base.setup_kb import setup_knowledge_base
+
+# (query, document expected among the results)
+QUERIES = [
+    ("refund policy", "refund_policy.md"),
+    ("visa Japan", "destinations.md"),
+    ("baggage allowance", "travel_policies.md"),
+    ("cancellation fee", "travel_policies.md"),
+    ("travel insurance", "travel_policies.md"),
+    ("seat selection", "faq.md"),
+    ("best time to visit Tokyo", "destinations.md"),
+    ("Can I get my money back if I cancel a week before departure?", "refund_policy.md"),
+    ("What happens if my flight is delayed for a long time?", "faq.md"),
+    ("Which European cities are good for a first trip?", "destinations.md"),
+    ("refund", "refund_policy.md"),
+    ("travel", "travel_policies.md"),
+    ("booking", "faq.md"),
+    ("hotel", "faq.md"),
+]
+BROAD = {"refund", "travel", "booking", "hotel"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hybrid retrieval benchmark")
+    parser.add_argument("--latency", type=float, default=0.05, help="Embedding call latency in seconds")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "chroma_db"
+        embeddings = SlowEmbeddings(args.latency)
+        with contextlib.redirect_stdout(io.StringIO()):
+            setup_knowledge_base(persist_directory=db, embeddings=embeddings)
+        vectorstore = Chroma(persist_directory=str(db), embedding_function=embeddings)
+        index = BM25Index.load(db / LEXICAL_INDEX_NAME)
+        retrievers = {
+            "vector only": vectorstore.as_retriever(search_kwargs={"k": 3}),
+            "hybrid": HybridRetriever(index=index, vector_retriever=vectorstore.as_retriever(search_kwargs={"k": 10})),
+        }
+
+        for label, retriever in retrievers.items():
+            embeddings.calls = 0
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                for query, _ in QUERIES:
+                    retriever.invoke(query)
+            elapsed = time.perf_counter() - start
+            searches = args.rounds * len(QUERIES)
+            print(f"{label:<12} {elapsed / searches * 1000:6.1f}ms per search, "
+                  f"{embeddings.calls / searches:.0%} embedded")
+
+        hybrid = retrievers["hybrid"]
+        print(f"fast path: {hybrid.stats['lexical']} of {sum(hybrid.stats.values())} searches skipped the embedding")
+        broad_fast = []
+        for query, expected in QUERIES:
+            hits, confident = hybrid._lexical(query)
+            found = any(doc.metadata["source"].endswith(expected) for doc in hits[:3])
+            print(f"  {'fast ' if confident else 'fused'}  {'✓' if found else '✗'} {expected:<20} {query}")
+            if confident and query in BROAD:
+                broad_fast.append(query)
+        assert not broad_fast, f"broad queries took the fast path: {broad_fast}"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Stress test seat and room holds under concurrent bookings.
+
+Usage:
+    python -m benchmarks.inventory_ledger --threads 16 --seconds 3 --processes 4
+
+Threads hold random flights (plus hotel stays) and store, release or
+abandon the holds; abandoned holds expire. Afterwards nothing may be
+oversold and, with every hold closed, each key's availability must equal
+capacity minus stored quantities. The same run with a single stripe
+shows the cost of one global lock. Finally create_booking is called
+concurrently for one flight against a temporary booking database, first
+from threads of one process and then from several processes sharing the
+database, which must end up with exactly the flight's seats booked.
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+
+import tools
+from data.booking_store import BookingStore
+from data.inventory_ledger import HoldExpired, InventoryLedger, SoldOut
+
+SEATS = 180
+ROOMS = 20
+
+
+def stress(stripes: int, threads: int, seconds: float, flights: int, hotels: int, ttl: float):
+    # Stored quantities stand in for the booking database
+    stored = Counter()
+    operations = Counter()
+    lock = threading.Lock()
+
+    def capacity(key):
+        with lock:
+            return (SEATS if key[0] == "flight" else ROOMS) - stored[key]
+
+    ledger = InventoryLedger(capacity=capacity, hold_ttl=ttl, stripes=stripes)
+    keys = set()
+    deadline = time.perf_counter() + seconds
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        ops = Counter()
+        while time.perf_counter() < deadline:
+            quantity = rng.randint(1, 4)
+            request = {("flight", f"FL{rng.randrange(flights):04d}", "2025-07-01"): quantity}
+            if rng.random() < 0.5:
+                hotel, first = rng.randrange(hotels), rng.randrange(5)
+                for night in range(first, first + rng.randint(1, 3)):
+                    request[("hotel", f"HT{hotel:04d}", f"2025-07-0{night + 1}")] = 1
+            try:
+                hold_id = ledger.hold(request)
+            except SoldOut:
+                ops["sold_out"] += 1
+                continue
+            action = rng.random()
+            if action < 0.7:
+                with lock:
+                    stored.update(request)
+                    keys.update(request)
+                try:
+                    ledger.confirm(hold_id)
+                except HoldExpired:
+                    ops["expired_before_confirm"] += 1
+                ops["confirmed"] += 1
+            elif action < 0.9:
+                ledger.release(hold_id)
+                ops["released"] += 1
+            else:
+                ops["abandoned"] += 1
+        with lock:
+            operations.update(ops)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    time.sleep(ttl)
+    ledger.expire_holds()
+    oversold = sum(stored[key] > (SEATS if key[0] == "flight" else ROOMS) for key in keys)
+    inconsistent = sum(ledger.available(key) != capacity(key) for key in keys) + sum(map(len, ledger._held))
+    total = sum(operations.values())
+    print(f"{stripes:3d} stripes: {total / elapsed:9,.0f} holds/s | "
+          f"{operations['confirmed']:,} confirmed, {operations['released']:,} released, "
+          f"{ledger.stats['expired']:,} expired, {operations['sold_out']:,} sold out | "
+          f"oversold keys {oversold}, inconsistent keys {inconsistent}")
+
+
+def book(n: int, attempts: int, departure_date: str) -> Counter:
+    """Book FL001 for two passengers `attempts` times; count confirmations and rejections."""
+    results = Counter()
+    for i in range(attempts):
+        result = json.loads(tools.create_booking.invoke({
+            "booking_type": "flight",
+            "items": json.dumps({"flight_id": "FL001", "departure_date": departure_date, "passengers": 2}),
+            "customer_name": f"Customer {n}-{i}",
+            "customer_email": f"customer{n}-{i}@example.com",
+            "total_price": 1300.0,
+        }))
+        results["confirmed" if "booking_id" in result else "rejected"] += 1
+    return results
+
+
+def process_worker(path: str, n: int, threads: int, attempts: int, departure_date: str) -> Counter:
+    tools.BOOKING_STORE = BookingStore(Path(path))
+    results = Counter()
+    lock = threading.Lock()
+
+    def worker(m: int):
+        counts = book(n * threads + m, attempts, departure_date)
+        with lock:
+            results.update(counts)
+
+    workers = [threading.Thread(target=worker, args=(m,)) for m in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    tools.BOOKING_STORE.close()
+    return results
+
+
+def booking_race(processes: int, threads: int, attempts: int):
+    departure_date = (date.today() + timedelta(days=7)).isoformat()
+    seats = tools.get_inventory().current.flights.seats("FL001", departure_date)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "bookings.sqlite")
+        start = time.perf_counter()
+        if processes == 1:
+            results = process_worker(path, 0, threads, attempts, departure_date)
+        else:
+            with multiprocessing.get_context("spawn").Pool(processes) as pool:
+                results = sum(pool.starmap(process_worker, [
+                    (path, n, threads, attempts, departure_date) for n in range(processes)
+                ]), Counter())
+        elapsed = time.perf_counter() - start
+
+        store = BookingStore(Path(path))
+        booked = store.reserved("flight", "FL001", departure_date)
+        store.close()
+        print(f"create_booking race, {processes} process(es) x {threads} threads: "
+              f"{results['confirmed']} confirmed, {results['rejected']} rejected "
+              f"in {elapsed:.2f}s; {booked}/{seats} seats booked")
+    tools.BOOKING_STORE = tools.LEDGER = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inventory ledger stress test")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--flights", type=int, default=2000)
+    parser.add_argument("--hotels", type=int, default=500)
+    parser.add_argument("--ttl", type=float, default=0.05, help="Hold expiry in seconds")
+    parser.add_argument("--processes", type=int, default=4, help="Processes sharing the database in the last race")
+    args = parser.parse_args()
+
+    for stripes in (1, 64):
+        stress(stripes, args.threads, args.seconds, args.flights, args.hotels, args.ttl)
+    booking_race(1, args.threads, attempts=10)
+    booking_race(args.processes, args.threads, attempts=10)
+
+
+if __name__ == "__main__":
+    main()
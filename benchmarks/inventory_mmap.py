@@ -0,0 +1,78 @@
+"""
+Compare serving the flight index from a memory-mapped Arrow file with
+loading the same inventory into a private pandas copy.
+
+Usage:
+    python -m data.generate_inventory --output /tmp/inventory --parquet
+    python -m benchmarks.inventory_mmap --inventory /tmp/inventory
+
+Each mode runs in a fresh subprocess. RssAnon is memory private to the
+process; RssFile is page cache shared by every process mapping the file.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+def memory_kb() -> dict:
+    fields = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("RssAnon", "RssFile"):
+                fields[key] = int(value.split()[0])
+    return fields
+
+
+def measure(mode: str, inventory: Path) -> dict:
+    import pyarrow.parquet as pq
+
+    from data.flight_index import FlightIndex
+    from data.inventory_store import FLIGHTS_FILE, open_table
+
+    before = memory_kb()
+    start = time.perf_counter()
+    if mode == "mmap":
+        index = FlightIndex(open_table(inventory, FLIGHTS_FILE))
+    else:
+        index = FlightIndex(pq.read_table(inventory / f"{FLIGHTS_FILE}.parquet").to_pandas())
+    elapsed = time.perf_counter() - start
+
+    # Touch every route so the numbers include pages actually served from
+    for origin, destination in list(index.routes)[:2000]:
+        index.search(origin, destination)
+
+    after = memory_kb()
+    return {
+        "rows": len(index),
+        "startup_s": elapsed,
+        "private_mb": (after.get("RssAnon", 0) - before.get("RssAnon", 0)) / 1024,
+        "shared_mb": (after.get("RssFile", 0) - before.get("RssFile", 0)) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory-mapped inventory benchmark")
+    parser.add_argument("--inventory", type=Path, required=True)
+    parser.add_argument("--mode", choices=["mmap", "pandas"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(measure(args.mode, args.inventory)))
+        return
+
+    for mode in ("mmap", "pandas"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.inventory_mmap", "--inventory", str(args.inventory), "--mode", mode],
+            check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output)
+        print(f"{mode:>6}: {result['rows']:,} rows, startup {result['startup_s']:.2f}s, "
+              f"private {result['private_mb']:.0f}MB, shared page cache {result['shared_mb']:.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
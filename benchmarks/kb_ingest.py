@@ -0,0 +1,91 @@
+"""
+Benchmark knowledge base builds against a local stand-in embedding server.
+
+Usage:
+    python -m benchmarks.kb_ingest --files 200 --per-text 0.005 --parallel 4
+
+Generates a synthetic destination/policy corpus and indexes it with
+OllamaEmbeddings pointed at the stub server, first the old way (every
+chunk in one add_texts call) and then through setup_kb's batched pipeline
+with different batch sizes and worker counts. Finally re-runs setup_kb
+with nothing changed and with one file edited.
+"""
+import argparse
+import contextlib
+import io
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from langchain_chroma import Chroma
+from langchain_ollama import OllamaEmbeddings
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from benchmarks.stub_embeddings import StubEmbeddingServer
+from knowledge_base.setup_kb import KB_DIR, setup_knowledge_base
+
+
+def generate_corpus(path: Path, files: int, seed: int = 0):
+    """Markdown files built from shuffled paragraphs of the real knowledge base."""
+    rng = random.Random(seed)
+    paragraphs = [
+        paragraph for md in sorted(KB_DIR.glob("*.md"))
+        for paragraph in md.read_text(encoding="utf-8").split("\n\n") if len(paragraph) > 40
+    ]
+    path.mkdir(parents=True)
+    for n in range(files):
+        body = "\n\n".join(rng.sample(paragraphs, min(len(paragraphs), 24)))
+        (path / f"guide_{n:04d}.md").write_text(f"# Travel guide {n}\n\n{body}\n", encoding="utf-8")
+
+
+def single_request(corpus: Path, db: Path, embeddings) -> int:
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+    texts = [chunk for md in sorted(corpus.glob("*.md")) for chunk in splitter.split_text(md.read_text())]
+    Chroma(persist_directory=str(db), embedding_function=embeddings).add_texts(texts)
+    return len(texts)
+
+
+def timed(label: str, server: StubEmbeddingServer, func):
+    server.requests = server.texts = 0
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        func()
+    elapsed = time.perf_counter() - start
+    rate = f"{server.texts / elapsed:7,.0f} chunks/s" if server.texts else " " * 15
+    print(f"{label:<28} {elapsed:6.2f}s {rate} ({server.texts} chunks, {server.requests} requests)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Knowledge base ingestion benchmark")
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02, help="Per-request latency of the stub server")
+    parser.add_argument("--per-text", type=float, default=0.005, help="Per-chunk latency of the stub server")
+    parser.add_argument("--parallel", type=int, default=4, help="Requests the stub server serves at once")
+    args = parser.parse_args()
+
+    server = StubEmbeddingServer(latency=args.latency, per_text=args.per_text, parallel=args.parallel).start()
+    embeddings = OllamaEmbeddings(model="stub", base_url=server.url)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            corpus = tmp / "knowledge_base"
+            generate_corpus(corpus, args.files)
+
+            timed("one add_texts call", server, lambda: single_request(corpus, tmp / "single", embeddings))
+            for batch_size, workers in ((32, 1), (32, 4), (16, 8), (64, 8)):
+                db = tmp / f"pipeline_{batch_size}_{workers}"
+                timed(f"batch {batch_size}, {workers} workers", server, lambda: setup_knowledge_base(
+                    corpus, db, embeddings, batch_size=batch_size, workers=workers
+                ))
+
+            timed("re-run, nothing changed", server, lambda: setup_knowledge_base(corpus, db, embeddings))
+            edited = corpus / "guide_0000.md"
+            edited.write_text(edited.read_text() + "\nNew paragraph about late check-out.\n")
+            timed("re-run, one file edited", server, lambda: setup_knowledge_base(corpus, db, embeddings))
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
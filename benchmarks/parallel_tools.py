@@ -0,0 +1,125 @@
+"""
+Benchmark one agent turn in which the model asks for several tools at once.
+
+Usage:
+    python -m benchmarks.parallel_tools --weather-latency 0.3 --kb-latency 0.2
+
+A scripted chat model requests flights, hotels, two weather forecasts
+(served by the local stub API, uncached) and a knowledge base search in a
+single message, then answers. The turn latency through the sync and the
+async graph is compared with running the same tool calls one by one.
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, timedelta
+from typing import Any, List
+
+from langchain_core.documents import Document
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.retrievers import BaseRetriever
+
+import tools
+from agent import arun_agent_streaming, create_travel_graph
+from benchmarks.stub_weather import StubWeatherServer
+from data.weather_client import ForecastCache, WeatherClient
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Requests all tool calls in its first message, then answers."""
+    tool_calls: List[dict]
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ScriptedChatModel":
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if isinstance(messages[-1], HumanMessage):
+            message = AIMessage(content="", tool_calls=self.tool_calls)
+        else:
+            message = AIMessage(content="Here are your options.")
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class SlowRetriever(BaseRetriever):
+    latency: float
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        time.sleep(self.latency)
+        return [Document(page_content="Visas are not required for stays under 90 days.", metadata={"source": "faq"})]
+
+    async def _aget_relevant_documents(self, query, *, run_manager=None):
+        await asyncio.sleep(self.latency)
+        return [Document(page_content="Visas are not required for stays under 90 days.", metadata={"source": "faq"})]
+
+
+def tool_calls(start: date) -> List[dict]:
+    day = start.isoformat()
+    week_later = (start + timedelta(days=6)).isoformat()
+    calls = [
+        ("search_flights", {"origin": "JFK", "destination": "LHR", "departure_date": day}),
+        ("search_hotels", {"city": "London", "check_in": day, "check_out": week_later}),
+        ("get_weather_forecast", {"city": "London", "date": day, "end_date": week_later}),
+        ("get_weather_forecast", {"city": "Paris", "date": day}),
+        ("search_knowledge_base", {"query": "Do I need a visa for the UK?"}),
+    ]
+    return [{"name": name, "args": args, "id": f"call_{i}"} for i, (name, args) in enumerate(calls)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel tool call benchmark")
+    parser.add_argument("--weather-latency", type=float, default=0.3, help="Stub weather API latency in seconds")
+    parser.add_argument("--kb-latency", type=float, default=0.2, help="Knowledge base retrieval latency in seconds")
+    parser.add_argument("--turns", type=int, default=5)
+    args = parser.parse_args()
+
+    server = StubWeatherServer(latency=args.weather_latency).start()
+    # Uncached so every turn pays for the weather API
+    tools.WEATHER_CLIENT = WeatherClient(base_url=server.url, cache=ForecastCache(ttl=0))
+    tools.get_inventory()
+
+    calls = tool_calls(date.today())
+    retriever = SlowRetriever(latency=args.kb_latency)
+    graph = create_travel_graph(ScriptedChatModel(tool_calls=calls), retriever)
+    tools_by_name = {t.name: t for t in (
+        tools.search_flights, tools.search_hotels, tools.get_weather_forecast
+    )}
+
+    try:
+        latencies = []
+        for call in calls:
+            start = time.perf_counter()
+            if call["name"] == "search_knowledge_base":
+                retriever.invoke(call["args"]["query"])
+            else:
+                tools_by_name[call["name"]].invoke(call["args"])
+            latencies.append(time.perf_counter() - start)
+            print(f"{call['name']:>22}: {latencies[-1] * 1000:6.0f}ms")
+        print(f"{'one after another':>22}: {sum(latencies) * 1000:6.0f}ms (slowest tool {max(latencies) * 1000:.0f}ms)")
+
+        def sync_turn():
+            graph.invoke({"messages": [HumanMessage(content="Plan my London trip")]})
+
+        async def async_turn():
+            state = {"messages": []}
+            async for _ in arun_agent_streaming(graph, "Plan my London trip", state):
+                pass
+
+        for label, turn in (("sync turn", sync_turn), ("async turn", lambda: asyncio.run(async_turn()))):
+            timings = []
+            for _ in range(args.turns):
+                start = time.perf_counter()
+                turn()
+                timings.append(time.perf_counter() - start)
+            print(f"{label:>22}: {min(timings) * 1000:6.0f}ms best, {sum(timings) / len(timings) * 1000:.0f}ms mean")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
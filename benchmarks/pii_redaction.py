@@ -0,0 +1,229 @@
+"""
+Benchmark PII redaction cost per model call as a conversation grows.
+
+Usage:
+    python -m benchmarks.pii_redaction --turns 200
+
+A synthetic session alternates customer messages (some with emails and
+phone numbers), tool calls with booking lookups that contain contact
+details, and answers. At every model call each redaction setup processes
+the history the model is about to read and then the model's message:
+
+  two middlewares   the previous email and phone PIIMiddleware instances
+  full rescan       the combined pattern over the whole history every call
+  cached            PIIRedactionMiddleware, scanning only unseen messages
+
+Reports the time and the characters scanned per turn, and the messages
+that still carry PII when they reach the model. Finally a scripted model
+streams a reply that repeats the customer's contact details a few
+characters at a time, after a tool call with their email in its
+arguments; the streamed events must carry no PII.
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from statistics import mean
+from typing import Any
+
+from langchain.agents.middleware import PIIMiddleware
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+import redaction
+import tools
+from redaction import PII_PATTERN, PIIRedactionMiddleware
+
+PHONE_DETECTOR = r"(?:\+?\d{1,3}[\s.-]?)?(?:\(?\d{2,4}\)?[\s.-]?)?\d{3,4}[\s.-]?\d{4}"
+
+
+def turn_messages(turn: int):
+    """(customer message, tool call, tool result, answer) of one turn."""
+    question = (f"My email is traveller{turn}@example.com and my number is +1 555 010 {turn % 10000:04d}"
+                if turn % 3 == 0 else f"Which of these flights is cheapest? Request {turn}")
+    booking = {
+        "booking_id": f"BK{turn:08d}", "customer_name": "Jane Doe", "customer_email": "***@***.***",
+        "contact_phone": f"+44 20 7946 {turn % 10000:04d}", "status": "confirmed",
+        "items": [{"type": "flight", "flight_number": f"BA{100 + i}", "price": 420.0 + i,
+                   "departure_date": "2026-11-02"} for i in range(12)],
+    }
+    return [
+        HumanMessage(content=question, id=f"human-{turn}"),
+        AIMessage(content="", id=f"call-{turn}",
+                  tool_calls=[{"name": "lookup_booking", "args": {"booking_id": f"BK{turn:08d}"}, "id": f"c{turn}"}]),
+        ToolMessage(content=json.dumps(booking), tool_call_id=f"c{turn}", name="lookup_booking", id=f"tool-{turn}"),
+        AIMessage(content="Your booking is confirmed. We will text you on the number you gave us. " * 6,
+                  id=f"answer-{turn}"),
+    ]
+
+
+def counting(detect, scanned: list):
+    def wrapper(text):
+        scanned[0] += len(text)
+        return detect(text)
+
+    return wrapper
+
+
+def two_middlewares(scanned: list):
+    middlewares = [
+        PIIMiddleware("email", strategy="redact", apply_to_input=True, apply_to_output=True),
+        PIIMiddleware("phone_number", detector=PHONE_DETECTOR, strategy="redact",
+                      apply_to_input=True, apply_to_output=True),
+    ]
+    for middleware in middlewares:
+        middleware.detector = counting(middleware.detector, scanned)
+
+    def call(history, response):
+        state = {"messages": history}
+        for middleware in middlewares:
+            update = middleware.before_model(state, None)
+            if update:
+                state = update
+        sent = state["messages"]
+        state = {"messages": sent + [response]}
+        for middleware in middlewares:
+            update = middleware.after_model(state, None)
+            if update:
+                state = update
+        return sent
+
+    return call
+
+
+def full_rescan(scanned: list):
+    redact_text = counting(redaction.redact_text, scanned)
+
+    def redacted(message):
+        text = redact_text(message.content)
+        return message if text is None else message.model_copy(update={"content": text})
+
+    def call(history, response):
+        sent = [redacted(message) for message in history]
+        redacted(response)
+        return sent
+
+    return call
+
+
+def cached(scanned: list):
+    redaction.redact_text = counting(redaction.redact_text, scanned)
+    middleware = PIIRedactionMiddleware()
+
+    def call(history, response):
+        sent = middleware.redact_all(history)
+        middleware.redact(response, stored=True)
+        return sent
+
+    return call
+
+
+def run(label: str, setup, turns: int):
+    history, latencies, leaked, sent = [], [], 0, 0
+    scanned, chars = [0], []
+    call = setup(scanned)
+    for turn in range(turns):
+        question, tool_call, tool_result, answer = turn_messages(turn)
+        elapsed = 0.0
+        # Two model calls per turn: deciding on the lookup, then answering
+        for new, response in (([question], tool_call), ([tool_call, tool_result], answer)):
+            history.extend(new)
+            start = time.perf_counter()
+            sent = call(history, response)
+            elapsed += time.perf_counter() - start
+            if turn == turns - 1:
+                leaked = sum(1 for message in sent if PII_PATTERN.search(message.content))
+                sent = len(sent)
+        history.append(answer)
+        latencies.append(elapsed)
+        chars.append(scanned[0])
+        scanned[0] = 0
+    windows = [(0, 10), (turns // 2 - 5, turns // 2 + 5), (turns - 10, turns)]
+    print(f"{label:<17} " + "  ".join(
+        f"turns {begin + 1}-{end}: {mean(latencies[begin:end]) * 1e6:7.0f}us {mean(chars[begin:end]) / 1000:6.1f}k chars"
+        for begin, end in windows
+    ) + f"  messages with PII sent in the last call: {leaked}/{sent}")
+
+
+class StreamingChatModel(BaseChatModel):
+    """Looks up the customer's bookings, then streams an answer repeating their details."""
+    customer_name: str
+    booking_id: str
+    answer: str
+    chunk_size: int = 3
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-streaming"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "StreamingChatModel":
+        return self
+
+    def _message(self, messages) -> AIMessage:
+        if isinstance(messages[-1], HumanMessage):
+            return AIMessage(content="", tool_calls=[{
+                "name": "find_customer_bookings", "args": {"customer_name": self.customer_name, "booking_id": self.booking_id}, "id": "call_0",
+            }])
+        return AIMessage(content=self.answer)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        message = self._message(messages)
+        if message.tool_calls:
+            call = message.tool_calls[0]
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[{
+                "name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": 0,
+            }]))
+            return
+        for start in range(0, len(message.content), self.chunk_size):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=message.content[start:start + self.chunk_size]))
+
+
+def streamed_pii():
+    """Events with PII streamed to the client in one turn; raises if any."""
+    from agent import create_travel_graph, run_agent_streaming
+    from benchmarks.history_compaction import StaticRetriever
+    from data.booking_store import BookingStore
+
+    email = "jo.traveller@example.com"
+    model = StreamingChatModel(
+        customer_name="Jo Traveller",
+        booking_id="BK0000000",
+        answer=f"I found no bookings for {email}. We can also call you on +1 555 010 0042 or (212) 555-0142.",
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        tools.BOOKING_STORE = BookingStore(Path(tmp) / "bookings.sqlite")
+        try:
+            graph = create_travel_graph(model, StaticRetriever())
+            state = {"messages": []}
+            events = list(run_agent_streaming(graph, f"Show my bookings, I am Jo Traveller, booking BK0000000, email {email}", state))
+        finally:
+            tools.BOOKING_STORE.close()
+            tools.BOOKING_STORE = None
+
+    tokens = "".join(event["content"] for event in events if event["type"] == "token")
+    leaked = [event for event in events if event["type"] != "token" and PII_PATTERN.search(json.dumps(event))]
+    leaked += [tokens] if PII_PATTERN.search(tokens) else []
+    print(f"streamed turn: {len(events)} events, streamed text {tokens!r}, events with PII: {len(leaked)}")
+    assert tokens == state["messages"][-1].content, (tokens, state["messages"][-1].content)
+    assert not leaked, leaked
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PII redaction benchmark")
+    parser.add_argument("--turns", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.turns}-turn session, redaction time and characters scanned per turn (two model calls):")
+    run("two middlewares", two_middlewares, args.turns)
+    run("full rescan", full_rescan, args.turns)
+    run("cached", cached, args.turns)
+    streamed_pii()
+
+
+if __name__ == "__main__":
+    main()
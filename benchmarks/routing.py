@@ -0,0 +1,109 @@
+"""
+Benchmark multi-leg itinerary search on a large hub-and-spoke schedule.
+
+Usage:
+    python -m benchmarks.routing --airports 2000 --hubs 50 --days 30
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from data.flight_index import FlightIndex
+from data.routing import RoutePlanner
+
+
+def hub_and_spoke_flights_df(
+    airports: int,
+    hubs: int,
+    days: int,
+    flights_per_day: int,
+    hubs_per_spoke: int = 3,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Build a dated schedule where hubs are fully connected and every spoke
+    airport is connected to a few hubs, in both directions.
+    """
+    rng = np.random.default_rng(seed)
+    codes = np.array([f"A{i:04d}" for i in range(airports)])
+
+    pairs = [(h, g) for h in range(hubs) for g in range(hubs) if h != g]
+    for spoke in range(hubs, airports):
+        for hub in rng.choice(hubs, hubs_per_spoke, replace=False):
+            pairs.append((spoke, int(hub)))
+            pairs.append((int(hub), spoke))
+    pairs = np.array(pairs)
+
+    legs_per_day = len(pairs) * flights_per_day
+    rows = legs_per_day * days
+    route = np.tile(np.repeat(np.arange(len(pairs)), flights_per_day), days)
+    day = np.repeat(np.arange(days), legs_per_day)
+
+    # Each route keeps the same duration and base fare every day
+    route_duration = rng.integers(60, 12 * 60, len(pairs))
+    route_price = rng.integers(80, 900, len(pairs))
+    departure = rng.integers(0, 24 * 60 // 5, rows) * 5
+
+    clock = np.array([f"{m // 60:02d}:{m % 60:02d}" for m in range(24 * 60)])
+    durations = np.array([f"{m // 60}h {m % 60:02d}m" for m in range(24 * 60)])
+    dates = (np.datetime64("2025-01-01") + np.arange(days)).astype(str)
+
+    return pd.DataFrame({
+        "flight_id": np.char.add("FL", np.arange(rows).astype(str)),
+        "airline": "Benchmark Air",
+        "origin": codes[pairs[route, 0]],
+        "destination": codes[pairs[route, 1]],
+        "departure_date": dates[day],
+        "departure_time": clock[departure],
+        "arrival_time": clock[(departure + route_duration[route]) % (24 * 60)],
+        "duration": durations[route_duration[route]],
+        "price": route_price[route] + rng.integers(0, 200, rows),
+        "stops": 0,
+        "class": "Economy",
+        "seats": 180,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Itinerary routing benchmark")
+    parser.add_argument("--airports", type=int, default=2000)
+    parser.add_argument("--hubs", type=int, default=50)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--flights-per-day", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Generating schedule for {args.airports} airports ({args.hubs} hubs) over {args.days} days...")
+    df = hub_and_spoke_flights_df(args.airports, args.hubs, args.days, args.flights_per_day)
+
+    start = time.perf_counter()
+    planner = RoutePlanner(FlightIndex(df))
+    print(f"Index build: {time.perf_counter() - start:.2f}s "
+          f"({len(df):,} legs, {len(planner.index.routes):,} routes)")
+
+    rng = random.Random(1)
+    airports = list(planner.airport_codes)
+    dates = df["departure_date"].unique()[: args.days - 2]
+    queries = [(*rng.sample(airports, 2), rng.choice(dates)) for _ in range(args.queries)]
+
+    for sort_by in ("price", "duration"):
+        latencies = []
+        found = 0
+        for origin, destination, departure_date in queries:
+            start = time.perf_counter()
+            found += len(planner.find_itineraries(origin, destination, departure_date, k=args.k, sort_by=sort_by))
+            latencies.append(time.perf_counter() - start)
+
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] * 1000
+        p95 = latencies[int(len(latencies) * 0.95)] * 1000
+        print(f"Top-{args.k} by {sort_by}: p50={p50:.2f}ms p95={p95:.2f}ms "
+              f"({found / len(queries):.1f} itineraries/query)")
+
+
+if __name__ == "__main__":
+    main()
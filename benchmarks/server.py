@@ -0,0 +1,148 @@
+"""
+Benchmark the HTTP/SSE server with many concurrent conversations.
+
+Usage:
+    python -m benchmarks.server --clients 32 --turns 5 --model-latency 0.2
+
+The server runs in-process on uvicorn with a checkpointed graph whose
+scripted chat model takes `model-latency` seconds per call (two calls per
+turn). Each client opens a session and sends its turns one after another,
+reading the Server-Sent Events. Reports throughput, time to the first event
+and turn latency for several concurrency limits, then sends a burst larger
+than the queue and checks that only the slots plus the queue are admitted.
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+from statistics import median, quantiles
+
+import httpx
+import uvicorn
+
+from agent import create_travel_graph
+from benchmarks.history_compaction import SessionChatModel, StaticRetriever
+from data.session_store import SessionCheckpointer
+from history import HistoryCompactor
+from server import TravelAgentServer
+
+
+class SlowSessionChatModel(SessionChatModel):
+    """SessionChatModel taking `latency` seconds per call, like a local model."""
+    latency: float = 0.2
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency)
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+
+def start_server(app: TravelAgentServer) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def graph_for(path: Path, latency: float):
+    model = SlowSessionChatModel(prompt_tps=1e12, prompt_tokens=[], latency=latency)
+    return create_travel_graph(model, StaticRetriever(), compactor=HistoryCompactor(model),
+                               checkpointer=SessionCheckpointer(path))
+
+
+def url(server: uvicorn.Server) -> str:
+    return f"http://127.0.0.1:{server.servers[0].sockets[0].getsockname()[1]}"
+
+
+async def turn(client: httpx.AsyncClient, session_id: str, message: str):
+    """(status, seconds to the first event, seconds to "done", events)"""
+    start = time.perf_counter()
+    first, events = None, []
+    async with client.stream("POST", f"/sessions/{session_id}/messages", json={"message": message}) as response:
+        if response.status_code != 200:
+            await response.aread()
+            return response.status_code, None, time.perf_counter() - start, events
+        async for line in response.aiter_lines():
+            if line.startswith("event: "):
+                events.append(line[7:])
+                if first is None and events[-1] != "queued":
+                    first = time.perf_counter() - start
+    return 200, first, time.perf_counter() - start, events
+
+
+async def conversation(client: httpx.AsyncClient, turns: int, results: list):
+    session_id = (await client.post("/sessions")).json()["session_id"]
+    for i in range(turns):
+        results.append(await turn(client, session_id, f"Show me more options, request {i}"))
+
+
+async def load(base_url: str, clients: int, turns: int) -> list:
+    results = []
+    limits = httpx.Limits(max_connections=clients + 8)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        await asyncio.gather(*(conversation(client, turns, results) for _ in range(clients)))
+    return results
+
+
+async def burst(base_url: str, requests: int) -> dict:
+    limits = httpx.Limits(max_connections=requests + 8)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        sessions = [(await client.post("/sessions")).json()["session_id"] for _ in range(requests)]
+        results = await asyncio.gather(*(turn(client, session_id, "Show me more options, request 0")
+                                         for session_id in sessions))
+        unknown = (await client.post("/sessions/not-a-session/messages", json={"message": "hi"})).status_code
+        health = (await client.get("/health")).json()
+    statuses = {}
+    for status, *_ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    return {"statuses": statuses, "health": health, "unknown_session": unknown}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP/SSE server benchmark")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--model-latency", type=float, default=0.2, help="Chat model call latency in seconds")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{args.clients} clients x {args.turns} turns, {args.model_latency * 1000:.0f}ms per model call:")
+        for concurrency in args.concurrency:
+            # The server closes its checkpointer on shutdown
+            graph = graph_for(Path(tmp) / f"sessions-{concurrency}.sqlite", args.model_latency)
+            app = TravelAgentServer(graph, max_concurrency=concurrency, max_queue=args.clients)
+            server = start_server(app)
+            start = time.perf_counter()
+            results = asyncio.run(load(url(server), args.clients, args.turns))
+            elapsed = time.perf_counter() - start
+            server.should_exit = True
+            ok = [r for r in results if r[0] == 200 and r[3][-1:] == ["done"]]
+            latencies = [r[2] for r in ok]
+            print(f"  concurrency {concurrency:>3}: {len(ok) / elapsed:6.1f} turns/s, "
+                  f"first event p50 {median(r[1] for r in ok) * 1000:6.0f}ms, "
+                  f"turn p50 {median(latencies) * 1000:6.0f}ms p95 {quantiles(latencies, n=20)[-1] * 1000:6.0f}ms, "
+                  f"{len(results) - len(ok)} failed")
+
+        graph = graph_for(Path(tmp) / "sessions-burst.sqlite", args.model_latency)
+        app = TravelAgentServer(graph, max_concurrency=4, max_queue=8)
+        server = start_server(app)
+        result = asyncio.run(burst(url(server), 40))
+        server.should_exit = True
+        print(f"  burst of 40 with 4 slots and a queue of 8: {json.dumps(result['statuses'])}, "
+              f"rejected {result['health']['rejected']}")
+        # Every turn of the burst outlasts its arrival, so only slots + queue are admitted
+        assert result["statuses"].get(200, 0) <= 4 + 8, result["statuses"]
+        assert result["health"]["rejected"] == result["statuses"].get(503, 0) >= 40 - 4 - 8, result
+        assert result["unknown_session"] == 404, result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark the SQLite session checkpointer with many concurrent conversations.
+
+Usage:
+    python -m benchmarks.session_store --sessions 200 --turns 20
+
+Conversations from the history compaction benchmark's scripted model are
+interleaved turn by turn through one graph. The checkpointer appending new
+messages to a log is compared with one storing the whole message list at
+every step, as LangGraph's savers do. Then a fresh process resumes random
+sessions from disk, and hot sessions are read from memory.
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from agent import create_travel_graph, run_agent_streaming
+from benchmarks.history_compaction import SessionChatModel, StaticRetriever
+from data.session_store import SessionCheckpointer
+from history import HistoryCompactor
+
+
+def timed(saver: SessionCheckpointer, timings: list):
+    put = saver.put
+
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return put(*args, **kwargs)
+        finally:
+            timings.append(time.perf_counter() - start)
+
+    saver.put = wrapper
+
+
+def graph_for(saver: SessionCheckpointer):
+    model = SessionChatModel(prompt_tps=1e12, prompt_tokens=[])
+    return create_travel_graph(model, StaticRetriever(), compactor=HistoryCompactor(model), checkpointer=saver)
+
+
+def database_bytes(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.parent.glob(path.name + "*"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Session checkpointer benchmark")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--resumes", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, append_channels in (("full snapshots", ()), ("append log", ("messages",))):
+            path = Path(tmp) / f"{label.replace(' ', '_')}.sqlite"
+            saver = SessionCheckpointer(path, max_sessions=args.sessions, append_channels=append_channels)
+            timings = []
+            timed(saver, timings)
+            graph = graph_for(saver)
+            late = 0
+            start = time.perf_counter()
+            for turn in range(args.turns):
+                if turn == args.turns - 1:
+                    late = len(timings)
+                for session in range(args.sessions):
+                    config = {"configurable": {"thread_id": f"session-{session}"}}
+                    for _ in run_agent_streaming(graph, f"Show me more options, request {turn}", {"messages": []}, config):
+                        pass
+            elapsed = time.perf_counter() - start
+            saver.close()
+            turns = args.sessions * args.turns
+            print(f"{label:<15} {turns} turns in {elapsed:.1f}s ({elapsed / turns * 1000:.1f}ms each), "
+                  f"checkpoint write {sum(timings) / len(timings) * 1000:.2f}ms mean, "
+                  f"{sum(timings[late:]) / len(timings[late:]) * 1000:.2f}ms in the last turn, "
+                  f"database {database_bytes(path) / 1e6:.1f}MB")
+
+        # A new process: every session starts cold
+        saver = SessionCheckpointer(path, max_sessions=args.sessions)
+        graph = graph_for(saver)
+        sessions = random.Random(0).sample(range(args.sessions), min(args.resumes, args.sessions))
+        for label in ("resume (disk)", "hot (memory)"):
+            start = time.perf_counter()
+            for session in sessions:
+                state = graph.get_state({"configurable": {"thread_id": f"session-{session}"}})
+            elapsed = time.perf_counter() - start
+            print(f"{label:<15} {elapsed / len(sessions) * 1000:.2f}ms per session "
+                  f"({len(state.values['messages'])} messages), {saver.stats}")
+
+
+if __name__ == "__main__":
+    main()
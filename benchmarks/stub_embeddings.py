@@ -0,0 +1,91 @@
+"""
+Local stand-in for Ollama's embedding API.
+
+Answers POST /api/embed like Ollama does, so OllamaEmbeddings can point
+its base_url at it. Each request takes `latency` seconds plus
+`per_text` seconds per input, and at most `parallel` requests are served
+at a time (like OLLAMA_NUM_PARALLEL); the rest queue. Vectors are
+deterministic pseudo-random unit vectors of the text.
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+
+def embed(text: str, dimensions: int) -> List[float]:
+    rng = random.Random(hashlib.sha256(text.encode()).digest())
+    vector = [rng.gauss(0, 1) for _ in range(dimensions)]
+    norm = sum(x * x for x in vector) ** 0.5
+    return [x / norm for x in vector]
+
+
+class StubEmbeddingServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        latency: float = 0.02,
+        per_text: float = 0.005,
+        parallel: int = 4,
+        dimensions: int = 256,
+        port: int = 0,
+    ):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency
+        self.per_text = per_text
+        self.dimensions = dimensions
+        self.requests = 0
+        self.texts = 0
+        self._slots = threading.Semaphore(parallel)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "StubEmbeddingServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    wbufsize = 64 * 1024
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path != "/api/embed":
+            self.respond(404, {"error": f"unknown path {self.path}"})
+            return
+        texts = body.get("input", [])
+        if isinstance(texts, str):
+            texts = [texts]
+        server = self.server
+        with server._slots:
+            time.sleep(server.latency + server.per_text * len(texts))
+            embeddings = [embed(text, server.dimensions) for text in texts]
+        with server._lock:
+            server.requests += 1
+            server.texts += len(texts)
+        self.respond(200, {"model": body.get("model", ""), "embeddings": embeddings})
+
+    def respond(self, status: int, body: dict):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
@@ -0,0 +1,130 @@
+"""
+Local stand-in for the Open-Meteo forecast API.
+
+Answers /v1/forecast with deterministic daily values for the requested
+date range after a configurable latency, and counts requests and TCP
+connections so benchmarks can check caching and connection reuse.
+
+Faults can be injected: error_rate answers that fraction of requests with
+a 503, slow_rate delays that fraction by slow_latency seconds (a latency
+tail, or a hang when longer than the client's read timeout), and
+malformed_rate answers that fraction with a 200 whose body is broken
+(invalid JSON, no "daily" field, or truncated daily lists, in turn).
+"""
+import json
+import random
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class StubWeatherServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        port: int = 0,
+        error_rate: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_latency: float = 2.0,
+        malformed_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.malformed_rate = malformed_rate
+        self.malformed = 0
+        self.requests = 0
+        self.connections = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1/forecast"
+
+    def count(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def roll(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+    def start(self) -> "StubWeatherServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def daily_forecast(start: date, end: date) -> dict:
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    return {
+        "time": [d.isoformat() for d in days],
+        "temperature_2m_max": [round(15 + d.toordinal() % 10 * 0.7, 1) for d in days],
+        "temperature_2m_min": [round(6 + d.toordinal() % 7 * 0.5, 1) for d in days],
+        "precipitation_sum": [float(d.toordinal() % 4) for d in days],
+        "weathercode": [(0, 2, 3, 61)[d.toordinal() % 4] for d in days],
+    }
+
+
+def malformed(body: dict, n: int):
+    """A broken variant of a forecast body: invalid JSON, no "daily", or truncated lists."""
+    if n % 3 == 0:
+        return json.dumps(body).encode()[:-7]
+    if n % 3 == 1:
+        return {"latitude": 48.85, "longitude": 2.35}
+    daily = body["daily"]
+    return {"daily": {**daily, "temperature_2m_min": daily["temperature_2m_min"][:-1]}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Send headers and body in one segment; separate writes on a kept-alive
+    # connection stall on delayed ACKs and would be charged to the client
+    wbufsize = 64 * 1024
+
+    def setup(self):
+        super().setup()
+        self.server.count("connections")
+
+    def do_GET(self):
+        self.server.count("requests")
+        query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        slow = self.server.roll() < self.server.slow_rate
+        time.sleep(self.server.slow_latency if slow else self.server.latency)
+        if self.server.roll() < self.server.error_rate:
+            self.respond(503, {"error": True, "reason": "Service unavailable"})
+            return
+        try:
+            start = date.fromisoformat(query["start_date"])
+            end = date.fromisoformat(query["end_date"])
+            status, body = 200, {"daily": daily_forecast(start, end)}
+        except (KeyError, ValueError):
+            status, body = 400, {"error": True, "reason": "Invalid start_date or end_date"}
+        if status == 200 and self.server.roll() < self.server.malformed_rate:
+            self.server.count("malformed")
+            body = malformed(body, self.server.malformed)
+        self.respond(status, body)
+
+    def respond(self, status: int, body):
+        payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
@@ -0,0 +1,135 @@
+"""
+Benchmark the memory-mapped NumPy vector store against Chroma.
+
+Usage:
+    python -m benchmarks.vector_store --rows 20000 --dimensions 768
+
+Startup: a fresh interpreter imports and opens each store built from the
+real knowledge base and runs one search (the agent has already imported
+langchain_core by then, so that is excluded). Queries: top-10 search latency
+by vector over a synthetic clustered corpus for Chroma, the exact NumPy
+store, its IVF index and IVF with int8 vectors, with recall against the
+exact results.
+"""
+import argparse
+import contextlib
+import io
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.embedding_cache import SlowEmbeddings
+from knowledge_base.numpy_store import NumpyVectorStore, write_vector_store
+from knowledge_base.setup_kb import setup_knowledge_base
+
+# (import, open) for each store
+STARTUP = {
+    "chroma": ("from langchain_chroma import Chroma", "store = Chroma(persist_directory={path!r})"),
+    "numpy": (
+        "from knowledge_base.numpy_store import NumpyVectorStore",
+        "store = NumpyVectorStore.load({path!r}, None)",
+    ),
+}
+
+
+def startup(kind: str, path: Path, dimensions: int):
+    """(import seconds, open + first search seconds) in a fresh interpreter."""
+    import_line, open_line = STARTUP[kind]
+    code = "\n".join([
+        "import time",
+        "from langchain_core.vectorstores import VectorStore",
+        "start = time.perf_counter()",
+        import_line,
+        "imported = time.perf_counter()",
+        open_line.format(path=str(path)),
+        f"store.similarity_search_by_vector([0.1] * {dimensions}, k=3)",
+        "print(imported - start, time.perf_counter() - imported)",
+    ])
+    root = Path(__file__).resolve().parent.parent
+    output = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    return map(float, output.stdout.strip().splitlines()[-1].split())
+
+
+def clustered(rows: int, dimensions: int, clusters: int = 200, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dimensions)).astype(np.float32)
+    vectors = centers[rng.integers(clusters, size=rows)] + 0.6 * rng.standard_normal((rows, dimensions)).astype(np.float32)
+    return vectors
+
+
+def query_latency(search, queries: np.ndarray):
+    results, timings = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append([document.id for document in search(query.tolist())])
+        timings.append(time.perf_counter() - start)
+    return results, np.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector store benchmark")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dimensions", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--skip-chroma", action="store_true", help="Skip building the large Chroma collection")
+    args = parser.parse_args()
+
+    from langchain_chroma import Chroma
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        db = tmp / "chroma_db"
+        embeddings = SlowEmbeddings(0.0, dimensions=args.dimensions)
+        with contextlib.redirect_stdout(io.StringIO()):
+            setup_knowledge_base(persist_directory=db, embeddings=embeddings)
+        print(f"knowledge base ({len(NumpyVectorStore.load(db, embeddings))} chunks) in a fresh interpreter "
+              "(langchain_core already imported):")
+        for kind in STARTUP:
+            imported, opened = startup(kind, db, args.dimensions)
+            print(f"  {kind:<8} import {imported * 1000:5.0f}ms, open + first search {opened * 1000:5.1f}ms")
+
+        vectors = clustered(args.rows, args.dimensions)
+        ids = [f"c{i}" for i in range(args.rows)]
+        texts = [f"chunk {i}" for i in range(args.rows)]
+        metadatas = [{"source": f"doc{i // 10}"} for i in range(args.rows)]
+        rng = np.random.default_rng(1)
+        queries = vectors[rng.integers(args.rows, size=args.queries)] + 0.3 * rng.standard_normal(
+            (args.queries, args.dimensions)
+        ).astype(np.float32)
+
+        stores = {}
+        for label, options in (
+            ("numpy exact", {"ivf_lists": 0}),
+            ("numpy IVF", {}),
+            ("numpy IVF int8", {"quantize": True}),
+        ):
+            start = time.perf_counter()
+            write_vector_store(tmp / label.replace(" ", "_"), ids, vectors, texts, metadatas, **options)
+            build = time.perf_counter() - start
+            store = NumpyVectorStore.load(tmp / label.replace(" ", "_"), embeddings, nprobe=args.nprobe)
+            stores[label] = (store.similarity_search_by_vector, build)
+        if not args.skip_chroma:
+            chroma = Chroma(persist_directory=str(tmp / "large"), embedding_function=embeddings)
+            start = time.perf_counter()
+            for begin in range(0, args.rows, 5000):
+                chroma._collection.add(
+                    ids=ids[begin:begin + 5000], embeddings=vectors[begin:begin + 5000],
+                    documents=texts[begin:begin + 5000], metadatas=metadatas[begin:begin + 5000],
+                )
+            stores["chroma"] = (chroma.similarity_search_by_vector, time.perf_counter() - start)
+
+        print(f"{args.rows:,} x {args.dimensions} vectors, top-10 search by vector:")
+        exact, _ = query_latency(lambda q: stores["numpy exact"][0](q, k=10), queries)
+        for label, (search, build) in stores.items():
+            results, latency = query_latency(lambda q: search(q, k=10), queries)
+            recall = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(results, exact)])
+            print(f"  {label:<15} build {build:6.2f}s, p50 {latency:6.2f}ms, recall@10 {recall:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark the cached weather client against uncached requests.get calls.
+
+Usage:
+    python -m benchmarks.weather_cache --turns 200 --latency 0.05
+
+Replays an agent-like workload (the same city/date asked again as the
+agent re-plans, plus whole-trip ranges) against a local stub server.
+First asserts cache hits, misses and TTL expiry against the stub's
+request counter; the timed runs then assert the API requests each setup
+makes and the connections it opens.
+"""
+import argparse
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import requests
+
+from benchmarks.stub_weather import StubWeatherServer
+from data.weather_client import DAILY_FIELDS, ForecastCache, WeatherClient
+from data.weather_data import CITY_COORDS
+
+
+def workload(turns: int, seed: int = 0):
+    """(city, start_date, end_date) lookups; most are single days."""
+    rng = random.Random(seed)
+    start = date.today()
+    for _ in range(turns):
+        city = rng.choice(list(CITY_COORDS))
+        day = start + timedelta(days=rng.randrange(14))
+        length = rng.choice([0, 0, 0, 3, 6])
+        yield city, day.isoformat(), (day + timedelta(days=length)).isoformat()
+
+
+def uncached(url: str, lookups) -> None:
+    for city, start_date, end_date in lookups:
+        lat, lon = CITY_COORDS[city]
+        requests.get(url, params={
+            "latitude": lat, "longitude": lon, "daily": DAILY_FIELDS,
+            "timezone": "auto", "start_date": start_date, "end_date": end_date,
+        }).json()
+
+
+def cached(client: WeatherClient, lookups) -> None:
+    for city, start_date, end_date in lookups:
+        client.forecast_range(city, start_date, end_date)
+
+
+def check_cache(server: StubWeatherServer, ttl: float = 0.3):
+    """Assert which lookups reach the API: misses and expired entries do, hits do not."""
+    client = WeatherClient(base_url=server.url, cache=ForecastCache(ttl=ttl))
+    day = date.today()
+    server.requests = 0
+
+    client.forecast("Paris", day.isoformat())
+    assert server.requests == 1 and client.cache.stats["misses"] == 1, client.cache_stats()
+    client.forecast("Paris", day.isoformat())
+    assert server.requests == 1 and client.cache.stats["hits"] == 1, client.cache_stats()
+
+    # A range fetches its missing days in one request and caches each day
+    client.forecast_range("Paris", day.isoformat(), (day + timedelta(days=3)).isoformat())
+    assert server.requests == 2 and client.cache.stats["misses"] == 4, client.cache_stats()
+    client.forecast("Paris", (day + timedelta(days=2)).isoformat())
+    assert server.requests == 2 and client.cache.stats["hits"] == 3, client.cache_stats()
+
+    time.sleep(ttl)
+    client.forecast("Paris", day.isoformat())
+    assert server.requests == 3 and client.cache.stats["misses"] == 5, client.cache_stats()
+    print(f"{'cache checks':>20}: hits, misses and TTL expiry OK")
+
+
+def expected_requests(lookups) -> int:
+    """Lookups with a day not fetched before; each takes one request."""
+    seen, requests_made = set(), 0
+    for city, start_date, end_date in lookups:
+        start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+        days = {(city, start + timedelta(days=i)) for i in range((end - start).days + 1)}
+        requests_made += not days <= seen
+        seen |= days
+    return requests_made
+
+
+def run(label: str, server: StubWeatherServer, func, *args):
+    """Time one setup; returns (API requests, connections opened)."""
+    server.requests = server.connections = 0
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:>20}: {elapsed:6.2f}s, {server.requests:4d} API requests, {server.connections:4d} connections")
+    return server.requests, server.connections
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Weather cache benchmark")
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub API latency in seconds")
+    args = parser.parse_args()
+
+    server = StubWeatherServer(latency=args.latency).start()
+    lookups = list(workload(args.turns))
+    try:
+        check_cache(server)
+        # One request and one new connection per lookup
+        counts = run("requests.get", server, uncached, server.url, lookups)
+        assert counts == (len(lookups), len(lookups)), counts
+
+        # One request per lookup with an uncached day, all over one kept-alive connection
+        client = WeatherClient(base_url=server.url)
+        counts = run("cached + pooled", server, cached, client, lookups)
+        print(f"{'cache stats':>20}: {client.cache_stats()}")
+        assert counts == (expected_requests(lookups), 1), counts
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "weather.sqlite"
+            cached(WeatherClient(base_url=server.url, cache=ForecastCache(path=path)), lookups)
+            # A fresh process starts with an empty memory tier but a warm disk tier
+            restarted = WeatherClient(base_url=server.url, cache=ForecastCache(path=path))
+            counts = run("after restart", server, cached, restarted, lookups)
+            print(f"{'cache stats':>20}: {restarted.cache_stats()}")
+            assert counts == (0, 0), counts
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
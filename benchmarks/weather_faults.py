@@ -0,0 +1,180 @@
+"""
+Exercise the weather client's timeouts, retries, hedging and circuit
+breaker against a fault-injecting local stub of the Open-Meteo API.
+
+Usage:
+    python -m benchmarks.weather_faults --lookups 100
+
+Caching is disabled so every lookup reaches the (stub) API. For each
+scenario the per-lookup latency percentiles, API requests and how many
+answers were degraded (climatology) or errors are reported. First,
+hedged request counts, circuit breaker transitions, the degraded
+fallback and malformed responses are asserted against the stub's
+request counter.
+"""
+import argparse
+import json
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from benchmarks.stub_weather import StubWeatherServer
+from data.weather_client import CircuitBreaker, ForecastCache, WeatherClient, WeatherError
+
+SCENARIOS = {
+    "healthy": {},
+    "30% 503s": {"error_rate": 0.3},
+    "5% slow (1s)": {"slow_rate": 0.05, "slow_latency": 1.0},
+    "5% hang (30s)": {"slow_rate": 0.05, "slow_latency": 30.0},
+    "outage": {"error_rate": 1.0},
+    "30% malformed": {"malformed_rate": 0.3},
+}
+
+
+def check_hedging(lookups: int = 5):
+    """A request slower than the hedge delay is sent twice; a fast one once."""
+    day = date.today().isoformat()
+    for latency, hedged in ((0.3, True), (0.01, False)):
+        server = StubWeatherServer(latency=latency).start()
+        client = WeatherClient(base_url=server.url, cache=ForecastCache(ttl=0), hedge=True, hedge_delay=0.1)
+        try:
+            for _ in range(lookups):
+                client.forecast("Paris", day)
+            expected = lookups * (2 if hedged else 1)
+            assert client.stats["hedges"] == (lookups if hedged else 0), client.cache_stats()
+            assert client.stats["requests"] == server.requests == expected, (client.cache_stats(), server.requests)
+        finally:
+            server.stop()
+    print("hedging checks: slow requests hedged once, fast ones never")
+
+
+def check_breaker(threshold: int = 3, reset_timeout: float = 0.3):
+    """
+    The circuit opens after `threshold` failures and answers degraded
+    without calling the API; after reset_timeout one trial call is let
+    through (half-open), which re-opens the circuit on failure or closes
+    it on success. Degraded answers are not cached.
+    """
+    server = StubWeatherServer(latency=0.2, error_rate=1.0).start()
+    client = WeatherClient(
+        base_url=server.url,
+        retries=0,
+        breaker=CircuitBreaker(failure_threshold=threshold, reset_timeout=reset_timeout),
+    )
+    day = date.today().isoformat()
+    try:
+        for attempt in range(threshold):
+            assert client.breaker.state == "closed", attempt
+            assert client.forecast("Paris", day)["degraded"]
+        assert client.breaker.state == "open" and server.requests == threshold, server.requests
+
+        # Open: refused without a request
+        assert client.forecast("Paris", day)["degraded"]
+        assert server.requests == threshold and client.stats["fallbacks"] == threshold + 1, client.cache_stats()
+
+        # Half-open trial fails: open again
+        time.sleep(reset_timeout)
+        assert client.forecast("Paris", day)["degraded"]
+        assert client.breaker.state == "open" and server.requests == threshold + 1, server.requests
+
+        # Half-open trial succeeds: closed. Lookups during the trial are refused
+        server.error_rate = 0.0
+        time.sleep(reset_timeout)
+        trial = threading.Thread(target=client.forecast, args=("Paris", day))
+        trial.start()
+        time.sleep(0.1)
+        assert client.breaker.state == "half_open", client.breaker.state
+        assert client.forecast("Paris", day)["degraded"]
+        trial.join()
+        assert client.breaker.state == "closed" and server.requests == threshold + 2, server.requests
+
+        # The live forecast replaced the degraded ones and is cached
+        forecast = client.forecast("Paris", day)
+        assert "degraded" not in forecast and server.requests == threshold + 2, forecast
+    finally:
+        server.stop()
+    print("circuit breaker checks: closed -> open -> half-open -> open/closed, degraded fallback OK")
+
+
+def check_malformed(threshold: int = 3):
+    """
+    A 200 with a broken body (invalid JSON, no "daily", truncated lists)
+    gets the degraded answer instead of an exception, and counts as a
+    failure towards opening the circuit.
+    """
+    server = StubWeatherServer(latency=0.01, malformed_rate=1.0).start()
+    client = WeatherClient(
+        base_url=server.url,
+        cache=ForecastCache(ttl=0),
+        retries=0,
+        breaker=CircuitBreaker(failure_threshold=threshold, reset_timeout=60.0),
+    )
+    day = date.today().isoformat()
+    try:
+        for attempt in range(threshold):
+            assert client.breaker.state == "closed", attempt
+            assert client.forecast("Paris", day)["degraded"]
+        assert server.malformed == threshold and client.stats["failures"] == threshold, client.cache_stats()
+        assert client.breaker.state == "open", client.breaker.state
+    finally:
+        server.stop()
+    print("malformed body checks: degraded answers, circuit opened")
+
+
+def run_scenario(name: str, faults: dict, lookups: int, latency: float, hedge: bool):
+    server = StubWeatherServer(latency=latency, **faults).start()
+    client = WeatherClient(
+        base_url=server.url,
+        cache=ForecastCache(ttl=0),
+        read_timeout=2.0,
+        backoff=0.05,
+        hedge=hedge,
+        breaker=CircuitBreaker(failure_threshold=5, reset_timeout=5.0),
+    )
+    day = date.today()
+    timings, degraded, errors = [], 0, 0
+    try:
+        for i in range(lookups):
+            start = time.perf_counter()
+            try:
+                forecast = client.forecast("Paris", (day + timedelta(days=i % 14)).isoformat())
+                degraded += bool(forecast.get("degraded"))
+            except WeatherError:
+                errors += 1
+            timings.append(time.perf_counter() - start)
+    finally:
+        server.stop()
+
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99]) * 1000
+    stats = client.cache_stats()
+    if not faults:
+        # One request per forecast plus one per hedge, over kept-alive
+        # connections: one, or two while a hedge overlaps its primary
+        assert stats["requests"] == server.requests == lookups + stats["hedges"], (stats, server.requests)
+        assert server.connections <= (2 if stats["hedges"] else 1), server.connections
+    print(f"{name:>14} hedge={'on ' if hedge else 'off'}: p50 {p50:6.0f}ms  p95 {p95:6.0f}ms  "
+          f"p99 {p99:6.0f}ms  max {max(timings) * 1000:6.0f}ms | "
+          f"{stats['requests']:3d} requests, {stats['retries']:3d} retries, {stats['hedges']:3d} hedges, "
+          f"{degraded:3d} degraded, {errors} errors, circuit {stats['circuit']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Weather client fault-injection benchmark")
+    parser.add_argument("--lookups", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.02, help="Normal stub API latency in seconds")
+    parser.add_argument("--scenario", choices=list(SCENARIOS), help="Run one scenario only")
+    args = parser.parse_args()
+
+    check_hedging()
+    check_breaker()
+    check_malformed()
+    names = [args.scenario] if args.scenario else list(SCENARIOS)
+    for name in names:
+        for hedge in (False, True):
+            run_scenario(name, SCENARIOS[name], args.lookups, args.latency, hedge)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""Persistent booking storage shared by every agent process."""
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from data.inventory_ledger import SoldOut
+
+BOOKINGS_PATH = Path(os.getenv("BOOKINGS_DB_PATH", Path(__file__).parent / "bookings.sqlite"))
+
+COLUMNS = (
+    "booking_id", "booking_type", "items", "customer_name",
+    "customer_email", "total_price", "status", "created_at",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bookings (
+    booking_id TEXT PRIMARY KEY,
+    booking_type TEXT NOT NULL,
+    items TEXT NOT NULL,
+    customer_name TEXT NOT NULL COLLATE NOCASE,
+    customer_email TEXT NOT NULL COLLATE NOCASE,
+    total_price REAL NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bookings_by_email ON bookings (customer_email, created_at);
+CREATE INDEX IF NOT EXISTS bookings_by_name ON bookings (customer_name, created_at);
+CREATE INDEX IF NOT EXISTS bookings_by_created ON bookings (created_at);
+CREATE TABLE IF NOT EXISTS reservations (
+    kind TEXT NOT NULL,
+    resource_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    booking_id TEXT NOT NULL REFERENCES bookings (booking_id)
+);
+CREATE INDEX IF NOT EXISTS reservations_by_resource ON reservations (kind, resource_id, day);
+"""
+
+# Statements are constant strings so each connection's statement cache
+# prepares them once
+INSERT_SQL = f"INSERT INTO bookings ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+SELECT_BY_ID_SQL = f"SELECT {', '.join(COLUMNS)} FROM bookings WHERE booking_id = ?"
+SELECT_BY_CUSTOMER_SQL = (
+    f"SELECT {', '.join(COLUMNS)} FROM bookings WHERE customer_email = ? "
+    f"UNION ALL SELECT {', '.join(COLUMNS)} FROM bookings WHERE customer_name = ? AND customer_email != ? "
+    "ORDER BY created_at DESC LIMIT ?"
+)
+COUNT_BY_CUSTOMER_SQL = "SELECT COUNT(*) FROM bookings WHERE customer_email = ? OR customer_name = ?"
+INSERT_RESERVATION_SQL = "INSERT INTO reservations VALUES (?, ?, ?, ?, ?)"
+RESERVED_SQL = "SELECT COALESCE(SUM(quantity), 0) FROM reservations WHERE kind = ? AND resource_id = ? AND day = ?"
+
+
+def _row(booking: Dict) -> tuple:
+    return tuple(
+        json.dumps(booking[column]) if column == "items" else booking[column]
+        for column in COLUMNS
+    )
+
+
+def _booking(row: tuple) -> Dict:
+    booking = dict(zip(COLUMNS, row))
+    booking["items"] = json.loads(booking["items"])
+    return booking
+
+
+class BookingStore:
+    """
+    Bookings in a SQLite database in WAL mode.
+
+    Readers use one connection per thread and never block the writer.
+    Writes from every thread are handed to a single writer thread, which
+    inserts whatever is queued in one transaction (group commit), so many
+    concurrent writers share each fsync instead of contending for the
+    write lock. add() returns once its booking is committed. Other
+    processes opening the same file are serialized by SQLite's locking
+    and wait up to busy_timeout seconds for the write lock.
+
+    Each commit takes the write lock before reading (BEGIN IMMEDIATE), so
+    capacity checks on reservations see every process's bookings and no
+    other writer can interleave between a check and its insert.
+    """
+
+    def __init__(self, path: Path = BOOKINGS_PATH, batch_size: int = 512, busy_timeout: float = 30.0):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.busy_timeout = busy_timeout
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.close()
+
+        self._local = threading.local()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="booking-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), timeout=self.busy_timeout, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def add(
+        self,
+        booking: Dict,
+        reservations: Dict[Tuple[str, str, str], int] = None,
+        capacities: Dict[Tuple[str, str, str], int] = None,
+    ):
+        """
+        Store one booking; raises sqlite3.IntegrityError if its ID exists.
+
+        reservations maps (kind, resource_id, day) to the seats or rooms
+        the booking takes; they are committed with it. If capacities gives
+        a key's total seats or rooms, the booking is only stored when its
+        reservation fits next to the stored ones, and raises SoldOut
+        otherwise.
+        """
+        reservation_rows = [
+            (*key, quantity, booking["booking_id"]) for key, quantity in (reservations or {}).items()
+        ]
+        self._write([_row(booking)], reservation_rows, capacities or {})
+
+    def add_many(self, bookings: Iterable[Dict]):
+        """Store bookings in the next commit and wait until it is durable."""
+        self._write([_row(b) for b in bookings], [], {})
+
+    def _write(self, rows: List[tuple], reservation_rows: List[tuple], capacities: Dict):
+        future = Future()
+        self._queue.put((rows, reservation_rows, capacities, future))
+        future.result()
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            if batch[0] is None:
+                break
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+            self._commit(conn, batch)
+        conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, batch: List):
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                errors = [self._insert(conn, *write[:3]) for write in batch]
+        except sqlite3.Error:
+            # One bad write (e.g. a duplicate ID) must not fail the others
+            # queued with it, so retry each write in its own transaction
+            for rows, reservation_rows, capacities, future in batch:
+                try:
+                    with conn:
+                        conn.execute("BEGIN IMMEDIATE")
+                        error = self._insert(conn, rows, reservation_rows, capacities)
+                except sqlite3.Error as e:
+                    future.set_exception(e)
+                else:
+                    self._resolve(future, error)
+            return
+        for write, error in zip(batch, errors):
+            self._resolve(write[3], error)
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, rows: List[tuple], reservation_rows: List[tuple], capacities: Dict):
+        """Insert one write, or return SoldOut without inserting if a reservation does not fit."""
+        for kind, resource_id, day, quantity, _ in reservation_rows:
+            capacity = capacities.get((kind, resource_id, day))
+            if capacity is None:
+                continue
+            left = capacity - conn.execute(RESERVED_SQL, (kind, resource_id, day)).fetchone()[0]
+            if left < quantity:
+                return SoldOut((kind, resource_id, day), quantity, max(left, 0))
+        conn.executemany(INSERT_SQL, rows)
+        conn.executemany(INSERT_RESERVATION_SQL, reservation_rows)
+        return None
+
+    @staticmethod
+    def _resolve(future: Future, error: Optional[Exception]):
+        if error is None:
+            future.set_result(None)
+        else:
+            future.set_exception(error)
+
+    def get(self, booking_id: str) -> Optional[Dict]:
+        row = self._reader().execute(SELECT_BY_ID_SQL, (booking_id,)).fetchone()
+        return _booking(row) if row else None
+
+    def find_by_customer(self, customer: str, limit: int = 10) -> List[Dict]:
+        """Most recent bookings whose customer email or name matches (case-insensitive)."""
+        rows = self._reader().execute(SELECT_BY_CUSTOMER_SQL, (customer, customer, customer, limit)).fetchall()
+        return [_booking(row) for row in rows]
+
+    def count_by_customer(self, customer: str) -> int:
+        return self._reader().execute(COUNT_BY_CUSTOMER_SQL, (customer, customer)).fetchone()[0]
+
+    def reserved(self, kind: str, resource_id: str, day: str) -> int:
+        """Seats or rooms of a resource taken by stored bookings on a day."""
+        return self._reader().execute(RESERVED_SQL, (kind, resource_id, day)).fetchone()[0]
+
+    def close(self):
+        """Flush pending writes and stop the writer thread."""
+        self._queue.put(None)
+        self._writer.join()
+
+
+def idempotency_key(conversation_id: str, booking_type: str, items: Any, customer_email: str, customer_name: str) -> str:
+    """Derive a booking's idempotency key from the conversation, items and customer."""
+    payload = json.dumps(
+        [conversation_id, booking_type.lower(), items, customer_email.strip().lower(), customer_name.strip().lower()],
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class IdempotencyIndex:
+    """
+    Bounded map from idempotency key to the result of the first call.
+
+    A repeated call within `ttl` seconds gets the first call's result in
+    O(1) instead of running again; a call arriving while the first is
+    still running waits for it. Results that report an error are not
+    kept, so the call can be retried. The least recently used keys are
+    dropped beyond max_entries.
+    """
+
+    def __init__(self, ttl: float = 3600.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = {"suppressed": 0, "entries": 0}
+        self._entries: "OrderedDict[str, List]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def run(self, key: str, func: Callable[[], Dict]) -> Tuple[Dict, int]:
+        """Return (result, duplicates suppressed for this key)."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                entry[2] += 1
+                self.stats["suppressed"] += 1
+                future, duplicates = entry[1], entry[2]
+            else:
+                future = Future()
+                # [created, result, duplicates suppressed]
+                self._entries[key] = [now, future, 0]
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                self.stats["entries"] = len(self._entries)
+                duplicates = None
+
+        if duplicates is not None:
+            return future.result(), duplicates
+
+        try:
+            result = func()
+        except BaseException as e:
+            self._forget(key, future)
+            future.set_exception(e)
+            raise
+        if "error" in result:
+            self._forget(key, future)
+        future.set_result(result)
+        return result, 0
+
+    def _forget(self, key: str, future: Future):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is future:
+                del self._entries[key]
+            self.stats["entries"] = len(self._entries)
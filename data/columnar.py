@@ -0,0 +1,35 @@
+"""Helpers for serving inventory indexes from (memory-mapped) Arrow tables."""
+from typing import Callable, List, Union
+
+import numpy as np
+import pyarrow as pa
+
+
+def column_array(table: pa.Table, name: str) -> pa.Array:
+    """Return a column as a single Arrow array (zero-copy unless chunked)."""
+    column = table.column(name)
+    return column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+
+
+def column_numpy(table: pa.Table, name: str) -> np.ndarray:
+    """Zero-copy numpy view of a primitive column (a copy only if chunked)."""
+    return column_array(table, name).to_numpy(zero_copy_only=False)
+
+
+def column_reader(array: pa.Array) -> Callable[[Union[slice, np.ndarray]], List]:
+    """Return a function that materializes a slice or index array of a column as Python values."""
+    if pa.types.is_dictionary(array.type):
+        codes = array.indices.to_numpy(zero_copy_only=False)
+        values = array.dictionary.to_numpy(zero_copy_only=False)
+        return lambda rows: values[codes[rows]].tolist()
+
+    if pa.types.is_string(array.type) or pa.types.is_large_string(array.type):
+        # Unique strings stay in the Arrow buffers instead of a per-process object array
+        def read(rows):
+            if isinstance(rows, slice):
+                return array.slice(rows.start, rows.stop - rows.start).to_pylist()
+            return array.take(pa.array(rows, type=pa.int64())).to_pylist()
+        return read
+
+    values = array.to_numpy(zero_copy_only=False)
+    return lambda rows: values[rows].tolist()
@@ -0,0 +1,257 @@
+"""In-memory flight inventory index used by the flight search tools."""
+import re
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from data.columnar import column_array, column_numpy, column_reader
+
+FLIGHT_COLUMNS = [
+    "flight_id",
+    "airline",
+    "origin",
+    "destination",
+    "departure_date",
+    "departure_time",
+    "arrival_time",
+    "duration",
+    "price",
+    "stops",
+    "class",
+]
+
+# Seats on each dated flight; kept for capacity checks, not returned by searches
+CAPACITY_COLUMN = "seats"
+
+# Low-cardinality columns stored dictionary-encoded (pandas categoricals)
+CATEGORICAL_COLUMNS = [
+    "airline",
+    "departure_date",
+    "departure_time",
+    "arrival_time",
+    "duration",
+    "class",
+]
+
+
+def parse_day(value: str) -> int:
+    """Convert a YYYY-MM-DD string to a day number (days since epoch)."""
+    try:
+        return int(np.datetime64(value, "D").astype(np.int64))
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD") from None
+
+
+def format_day(day: int) -> str:
+    """Convert a day number back to a YYYY-MM-DD string."""
+    return str(np.datetime64(int(day), "D"))
+
+
+def parse_clock(value: str) -> int:
+    """Convert an HH:MM clock time to minutes after midnight."""
+    hours, minutes = value.split("+")[0].split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def parse_duration(value: str) -> int:
+    """Convert a duration such as '7h 30m' to minutes."""
+    match = re.fullmatch(r"\s*(?:(\d+)h)?\s*(?:(\d+)m)?\s*", value)
+    if not match or not any(match.groups()):
+        raise ValueError(f"Invalid duration '{value}'")
+    hours, minutes = match.groups()
+    return int(hours or 0) * 60 + int(minutes or 0)
+
+
+def _category_map(series: pd.Series, parse) -> np.ndarray:
+    """Apply a parser to each distinct value of a column and map it back to every row."""
+    categorical = series.astype("category").cat
+    parsed = np.array([parse(v) for v in categorical.categories], dtype=np.int64)
+    return parsed[categorical.codes.to_numpy()]
+
+
+def build_flight_table(df: pd.DataFrame) -> pa.Table:
+    """
+    Normalize a flights DataFrame into the Arrow table FlightIndex serves from.
+
+    Airport codes are upper-cased and share one dictionary, low-cardinality
+    columns are dictionary-encoded, absolute departure/arrival times are
+    precomputed, and rows are sorted by route and then departure time.
+    Each flight's seats are kept alongside for capacity checks. The
+    result can be written to disk and memory-mapped back without any
+    further processing.
+    """
+    df = df[FLIGHT_COLUMNS + [CAPACITY_COLUMN]].copy()
+    df[CAPACITY_COLUMN] = df[CAPACITY_COLUMN].astype(np.int64)
+    for col in ("origin", "destination"):
+        df[col] = df[col].astype(str).str.upper()
+    airports = sorted(set(df["origin"].unique()) | set(df["destination"].unique()))
+    for col in ("origin", "destination"):
+        df[col] = pd.Categorical(df[col], categories=airports)
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype("category")
+
+    days = _category_map(df["departure_date"], parse_day)
+    departures = days * 24 * 60 + _category_map(df["departure_time"], parse_clock)
+    df["_day"] = days
+    df["_departs"] = departures
+    df["_arrives"] = departures + _category_map(df["duration"], parse_duration)
+
+    # Sort by route, then by absolute departure time within the route
+    order = np.lexsort((
+        departures,
+        df["destination"].cat.codes.to_numpy(),
+        df["origin"].cat.codes.to_numpy(),
+    ))
+    df = df.take(order).reset_index(drop=True)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    return table.replace_schema_metadata({"layout": "flight_index/v2"}).combine_chunks()
+
+
+class FlightIndex:
+    """
+    Dated flight inventory sorted by route with an (origin, destination) index.
+
+    The index serves directly from a table laid out by build_flight_table,
+    which may be memory-mapped from disk: numeric and dictionary-code
+    columns are used as numpy views over the Arrow buffers, so processes
+    mapping the same file share one page-cached copy.
+
+    Rows are sorted so every route occupies one contiguous row range, and
+    within a route rows are partitioned by departure date, so a dated lookup
+    is a dict hit plus a binary search. Results are materialized column-wise
+    rather than row by row. Origin and destination share one airport
+    dictionary so their codes can be used interchangeably, and absolute
+    departure and arrival times (minutes since epoch) are kept per row for
+    the routing engine.
+    """
+
+    def __init__(self, data: Union[pa.Table, pd.DataFrame]):
+        if isinstance(data, pd.DataFrame):
+            data = build_flight_table(data)
+
+        self.table = data
+        self._readers = {col: column_reader(column_array(data, col)) for col in FLIGHT_COLUMNS}
+
+        origin = column_array(data, "origin")
+        self.airports = origin.dictionary.to_numpy(zero_copy_only=False)
+        self.origin_codes = origin.indices.to_numpy(zero_copy_only=False)
+        self.destination_codes = column_array(data, "destination").indices.to_numpy(zero_copy_only=False)
+
+        # Day number of every row, used to binary search the date partitions
+        self.days = column_numpy(data, "_day")
+        self.departures = column_numpy(data, "_departs")
+        self.arrivals = column_numpy(data, "_arrives")
+        self.prices = column_numpy(data, "price")
+        self.seat_counts = column_numpy(data, CAPACITY_COLUMN)
+        self._by_flight: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+        self.routes: Dict[Tuple[str, str], Tuple[int, int]] = self._build_routes()
+
+    def _build_routes(self) -> Dict[Tuple[str, str], Tuple[int, int]]:
+        """Map each (origin, destination) pair to its [start, stop) row range."""
+        if not len(self):
+            return {}
+
+        keys = (
+            self.origin_codes.astype(np.int64) * len(self.airports)
+            + self.destination_codes.astype(np.int64)
+        )
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        stops = np.r_[starts[1:], len(keys)]
+
+        origin_values = self.airports[self.origin_codes[starts]]
+        destination_values = self.airports[self.destination_codes[starts]]
+
+        return {
+            (o, d): (int(start), int(stop))
+            for o, d, start, stop in zip(origin_values, destination_values, starts, stops)
+        }
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    def _route_range(self, origin: str, destination: str) -> Tuple[int, int]:
+        return self.routes.get((origin.upper(), destination.upper()), (0, 0))
+
+    def _date_range(self, start: int, stop: int, first_day: int, last_day: int) -> Tuple[int, int]:
+        """Narrow a route's row range to departures between two days (inclusive)."""
+        days = self.days[start:stop]
+        lo = start + int(np.searchsorted(days, first_day, side="left"))
+        hi = start + int(np.searchsorted(days, last_day, side="right"))
+        return lo, hi
+
+    def records(self, rows) -> List[Dict]:
+        """Materialize the rows selected by a slice or an index array."""
+        if not isinstance(rows, slice):
+            rows = np.asarray(rows, dtype=np.int64)
+        columns = [self._readers[col](rows) for col in FLIGHT_COLUMNS]
+        return [dict(zip(FLIGHT_COLUMNS, row)) for row in zip(*columns)]
+
+    def seats(self, flight_id: str, departure_date: str) -> Optional[int]:
+        """Seats on a flight on a date, or None if it does not operate that day."""
+        if self._by_flight is None:
+            # Rows ordered by (flight_id, day), built on the first lookup
+            ids = column_array(self.table, "flight_id").to_numpy(zero_copy_only=False).astype(str)
+            order = np.lexsort((self.days, ids))
+            self._by_flight = (ids[order], self.days[order], order)
+        ids, days, order = self._by_flight
+        lo = int(np.searchsorted(ids, flight_id, side="left"))
+        hi = int(np.searchsorted(ids, flight_id, side="right"))
+        day = parse_day(departure_date)
+        row = lo + int(np.searchsorted(days[lo:hi], day))
+        if row == hi or days[row] != day:
+            return None
+        return int(self.seat_counts[order[row]])
+
+    def search(self, origin: str, destination: str, departure_date: Optional[str] = None) -> List[Dict]:
+        """Return the flights for a route, optionally on one date, as plain dicts."""
+        start, stop = self._route_range(origin, destination)
+        if departure_date is not None and start != stop:
+            day = parse_day(departure_date)
+            start, stop = self._date_range(start, stop, day, day)
+        if start == stop:
+            return []
+        return self.records(slice(start, stop))
+
+    def fare_calendar(self, origin: str, destination: str, departure_date: str, window_days: int) -> List[Dict]:
+        """
+        Return the cheapest fare for each day within +/- window_days of a date.
+
+        Days without any departure are omitted.
+        """
+        day = parse_day(departure_date)
+        start, stop = self._route_range(origin, destination)
+        if start != stop:
+            start, stop = self._date_range(start, stop, day - window_days, day + window_days)
+        if start == stop:
+            return []
+
+        days = self.days[start:stop]
+        prices = self.prices[start:stop]
+
+        # Rows are sorted by day, so each day is one contiguous group. Sorting
+        # by (day, price) keeps the groups in place and puts each day's
+        # cheapest flight first.
+        group_starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+        group_sizes = np.diff(np.r_[group_starts, len(days)])
+        cheapest = start + np.lexsort((prices, days))[group_starts]
+
+        return [
+            {
+                "date": format_day(d),
+                "cheapest_price": price,
+                "flight_id": flight_id,
+                "airline": airline,
+                "options": options,
+            }
+            for d, price, flight_id, airline, options in zip(
+                days[group_starts].tolist(),
+                self.prices[cheapest].tolist(),
+                self._readers["flight_id"](cheapest),
+                self._readers["airline"](cheapest),
+                group_sizes.tolist(),
+            )
+        ]
@@ -1,42 +1,103 @@
+from datetime import date, timedelta
+from typing import Optional
+
 import pandas as pd
 
+# One-way (base_price, duration_minutes); every route is also flown in reverse
+ROUTES = {
+    ("JFK", "LHR"): (650, 7 * 60),
+    ("LAX", "NRT"): (850, 11 * 60 + 30),
+    ("SFO", "CDG"): (750, 10 * 60 + 45),
+    ("JFK", "CDG"): (700, 7 * 60 + 25),
+    ("LAX", "JFK"): (300, 5 * 60 + 30),
+    ("SFO", "JFK"): (320, 5 * 60 + 35),
+    ("SFO", "LAX"): (120, 90),
+    ("LHR", "CDG"): (150, 75),
+    ("LHR", "NRT"): (900, 13 * 60 + 45),
+    ("CDG", "NRT"): (880, 13 * 60 + 30),
+    ("LHR", "BKK"): (700, 11 * 60 + 30),
+    ("CDG", "BKK"): (720, 11 * 60 + 45),
+    ("NRT", "BKK"): (400, 6 * 60 + 45),
+}
+
+DEPARTURE_TIMES = ["08:00", "13:15", "19:40"]
+
+# Seats on short-haul (under SHORT_HAUL_MINUTES) and long-haul aircraft
+SHORT_HAUL_MINUTES = 4 * 60
+SHORT_HAUL_SEATS = 180
+LONG_HAUL_SEATS = 300
+
+
+def format_duration(minutes: int) -> str:
+    return f"{minutes // 60}h {minutes % 60:02d}m"
+
+
+def arrival_time(departure_time: str, duration_minutes: int) -> str:
+    """Local arrival clock time, suffixed with +N when it lands N days later."""
+    hours, minutes = map(int, departure_time.split(":"))
+    total = hours * 60 + minutes + duration_minutes
+    days, total = divmod(total, 24 * 60)
+    clock = f"{total // 60:02d}:{total % 60:02d}"
+    return f"{clock}+{days}" if days else clock
+
+
+def generate_flights_df(start_date: Optional[date] = None, days: int = 90):
+    """
+    Generate a dated flight schedule.
 
-def generate_flights_df():
-    routes = [
-        ("JFK", "LHR"),
-        ("LAX", "NRT"),
-        ("SFO", "CDG"),
-        ("JFK", "CDG"),
-    ]
+    Every scheduled flight operates once per day from start_date (today by
+    default) for the given number of days; fares vary by day of week and
+    a simple demand cycle. Each row is a single non-stop leg, connections
+    are assembled by the routing engine.
+    """
+    start_date = start_date or date.today()
 
     airlines = ["Delta", "United", "American", "British Airways", "Air France"]
-    base_prices = {
-        ("JFK", "LHR"): 650,
-        ("LAX", "NRT"): 850,
-        ("SFO", "CDG"): 750,
-        ("JFK", "CDG"): 700,
-    }
 
-    flights_data = []
+    routes = []
+    for (origin, destination), (base_price, duration) in ROUTES.items():
+        routes.append((origin, destination, base_price, duration))
+        routes.append((destination, origin, base_price, duration))
+
+    schedule = []
     flight_counter = 1
 
-    for origin, destination in routes:
-        base_price = base_prices.get((origin, destination), 500)
-        for i, airline in enumerate(airlines[:3]):
-            flights_data.append({
+    for r, (origin, destination, base_price, duration) in enumerate(routes):
+        for i, departure_time in enumerate(DEPARTURE_TIMES):
+            schedule.append({
                 "flight_id": f"FL{flight_counter:03d}",
-                "airline": airline,
+                "airline": airlines[(r + i) % len(airlines)],
                 "origin": origin,
                 "destination": destination,
-                "departure_time": "08:00" if i == 0 else f"{10 + i * 2}:00",
-                "arrival_time": "20:30" if i == 0 else f"{22 + i * 2}:30",
-                "duration": "7h 30m",
+                "departure_time": departure_time,
+                "arrival_time": arrival_time(departure_time, duration),
+                "duration": format_duration(duration),
                 "price": base_price + (i * 50),
-                "stops": 0 if i == 0 else 1,
-                "class": "Economy"
+                "stops": 0,
+                "class": "Economy",
+                "seats": SHORT_HAUL_SEATS if duration < SHORT_HAUL_MINUTES else LONG_HAUL_SEATS,
             })
             flight_counter += 1
 
+    flights_data = []
+    for day in range(days):
+        departure_date = start_date + timedelta(days=day)
+        # Friday and Sunday departures are in higher demand
+        weekday_factor = 1.15 if departure_date.weekday() in (4, 6) else 1.0
+        for i, flight in enumerate(schedule):
+            demand_factor = 1 + 0.05 * ((day * 3 + i) % 5)
+            flights_data.append({
+                **flight,
+                "departure_date": departure_date.isoformat(),
+                "price": round(flight["price"] * weekday_factor * demand_factor),
+            })
+
     return pd.DataFrame(flights_data)
 
-FLIGHTS_DF = generate_flights_df()
\ No newline at end of file
+
+def __getattr__(name):
+    # FLIGHTS_DF is built on first access rather than at import
+    if name == "FLIGHTS_DF":
+        globals()[name] = generate_flights_df()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
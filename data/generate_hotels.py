@@ -37,10 +37,17 @@ def generate_hotels_df():
                 "rating": 4.0 + (i * 0.3),
                 "price_per_night": base_price + (i * 30),
                 "amenities": ",".join(amenities_list[i]),
+                "rooms": 120 - i * 30,
             }
             hotels_data.append(hotel)
             hotel_counter += 1
 
     return pd.DataFrame(hotels_data)
 
-HOTELS_DF = generate_hotels_df()
\ No newline at end of file
+
+def __getattr__(name):
+    # HOTELS_DF is built on first access rather than at import
+    if name == "HOTELS_DF":
+        globals()[name] = generate_hotels_df()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,189 @@
+"""
+Generate a synthetic flight and hotel inventory at production scale.
+
+The tables are written in the layout the search indexes serve from, as
+Arrow IPC files that the tools memory-map at startup.
+
+Usage:
+    python -m data.generate_inventory --airports 500 --routes 5000 --days 365 \
+        --cities 200 --hotels-per-city 50 --seed 42
+"""
+import argparse
+import itertools
+import string
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data.flight_index import build_flight_table
+from data.generate_flights import LONG_HAUL_SEATS, ROUTES, SHORT_HAUL_MINUTES, SHORT_HAUL_SEATS, format_duration
+from data.hotel_index import build_hotel_table
+from data.inventory_store import FLIGHTS_FILE, HOTELS_FILE, INVENTORY_DIR, write_table
+from data.weather_data import CITY_COORDS
+
+AIRLINES = ["Delta", "United", "American", "British Airways", "Air France", "Lufthansa", "ANA", "Emirates"]
+AMENITIES = ["WiFi", "Breakfast", "Gym", "Pool", "Spa", "Parking", "Restaurant", "Airport Shuttle"]
+HOTEL_PREFIXES = ["Grand", "Sunset", "Downtown", "Royal", "Harbor", "Park", "City", "Garden"]
+HOTEL_SUFFIXES = ["Hotel", "Plaza", "Resort", "Inn", "Suites", "Lodge"]
+
+
+def _airport_codes(count: int) -> np.ndarray:
+    """The demo airports first, then synthetic three-letter codes."""
+    codes = list(dict.fromkeys(code for route in ROUTES for code in route))
+    for letters in itertools.product(string.ascii_uppercase, repeat=3):
+        if len(codes) >= count:
+            break
+        code = "".join(letters)
+        if code not in codes:
+            codes.append(code)
+    return np.array(codes[:count])
+
+
+def _route_pairs(airports: int, routes: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Directed (origin, destination) pairs for a hub-and-spoke network: hubs
+    are fully connected and spokes are linked to random hubs both ways.
+    """
+    hubs = max(2, min(airports, airports // 10))
+    pairs = [(a, b) for a in range(hubs) for b in range(hubs) if a != b]
+    rng.shuffle(pairs)
+    pairs = pairs[:routes]
+
+    seen = set(pairs)
+    spokes = airports - hubs
+    for attempt in range(routes * 20):
+        if len(pairs) >= routes or not spokes:
+            break
+        spoke = hubs + attempt % spokes
+        hub = int(rng.integers(hubs))
+        if (spoke, hub) not in seen:
+            seen.update({(spoke, hub), (hub, spoke)})
+            pairs.extend([(spoke, hub), (hub, spoke)])
+    return np.array(pairs[:routes])
+
+
+def generate_flights(
+    airports: int,
+    routes: int,
+    airlines: int,
+    flights_per_route: int,
+    days: int,
+    seed: int,
+    start_date: str = None,
+) -> pd.DataFrame:
+    """Generate a dated schedule with the columns of generate_flights_df."""
+    rng = np.random.default_rng(seed)
+    codes = _airport_codes(airports)
+    pairs = _route_pairs(len(codes), routes, rng)
+    airline_names = np.array((AIRLINES + [f"Airline {i}" for i in range(airlines)])[:airlines])
+
+    # One scheduled flight per (route, slot), operated every day
+    scheduled = len(pairs) * flights_per_route
+    route = np.repeat(np.arange(len(pairs)), flights_per_route)
+    route_duration = rng.integers(45, 15 * 60, len(pairs)) // 5 * 5
+    duration = route_duration[route]
+    departure = rng.integers(0, 24 * 60 // 5, scheduled) * 5
+    base_price = (60 + route_duration * 0.9).astype(np.int64)[route] + rng.integers(0, 150, scheduled)
+    airline = rng.integers(0, len(airline_names), scheduled)
+    seats = np.where(duration < SHORT_HAUL_MINUTES, SHORT_HAUL_SEATS, LONG_HAUL_SEATS)
+    flight_ids = np.char.add("FL", np.char.zfill(np.arange(1, scheduled + 1).astype(str), len(str(scheduled))))
+
+    start = np.datetime64(start_date or pd.Timestamp.today().date().isoformat(), "D")
+    dates = start + np.arange(days)
+    flight = np.tile(np.arange(scheduled), days)
+    day = np.repeat(np.arange(days), scheduled)
+
+    # Friday and Sunday departures are in higher demand
+    weekday = (dates.astype(np.int64) + 3) % 7
+    weekday_factor = np.where(np.isin(weekday, (4, 6)), 1.15, 1.0)
+    demand_factor = 1 + 0.05 * ((day * 3 + flight) % 5)
+
+    clock = np.array([f"{m // 60:02d}:{m % 60:02d}" for m in range(24 * 60)])
+    durations = np.array([format_duration(m) for m in range(24 * 60)])
+    arrival = departure[flight] + duration[flight]
+    arrival_clock = np.char.add(
+        clock[arrival % (24 * 60)],
+        np.where(arrival >= 24 * 60, np.char.add("+", (arrival // (24 * 60)).astype(str)), "")
+    )
+
+    return pd.DataFrame({
+        "flight_id": flight_ids[flight],
+        "airline": airline_names[airline[flight]],
+        "origin": codes[pairs[route[flight], 0]],
+        "destination": codes[pairs[route[flight], 1]],
+        "departure_date": dates.astype(str)[day],
+        "departure_time": clock[departure[flight]],
+        "arrival_time": arrival_clock,
+        "duration": durations[duration[flight]],
+        "price": np.round(base_price[flight] * weekday_factor[day] * demand_factor).astype(np.int64),
+        "stops": 0,
+        "class": "Economy",
+        "seats": seats[flight],
+    })
+
+
+def generate_hotels(cities: int, hotels_per_city: int, seed: int) -> pd.DataFrame:
+    """Generate hotels with the columns of generate_hotels_df."""
+    rng = np.random.default_rng(seed + 1)
+    names = list(CITY_COORDS) + [f"City {i:03d}" for i in range(max(0, cities - len(CITY_COORDS)))]
+    city_names = np.array(names[:cities])
+
+    rows = len(city_names) * hotels_per_city
+    city = np.repeat(np.arange(len(city_names)), hotels_per_city)
+    rating = np.round(rng.uniform(3.0, 5.0, rows), 1)
+    city_price = rng.integers(60, 250, len(city_names))
+    price = np.round(city_price[city] * (0.6 + (rating - 3.0) * 0.5) + rng.integers(0, 40, rows))
+
+    # WiFi everywhere, other amenities more likely at better-rated hotels
+    has = rng.random((rows, len(AMENITIES))) < (0.2 + (rating[:, None] - 3.0) * 0.3)
+    has[:, 0] = True
+    amenities = [",".join(a for a, h in zip(AMENITIES, row) if h) for row in has]
+
+    prefix = np.array(HOTEL_PREFIXES)[rng.integers(0, len(HOTEL_PREFIXES), rows)]
+    suffix = np.array(HOTEL_SUFFIXES)[rng.integers(0, len(HOTEL_SUFFIXES), rows)]
+    width = len(str(rows))
+
+    return pd.DataFrame({
+        "hotel_id": [f"HT{i:0{width}d}" for i in range(1, rows + 1)],
+        "name": [f"{p} {c} {s}" for p, c, s in zip(prefix, city_names[city], suffix)],
+        "city": city_names[city],
+        "rating": rating,
+        "price_per_night": price,
+        "amenities": amenities,
+        "rooms": rng.integers(20, 300, rows),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic travel inventory")
+    parser.add_argument("--airports", type=int, default=200)
+    parser.add_argument("--routes", type=int, default=2000)
+    parser.add_argument("--airlines", type=int, default=5)
+    parser.add_argument("--flights-per-route", type=int, default=3)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--start-date", help="First departure date (default: today)")
+    parser.add_argument("--cities", type=int, default=50)
+    parser.add_argument("--hotels-per-city", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=INVENTORY_DIR)
+    parser.add_argument("--parquet", action="store_true", help="Also write Parquet copies")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    flights = generate_flights(
+        args.airports, args.routes, args.airlines, args.flights_per_route,
+        args.days, args.seed, args.start_date
+    )
+    path = write_table(build_flight_table(flights), args.output, FLIGHTS_FILE, args.parquet)
+    print(f"✓ {len(flights):,} flights written to {path} ({time.perf_counter() - start:.1f}s)")
+
+    start = time.perf_counter()
+    hotels = generate_hotels(args.cities, args.hotels_per_city, args.seed)
+    path = write_table(build_hotel_table(hotels), args.output, HOTELS_FILE, args.parquet)
+    print(f"✓ {len(hotels):,} hotels written to {path} ({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
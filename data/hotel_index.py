@@ -0,0 +1,202 @@
+"""In-memory hotel inventory index used by the hotel search tool."""
+import heapq
+import json
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from data.columnar import column_array, column_numpy, column_reader
+
+SORT_OPTIONS = ("price", "rating", "value")
+
+# Amenities are bits of an int64 mask; the sign bit is left unused
+MAX_AMENITIES = 63
+
+
+def build_hotel_table(df: pd.DataFrame) -> pa.Table:
+    """
+    Normalize a hotels DataFrame into the Arrow table HotelIndex serves from.
+
+    Rows are sorted by normalized city, amenities are encoded as bitmasks
+    (the vocabulary is kept in the schema metadata), and each city's rows
+    are presorted by price (ascending) and rating (descending). Each
+    hotel's rooms are kept for capacity checks.
+    """
+    df = df.copy()
+    df["city_key"] = df["city"].str.strip().str.lower()
+    df = df.sort_values("city_key", kind="stable").reset_index(drop=True)
+
+    split_amenities = [
+        [a.strip() for a in value.split(",") if a.strip()]
+        for value in df["amenities"].fillna("")
+    ]
+    amenities = sorted({a for row in split_amenities for a in row}, key=str.lower)
+    if len(amenities) > MAX_AMENITIES:
+        raise ValueError(f"{len(amenities)} distinct amenities; the amenity mask holds at most {MAX_AMENITIES}")
+    bits = {a.lower(): 1 << i for i, a in enumerate(amenities)}
+
+    prices = df["price_per_night"].to_numpy(dtype=np.float64)
+    ratings = df["rating"].to_numpy(dtype=np.float64).round(1)
+
+    # Row order within each city range, presorted once per ranking
+    keys = df["city_key"].to_numpy()
+    by_price = np.arange(len(df), dtype=np.int64)
+    by_rating = np.arange(len(df), dtype=np.int64)
+    if len(keys):
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        for start, stop in zip(starts, np.r_[starts[1:], len(keys)]):
+            rows = np.arange(start, stop)
+            by_price[start:stop] = rows[np.lexsort((-ratings[rows], prices[rows]))]
+            by_rating[start:stop] = rows[np.lexsort((prices[rows], -ratings[rows]))]
+
+    table = pa.table({
+        "hotel_id": df["hotel_id"].astype(str),
+        "name": df["name"].astype(str),
+        "city": pd.Categorical(df["city"]),
+        "city_key": pd.Categorical(df["city_key"]),
+        "rating": ratings,
+        "price_per_night": prices,
+        "amenity_mask": np.array(
+            [sum(bits[a.lower()] for a in row) for row in split_amenities],
+            dtype=np.int64
+        ),
+        "rooms": df["rooms"].to_numpy(dtype=np.int64),
+        "_by_price": by_price,
+        "_by_rating": by_rating,
+    })
+    return table.replace_schema_metadata({
+        "layout": "hotel_index/v2",
+        "amenities": json.dumps(amenities),
+    })
+
+
+class HotelIndex:
+    """
+    Hotel inventory grouped by city with presorted rankings.
+
+    Serves from a table laid out by build_hotel_table, which may be
+    memory-mapped from disk. Each city is one contiguous row range; a
+    search filters that range with vectorized masks (amenities are
+    bitmasks) and walks the presorted order, so the top-k never needs a
+    full sort.
+    """
+
+    def __init__(self, data: Union[pa.Table, pd.DataFrame]):
+        if isinstance(data, pd.DataFrame):
+            data = build_hotel_table(data)
+
+        self.table = data
+        self.amenities: List[str] = json.loads(data.schema.metadata[b"amenities"])
+        self.amenity_bits = {a.lower(): 1 << i for i, a in enumerate(self.amenities)}
+
+        self._hotel_ids = column_reader(column_array(data, "hotel_id"))
+        self._names = column_reader(column_array(data, "name"))
+        self._city_names = column_reader(column_array(data, "city"))
+        self.prices = column_numpy(data, "price_per_night")
+        self.ratings = column_numpy(data, "rating")
+        self.amenity_masks = column_numpy(data, "amenity_mask")
+        self.by_price = column_numpy(data, "_by_price")
+        self.by_rating = column_numpy(data, "_by_rating")
+        self.room_counts = column_numpy(data, "rooms")
+        self._rows_by_id: Optional[Dict[str, int]] = None
+
+        city_keys = column_array(data, "city_key")
+        codes = city_keys.indices.to_numpy(zero_copy_only=False)
+        names = city_keys.dictionary.to_numpy(zero_copy_only=False)
+        self.cities: Dict[str, Tuple[int, int]] = {}
+        if len(codes):
+            starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+            stops = np.r_[starts[1:], len(codes)]
+            self.cities = {names[codes[s]]: (int(s), int(e)) for s, e in zip(starts, stops)}
+
+    def amenity_mask(self, amenities: Iterable[str]) -> Optional[int]:
+        """Combine amenity names into a bitmask, or None if one is unknown."""
+        mask = 0
+        for amenity in amenities:
+            bit = self.amenity_bits.get(amenity.strip().lower())
+            if bit is None:
+                return None
+            mask |= bit
+        return mask
+
+    def rooms(self, hotel_id: str) -> Optional[int]:
+        """Rooms of a hotel, or None if there is no such hotel."""
+        if self._rows_by_id is None:
+            # Built on the first lookup
+            ids = column_array(self.table, "hotel_id").to_pylist()
+            self._rows_by_id = {hotel_id: row for row, hotel_id in enumerate(ids)}
+        row = self._rows_by_id.get(hotel_id)
+        return None if row is None else int(self.room_counts[row])
+
+    def records(self, rows: List[int]) -> List[Dict]:
+        """Materialize hotel rows as plain dicts."""
+        rows = np.asarray(rows, dtype=np.int64)
+        return [
+            {
+                "hotel_id": hotel_id,
+                "name": name,
+                "city": city,
+                "rating": rating,
+                "price_per_night": price,
+                "amenities": [a for a in self.amenities if mask & self.amenity_bits[a.lower()]],
+            }
+            for hotel_id, name, city, rating, price, mask in zip(
+                self._hotel_ids(rows),
+                self._names(rows),
+                self._city_names(rows),
+                self.ratings[rows].tolist(),
+                self.prices[rows].tolist(),
+                self.amenity_masks[rows].tolist(),
+            )
+        ]
+
+    def search(
+        self,
+        city: str,
+        max_price: Optional[float] = None,
+        min_rating: Optional[float] = None,
+        required_amenities: Optional[List[str]] = None,
+        sort_by: str = "price",
+        limit: Optional[int] = None,
+    ) -> Tuple[List[Dict], int]:
+        """
+        Return (top hotels, number of matches) for a city.
+
+        sort_by is "price" (cheapest first), "rating" (best first) or
+        "value" (highest rating per dollar).
+        """
+        if sort_by not in SORT_OPTIONS:
+            raise ValueError(f"Invalid sort_by '{sort_by}', expected one of {', '.join(SORT_OPTIONS)}")
+
+        start, stop = self.cities.get(city.strip().lower(), (0, 0))
+        if start == stop:
+            return [], 0
+
+        matches = np.ones(stop - start, dtype=bool)
+        if max_price is not None:
+            matches &= self.prices[start:stop] <= max_price
+        if min_rating is not None:
+            matches &= self.ratings[start:stop] >= min_rating
+        if required_amenities:
+            required = self.amenity_mask(required_amenities)
+            if required is None:
+                return [], 0
+            matches &= (self.amenity_masks[start:stop] & required) == required
+
+        total = int(matches.sum())
+        limit = total if limit is None else max(0, limit)
+
+        if sort_by == "value":
+            candidates = start + np.flatnonzero(matches)
+            rows = heapq.nlargest(
+                limit,
+                candidates.tolist(),
+                key=lambda r: self.ratings[r] / max(self.prices[r], 1.0)
+            )
+        else:
+            order = (self.by_price if sort_by == "price" else self.by_rating)[start:stop]
+            rows = order[matches[order - start]][:limit].tolist()
+
+        return self.records(rows), total
@@ -0,0 +1,273 @@
+"""Seat and room availability with atomic holds."""
+import heapq
+import itertools
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# (kind, resource_id, day): ("flight", flight_id, departure_date) or
+# ("hotel", hotel_id, night)
+Key = Tuple[str, str, str]
+
+
+class SoldOut(Exception):
+    """Not enough seats or rooms left for a hold."""
+
+    def __init__(self, key: Key, requested: int, available: int):
+        self.key = key
+        self.requested = requested
+        self.available = available
+        kind, resource_id, day = key
+        unit = "seats" if kind == "flight" else "rooms"
+        super().__init__(
+            f"Only {available} {unit} left on {resource_id} for {day}, {requested} requested"
+        )
+
+
+class HoldExpired(Exception):
+    """The hold expired or was released before it was confirmed."""
+
+
+def _day(value: Any) -> date:
+    try:
+        return date.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+
+def _quantity(value: Any, name: str) -> int:
+    try:
+        quantity = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {name} '{value}', expected a whole number")
+    if quantity < 1:
+        raise ValueError(f"Invalid {name} '{value}', expected at least 1")
+    return quantity
+
+
+def reservation_quantities(items: Any, today: Optional[date] = None) -> Dict[Key, int]:
+    """
+    Seats and rooms that booked items take.
+
+    Walks the (possibly nested) items for flights ({"flight_id",
+    "departure_date", "passengers"}) and hotel stays ({"hotel_id",
+    "check_in", "check_out", "rooms"}), e.g. the legs of an itinerary.
+    Raises ValueError for a flight or stay without valid dates, dates
+    before today, or bookings with neither.
+    """
+    today = today or date.today()
+    quantities: Dict[Key, int] = {}
+
+    def walk(item, passengers: int, rooms: int):
+        # passengers/rooms given on an item apply to everything inside it
+        if isinstance(item, list):
+            for value in item:
+                walk(value, passengers, rooms)
+            return
+        if not isinstance(item, dict):
+            return
+        count = item.get("passengers", item.get("seats"))
+        if count is not None:
+            passengers = _quantity(count, "passengers")
+        if item.get("rooms") is not None:
+            rooms = _quantity(item["rooms"], "rooms")
+
+        if item.get("flight_id"):
+            if not (item.get("departure_date") or item.get("date")):
+                raise ValueError(f"Flight {item['flight_id']} needs a departure_date")
+            day = _day(item.get("departure_date") or item["date"])
+            if day < today:
+                raise ValueError(f"Departure date {day} of flight {item['flight_id']} is in the past")
+            key = ("flight", str(item["flight_id"]), day.isoformat())
+            quantities[key] = quantities.get(key, 0) + passengers
+        elif item.get("hotel_id"):
+            if not (item.get("check_in") and item.get("check_out")):
+                raise ValueError(f"Hotel {item['hotel_id']} needs check_in and check_out dates")
+            check_in = _day(item["check_in"])
+            check_out = _day(item["check_out"])
+            if check_in < today:
+                raise ValueError(f"Check-in date {check_in} at hotel {item['hotel_id']} is in the past")
+            if check_out <= check_in:
+                raise ValueError(f"Check-out date {check_out} must be after check-in date {check_in}")
+            for night in range((check_out - check_in).days):
+                key = ("hotel", str(item["hotel_id"]), (check_in + timedelta(days=night)).isoformat())
+                quantities[key] = quantities.get(key, 0) + rooms
+
+        for value in item.values():
+            if isinstance(value, (list, dict)):
+                walk(value, passengers, rooms)
+
+    walk(items, 1, 1)
+    if not quantities:
+        raise ValueError("Nothing to book: items need a flight_id or hotel_id")
+    return quantities
+
+
+class _Hold:
+    __slots__ = ("quantities", "expires_at", "state")
+
+    def __init__(self, quantities: Dict[Key, int], expires_at: float):
+        self.quantities = quantities
+        self.expires_at = expires_at
+        self.state = "held"
+
+
+class InventoryLedger:
+    """
+    Seats per dated flight and rooms per hotel night held by bookings in
+    progress in this process.
+
+    Holds are sharded over `stripes` locks by key, so bookings for
+    different flights and hotels proceed in parallel. A hold takes every
+    key it needs at once: it locks their stripes in a fixed order (no
+    deadlocks), checks that each key's capacity covers the open holds plus
+    the request, and records it, or takes nothing. A hold is then
+    confirmed (its booking is stored and takes the seats from now on) or
+    released. Holds not confirmed within their ttl expire and are
+    released by the next hold or availability check. A hold's state is
+    only changed under its keys' stripe locks, so confirm, release and
+    expiry cannot race.
+
+    capacity(key) is read under the stripe lock on every hold rather than
+    cached, so it can subtract what stored bookings take, including those
+    made by other processes. It raises ValueError for unknown keys.
+    """
+
+    def __init__(
+        self,
+        capacity: Callable[[Key], int],
+        hold_ttl: float = 900.0,
+        stripes: int = 64,
+    ):
+        self.capacity = capacity
+        self.hold_ttl = hold_ttl
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._held: List[Dict[Key, int]] = [{} for _ in range(stripes)]
+        self._holds: Dict[str, _Hold] = {}
+        self._hold_ids = itertools.count(1)
+        self._expiry: List[Tuple[float, str]] = []
+        self._expiry_lock = threading.Lock()
+        self.stats = {"holds": 0, "confirmed": 0, "released": 0, "expired": 0, "sold_out": 0}
+        self._stats_lock = threading.Lock()
+
+    def _stripe(self, key: Key) -> int:
+        return hash(key) % len(self._locks)
+
+    def _count(self, field: str):
+        with self._stats_lock:
+            self.stats[field] += 1
+
+    def _locked(self, keys) -> List[threading.Lock]:
+        stripes = sorted({self._stripe(key) for key in keys})
+        for stripe in stripes:
+            self._locks[stripe].acquire()
+        return [self._locks[stripe] for stripe in reversed(stripes)]
+
+    @staticmethod
+    def _unlock(locks: List[threading.Lock]):
+        for lock in locks:
+            lock.release()
+
+    def _available(self, key: Key) -> int:
+        # Caller holds the key's stripe lock
+        return self.capacity(key) - self._held[self._stripe(key)].get(key, 0)
+
+    def _take(self, key: Key, quantity: int):
+        # Caller holds the key's stripe lock; a negative quantity returns seats
+        held = self._held[self._stripe(key)]
+        held[key] = held.get(key, 0) + quantity
+        if not held[key]:
+            del held[key]
+
+    def available(self, key: Key) -> int:
+        self.expire_holds()
+        locks = self._locked([key])
+        try:
+            return self._available(key)
+        finally:
+            self._unlock(locks)
+
+    def hold(self, quantities: Dict[Key, int], ttl: Optional[float] = None) -> str:
+        """Take all requested seats/rooms atomically; raises SoldOut if any is short."""
+        if any(quantity < 1 for quantity in quantities.values()):
+            raise ValueError("Quantities must be at least 1")
+        self.expire_holds()
+        locks = self._locked(quantities)
+        try:
+            for key, quantity in quantities.items():
+                left = self._available(key)
+                if left < quantity:
+                    self._count("sold_out")
+                    raise SoldOut(key, quantity, left)
+            for key, quantity in quantities.items():
+                self._take(key, quantity)
+
+            hold_id = f"H{next(self._hold_ids)}"
+            expires_at = time.monotonic() + (self.hold_ttl if ttl is None else ttl)
+            self._holds[hold_id] = _Hold(dict(quantities), expires_at)
+        finally:
+            self._unlock(locks)
+
+        with self._expiry_lock:
+            heapq.heappush(self._expiry, (expires_at, hold_id))
+        self._count("holds")
+        return hold_id
+
+    def confirm(self, hold_id: str):
+        """
+        Close a hold whose booking was stored; raises HoldExpired if it is
+        no longer held.
+        """
+        hold = self._holds.get(hold_id)
+        if hold is None:
+            raise HoldExpired(f"Hold {hold_id} expired or was released")
+        locks = self._locked(hold.quantities)
+        try:
+            # A hold past its expiry that has not been swept yet still has
+            # its seats, so confirming it is consistent
+            if hold.state != "held":
+                raise HoldExpired(f"Hold {hold_id} expired or was released")
+            for key, quantity in hold.quantities.items():
+                self._take(key, -quantity)
+            hold.state = "confirmed"
+            del self._holds[hold_id]
+        finally:
+            self._unlock(locks)
+        self._count("confirmed")
+
+    def release(self, hold_id: str) -> bool:
+        """Return a hold's seats/rooms; False if it was not held anymore."""
+        return self._end(hold_id, "released", only_expired=False)
+
+    def _end(self, hold_id: str, state: str, only_expired: bool) -> bool:
+        hold = self._holds.get(hold_id)
+        if hold is None:
+            return False
+        locks = self._locked(hold.quantities)
+        try:
+            if only_expired and time.monotonic() < hold.expires_at:
+                return False
+            return self._return(hold_id, hold, state)
+        finally:
+            self._unlock(locks)
+
+    def _return(self, hold_id: str, hold: _Hold, state: str) -> bool:
+        # Caller holds the hold's stripe locks
+        if hold.state != "held":
+            return False
+        for key, quantity in hold.quantities.items():
+            self._take(key, -quantity)
+        hold.state = state
+        self._holds.pop(hold_id, None)
+        self._count(state)
+        return True
+
+    def expire_holds(self) -> int:
+        """Return the seats/rooms of holds past their expiry."""
+        now = time.monotonic()
+        expired = []
+        with self._expiry_lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                expired.append(heapq.heappop(self._expiry)[1])
+        return sum(self._end(hold_id, "expired", only_expired=True) for hold_id in expired)
@@ -0,0 +1,216 @@
+"""On-disk inventory files shared by every agent process."""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data.flight_index import FlightIndex
+from data.hotel_index import HotelIndex
+from data.routing import RoutePlanner
+
+logger = logging.getLogger(__name__)
+
+INVENTORY_DIR = Path(os.getenv("INVENTORY_DIR", Path(__file__).parent / "inventory"))
+FLIGHTS_FILE = "flights"
+HOTELS_FILE = "hotels"
+
+
+def write_table(table: pa.Table, directory: Path, name: str, parquet: bool = False) -> Path:
+    """
+    Write an index table as an Arrow IPC file (and optionally Parquet).
+
+    The Arrow file is uncompressed so it can be memory-mapped and served
+    zero-copy; Parquet is only written as an interchange copy.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{name}.arrow"
+    tmp_path = path.with_suffix(".arrow.tmp")
+    with pa.OSFile(str(tmp_path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+    if parquet:
+        pq.write_table(table, directory / f"{name}.parquet")
+    return path
+
+
+def open_table(directory: Path, name: str) -> Optional[pa.Table]:
+    """
+    Open an index table from disk, or return None if it was never generated.
+
+    Arrow files are memory-mapped: the returned table references the OS
+    page cache, so every process opening the same file shares one copy.
+    Parquet has to be decoded and is read into process memory.
+    """
+    arrow_path = directory / f"{name}.arrow"
+    if arrow_path.exists():
+        return pa.ipc.open_file(pa.memory_map(str(arrow_path), "r")).read_all()
+
+    parquet_path = directory / f"{name}.parquet"
+    if parquet_path.exists():
+        return pq.read_table(parquet_path, memory_map=True)
+
+    return None
+
+
+def load_flight_index(directory: Path = INVENTORY_DIR) -> FlightIndex:
+    """Serve flights from the generated inventory, or the built-in demo schedule."""
+    table = open_table(directory, FLIGHTS_FILE)
+    if table is None:
+        from data.generate_flights import generate_flights_df
+        return FlightIndex(generate_flights_df())
+    return FlightIndex(table)
+
+
+def load_hotel_index(directory: Path = INVENTORY_DIR) -> HotelIndex:
+    """Serve hotels from the generated inventory, or the built-in demo hotels."""
+    table = open_table(directory, HOTELS_FILE)
+    if table is None:
+        from data.generate_hotels import generate_hotels_df
+        return HotelIndex(generate_hotels_df())
+    return HotelIndex(table)
+
+
+@dataclass(frozen=True)
+class InventorySnapshot:
+    """An immutable, internally consistent version of the inventory."""
+    version: int
+    flights: FlightIndex
+    routes: RoutePlanner
+    hotels: HotelIndex
+    # (mtime_ns, size) of each source file, None for the built-in demo data
+    sources: Dict[str, Optional[Tuple[int, int]]]
+
+
+def _file_state(directory: Path, name: str) -> Optional[Tuple[int, int]]:
+    for suffix in (".arrow", ".parquet"):
+        path = directory / f"{name}{suffix}"
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        return stat.st_mtime_ns, stat.st_size
+    return None
+
+
+def _resident_mb() -> float:
+    """Resident set size of this process in MB (0 where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        return 0.0
+
+
+class InventoryLoader:
+    """
+    Serves the current inventory snapshot and swaps in new ones without a restart.
+
+    Tool calls read `current` once and use that snapshot for the whole call,
+    so they always see one consistent version. A reload builds the new
+    indexes off to the side (only for files that changed; unchanged tables
+    are reused) and publishes the snapshot with a single reference
+    assignment. Readers never take a lock; reloads are serialized.
+
+    Since the generator replaces files with a rename, snapshots still
+    mapping the previous file keep reading its old contents until they are
+    dropped.
+    """
+
+    def __init__(self, directory: Path = INVENTORY_DIR, poll_interval: float = 5.0):
+        self.directory = Path(directory)
+        self.poll_interval = poll_interval
+        self.last_reload: Dict = {}
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._snapshot: Optional[InventorySnapshot] = None
+        self.reload()
+
+    @property
+    def current(self) -> InventorySnapshot:
+        return self._snapshot
+
+    def _changed(self, snapshot: Optional[InventorySnapshot]) -> Dict[str, Optional[Tuple[int, int]]]:
+        states = {name: _file_state(self.directory, name) for name in (FLIGHTS_FILE, HOTELS_FILE)}
+        if snapshot is None:
+            return states
+        return {name: state for name, state in states.items() if state != snapshot.sources.get(name)}
+
+    def reload(self, force: bool = False) -> InventorySnapshot:
+        """Build and publish a new snapshot if any source file changed."""
+        with self._reload_lock:
+            old = self._snapshot
+            changed = self._changed(None if force else old)
+            if old is not None and not changed:
+                return old
+
+            rss_before = _resident_mb()
+            start = time.perf_counter()
+
+            flights, routes = (old.flights, old.routes) if old else (None, None)
+            if FLIGHTS_FILE in changed or flights is None:
+                flights = load_flight_index(self.directory)
+                routes = RoutePlanner(flights)
+            hotels = old.hotels if old and HOTELS_FILE not in changed else load_hotel_index(self.directory)
+
+            snapshot = InventorySnapshot(
+                version=old.version + 1 if old else 1,
+                flights=flights,
+                routes=routes,
+                hotels=hotels,
+                sources={**(old.sources if old else {}), **changed},
+            )
+            self._snapshot = snapshot
+
+            self.last_reload = {
+                "version": snapshot.version,
+                "reloaded": sorted(changed),
+                "seconds": round(time.perf_counter() - start, 3),
+                # Both snapshots are alive at this point, so this is the swap overhead
+                "memory_overhead_mb": round(_resident_mb() - rss_before, 1),
+                "flights": len(flights),
+                "hotels": hotels.table.num_rows,
+            }
+            logger.info("Inventory snapshot %(version)s loaded in %(seconds)ss "
+                        "(+%(memory_overhead_mb)sMB): %(reloaded)s", self.last_reload)
+            return snapshot
+
+    def request_reload(self, force: bool = True) -> threading.Thread:
+        """Reload in a background thread (e.g. from a SIGHUP handler)."""
+        thread = threading.Thread(target=self._safe_reload, args=(force,), name="inventory-reload", daemon=True)
+        thread.start()
+        return thread
+
+    def _safe_reload(self, force: bool = False):
+        try:
+            self.reload(force)
+        except Exception:
+            # Keep serving the previous snapshot if the new files are unreadable
+            logger.exception("Inventory reload failed, keeping version %s", self._snapshot.version)
+
+    def start_watching(self):
+        """Poll the inventory directory and reload whenever a file changes."""
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="inventory-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            if self._changed(self._snapshot):
+                self._safe_reload()
@@ -0,0 +1,199 @@
+"""Multi-leg itinerary search over the dated flight inventory."""
+import heapq
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from data.flight_index import FlightIndex, format_day, parse_day
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def _format_minutes(minutes: int) -> str:
+    return f"{minutes // 60}h {minutes % 60:02d}m"
+
+
+def _format_timestamp(minutes: int) -> str:
+    day, minute = divmod(int(minutes), MINUTES_PER_DAY)
+    return f"{format_day(day)} {minute // 60:02d}:{minute % 60:02d}"
+
+
+class RoutePlanner:
+    """
+    Finds the k best itineraries between two airports, including connections.
+
+    The search runs on a time-expanded view of the schedule: every dated leg
+    is a node, and a leg arriving at an airport connects to the departures
+    on each onward route that leave between min_connection and
+    max_connection minutes later. Those departures are found by binary
+    search in the route's row range of the FlightIndex, so the graph is never
+    materialized.
+
+    Itineraries are enumerated with Dijkstra where each leg may be settled
+    up to k times (k shortest paths on a DAG, since time only moves
+    forward). Onward routes are pruned to airports that can still reach the
+    destination within the remaining leg budget. All times are treated as
+    being in one time zone.
+    """
+
+    def __init__(
+        self,
+        index: FlightIndex,
+        min_connection: int = 60,
+        max_connection: int = 12 * 60,
+        max_legs: int = 3,
+    ):
+        self.index = index
+        self.min_connection = min_connection
+        self.max_connection = max_connection
+        self.max_legs = max_legs
+
+        self.airport_codes = {name: code for code, name in enumerate(index.airports)}
+
+        # airport code -> [(next airport code, start, stop)], and the reverse
+        # adjacency used to compute hop distances to a destination
+        self.outbound: Dict[int, List[Tuple[int, int, int]]] = defaultdict(list)
+        self.inbound: Dict[int, List[int]] = defaultdict(list)
+        for (origin, destination), (start, stop) in index.routes.items():
+            o, d = self.airport_codes[origin], self.airport_codes[destination]
+            self.outbound[o].append((d, start, stop))
+            self.inbound[d].append(o)
+
+    def _hops_to(self, destination: int, max_hops: int) -> Dict[int, int]:
+        """Breadth-first hop distance from every airport to the destination."""
+        hops = {destination: 0}
+        frontier = [destination]
+        for depth in range(1, max_hops + 1):
+            next_frontier = []
+            for airport in frontier:
+                for previous in self.inbound.get(airport, ()):
+                    if previous not in hops:
+                        hops[previous] = depth
+                        next_frontier.append(previous)
+            frontier = next_frontier
+        return hops
+
+    def find_itineraries(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        k: int = 5,
+        sort_by: str = "price",
+        max_legs: Optional[int] = None,
+    ) -> List[Dict]:
+        """
+        Return up to k itineraries departing on departure_date.
+
+        sort_by is "price" (sum of leg fares) or "duration" (first departure
+        to final arrival, including layovers).
+        """
+        if sort_by not in ("price", "duration"):
+            raise ValueError(f"Invalid sort_by '{sort_by}', expected 'price' or 'duration'")
+
+        day = parse_day(departure_date)
+        source = self.airport_codes.get(origin.upper())
+        target = self.airport_codes.get(destination.upper())
+        if source is None or target is None or source == target:
+            return []
+
+        max_legs = max_legs or self.max_legs
+        hops = self._hops_to(target, max_legs)
+        if source not in hops:
+            return []
+
+        index = self.index
+        departures = index.departures
+        arrivals = index.arrivals
+        prices = index.prices
+        by_price = sort_by == "price"
+
+        # Labels are partial itineraries: (row, parent label, leg count, first departure)
+        labels: List[Tuple[int, int, int, int]] = []
+        heap: List[Tuple[int, int]] = []
+
+        def push(cost: int, row: int, parent: int, legs: int, first_departure: int):
+            labels.append((row, parent, legs, first_departure))
+            heapq.heappush(heap, (cost, len(labels) - 1))
+
+        for next_airport, start, stop in self.outbound.get(source, ()):
+            if hops.get(next_airport, max_legs) > max_legs - 1:
+                continue
+            lo = start + int(np.searchsorted(index.days[start:stop], day, side="left"))
+            hi = start + int(np.searchsorted(index.days[start:stop], day, side="right"))
+            for row in range(lo, hi):
+                cost = prices[row] if by_price else arrivals[row] - departures[row]
+                push(int(cost), row, -1, 1, int(departures[row]))
+
+        results = []
+        settled: Dict[int, int] = defaultdict(int)
+
+        while heap and len(results) < k:
+            cost, label_id = heapq.heappop(heap)
+            row, _, legs, first_departure = labels[label_id]
+            if settled[row] >= k:
+                continue
+            settled[row] += 1
+
+            airport = int(index.destination_codes[row])
+            if airport == target:
+                results.append((cost, label_id))
+                continue
+
+            remaining = max_legs - legs
+            if remaining <= 0:
+                continue
+
+            visited = self._path_airports(labels, label_id)
+            ready = arrivals[row] + self.min_connection
+            latest = arrivals[row] + self.max_connection
+            for next_airport, start, stop in self.outbound.get(airport, ()):
+                if next_airport in visited or hops.get(next_airport, max_legs) > remaining - 1:
+                    continue
+                window = departures[start:stop]
+                lo = start + int(np.searchsorted(window, ready, side="left"))
+                hi = start + int(np.searchsorted(window, latest, side="right"))
+                for next_row in range(lo, hi):
+                    if by_price:
+                        next_cost = cost + int(prices[next_row])
+                    else:
+                        next_cost = int(arrivals[next_row]) - first_departure
+                    push(next_cost, next_row, label_id, legs + 1, first_departure)
+
+        return [self._itinerary(labels, label_id) for _, label_id in results]
+
+    def _path_rows(self, labels, label_id: int) -> List[int]:
+        rows = []
+        while label_id != -1:
+            row, label_id, _, _ = labels[label_id]
+            rows.append(row)
+        return rows[::-1]
+
+    def _path_airports(self, labels, label_id: int) -> set:
+        rows = self._path_rows(labels, label_id)
+        airports = {int(self.index.destination_codes[row]) for row in rows}
+        airports.add(int(self.index.origin_codes[rows[0]]))
+        return airports
+
+    def _itinerary(self, labels, label_id: int) -> Dict:
+        rows = self._path_rows(labels, label_id)
+        index = self.index
+        legs = index.records(rows)
+
+        layovers = [
+            f"{legs[i]['destination']} {_format_minutes(int(index.departures[rows[i + 1]] - index.arrivals[rows[i]]))}"
+            for i in range(len(rows) - 1)
+        ]
+        departure = int(index.departures[rows[0]])
+        arrival = int(index.arrivals[rows[-1]])
+
+        return {
+            "legs": legs,
+            "stops": len(rows) - 1,
+            "layovers": layovers,
+            "departure": _format_timestamp(departure),
+            "arrival": _format_timestamp(arrival),
+            "total_duration": _format_minutes(arrival - departure),
+            "price": int(index.prices[rows].sum()),
+        }
@@ -0,0 +1,420 @@
+"""Conversation checkpoints in SQLite, so sessions survive restarts and can be resumed."""
+import asyncio
+import os
+import random
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    copy_checkpoint,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+SESSIONS_PATH = Path(os.getenv("SESSIONS_DB_PATH", Path(__file__).parent / "sessions.sqlite"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    parent_id TEXT,
+    type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS logs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, position)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value BLOB,
+    task_path TEXT NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+INSERT_CHECKPOINT_SQL = "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+INSERT_BLOB_SQL = "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)"
+INSERT_LOG_SQL = "INSERT OR REPLACE INTO logs VALUES (?, ?, ?, ?, ?, ?)"
+INSERT_WRITE_SQL = "INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+REPLACE_WRITE_SQL = "INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+SELECT_CHECKPOINT_SQL = (
+    "SELECT checkpoint_id, parent_id, type, checkpoint, metadata_type, metadata FROM checkpoints "
+    "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?"
+)
+SELECT_LATEST_SQL = (
+    "SELECT checkpoint_id, parent_id, type, checkpoint, metadata_type, metadata FROM checkpoints "
+    "WHERE thread_id = ? AND checkpoint_ns = ? ORDER BY checkpoint_id DESC LIMIT 1"
+)
+SELECT_BLOB_SQL = "SELECT type, value FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?"
+SELECT_LOG_SQL = (
+    "SELECT type, value FROM logs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? ORDER BY position"
+)
+SELECT_WRITES_SQL = (
+    "SELECT task_id, idx, channel, type, value FROM writes "
+    "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx"
+)
+# Stored in place of an append-only channel's value: its length in the log
+LOG_TYPE = "log"
+
+
+class _Session:
+    """Cached state of one (thread, namespace): its append logs and latest checkpoint."""
+
+    def __init__(self):
+        self.logs: Dict[str, List[Any]] = {}
+        self.latest: Optional[CheckpointTuple] = None
+        # (task_id, idx) -> (task_id, channel, value), for the latest checkpoint
+        self.pending_writes: Dict[Tuple[str, int], Tuple[str, str, Any]] = {}
+
+
+class SessionCheckpointer(BaseCheckpointSaver[str]):
+    """
+    LangGraph checkpointer keeping conversation checkpoints in SQLite.
+
+    Like LangGraph's own savers, a checkpoint only stores the channels that
+    changed. Channels in append_channels (the message history) are written
+    as an append-only log: each step stores just the messages added since
+    the last one, and a checkpoint records how long the log was. A value
+    that does not extend the log (e.g. after going back to an earlier
+    checkpoint) is stored whole instead.
+
+    The logs and latest checkpoint of up to max_sessions recently used
+    sessions are kept in memory, so a turn of a hot session reads nothing
+    from disk. A session must only be served by one process at a time.
+    """
+
+    def __init__(
+        self,
+        path: Path = SESSIONS_PATH,
+        max_sessions: int = 1000,
+        append_channels: Sequence[str] = ("messages",),
+        busy_timeout: float = 30.0,
+    ):
+        super().__init__()
+        self.path = Path(path)
+        self.max_sessions = max_sessions
+        self.append_channels = frozenset(append_channels)
+        self.busy_timeout = busy_timeout
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = self._connect()
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.RLock()
+        self._sessions: "OrderedDict[Tuple[str, str], _Session]" = OrderedDict()
+        self.stats = {"hot": 0, "cold": 0, "appended": 0, "rewritten": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), timeout=self.busy_timeout, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # A crash of the process loses nothing; a power failure may lose the last steps
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _session(self, thread_id: str, checkpoint_ns: str) -> _Session:
+        # Caller holds the lock
+        key = (thread_id, checkpoint_ns)
+        session = self._sessions.get(key)
+        if session is None:
+            session = self._sessions[key] = _Session()
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        self._sessions.move_to_end(key)
+        return session
+
+    def _log(self, session: _Session, thread_id: str, checkpoint_ns: str, channel: str) -> List[Any]:
+        log = session.logs.get(channel)
+        if log is None:
+            rows = self._conn.execute(SELECT_LOG_SQL, (thread_id, checkpoint_ns, channel)).fetchall()
+            log = session.logs[channel] = [self.serde.loads_typed(row) for row in rows]
+        return log
+
+    def _load_values(
+        self, session: _Session, thread_id: str, checkpoint_ns: str, versions: ChannelVersions
+    ) -> Dict[str, Any]:
+        values = {}
+        for channel, version in versions.items():
+            row = self._conn.execute(SELECT_BLOB_SQL, (thread_id, checkpoint_ns, channel, version)).fetchone()
+            if row is None or row[0] == "empty":
+                continue
+            if row[0] == LOG_TYPE:
+                values[channel] = self._log(session, thread_id, checkpoint_ns, channel)[:int(row[1])]
+            else:
+                values[channel] = self.serde.loads_typed(row)
+        return values
+
+    def _tuple(self, session: _Session, thread_id: str, checkpoint_ns: str, row: tuple) -> CheckpointTuple:
+        checkpoint_id, parent_id, checkpoint_type, checkpoint, metadata_type, metadata = row
+        checkpoint = self.serde.loads_typed((checkpoint_type, checkpoint))
+        checkpoint["channel_values"] = self._load_values(
+            session, thread_id, checkpoint_ns, checkpoint["channel_versions"]
+        )
+        return CheckpointTuple(
+            config=_config(thread_id, checkpoint_ns, checkpoint_id),
+            checkpoint=checkpoint,
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            parent_config=_config(thread_id, checkpoint_ns, parent_id) if parent_id else None,
+            pending_writes=list(self._writes(thread_id, checkpoint_ns, checkpoint_id).values()),
+        )
+
+    def _writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> Dict[Tuple[str, int], Tuple[str, str, Any]]:
+        rows = self._conn.execute(SELECT_WRITES_SQL, (thread_id, checkpoint_ns, checkpoint_id)).fetchall()
+        return {
+            (task_id, idx): (task_id, channel, self.serde.loads_typed((value_type, value)))
+            for task_id, idx, channel, value_type, value in rows
+        }
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        with self._lock:
+            session = self._session(thread_id, checkpoint_ns)
+            latest = session.latest
+            if latest is not None and checkpoint_id in (None, latest.config["configurable"]["checkpoint_id"]):
+                self.stats["hot"] += 1
+                return latest._replace(
+                    checkpoint=copy_checkpoint(latest.checkpoint),
+                    pending_writes=[session.pending_writes[key] for key in sorted(session.pending_writes)],
+                )
+            self.stats["cold"] += 1
+            if checkpoint_id:
+                row = self._conn.execute(SELECT_CHECKPOINT_SQL, (thread_id, checkpoint_ns, checkpoint_id)).fetchone()
+                return self._tuple(session, thread_id, checkpoint_ns, row) if row else None
+            row = self._conn.execute(SELECT_LATEST_SQL, (thread_id, checkpoint_ns)).fetchone()
+            if row is None:
+                return None
+            saved = self._tuple(session, thread_id, checkpoint_ns, row)
+            session.latest = saved._replace(checkpoint=copy_checkpoint(saved.checkpoint), pending_writes=None)
+            session.pending_writes = self._writes(thread_id, checkpoint_ns, saved.config["configurable"]["checkpoint_id"])
+            return saved
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """Checkpoints, newest first, of the configured thread (or all threads)."""
+        where, params = [], []
+        if config:
+            where.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if config["configurable"].get("checkpoint_ns") is not None:
+                where.append("checkpoint_ns = ?")
+                params.append(config["configurable"]["checkpoint_ns"])
+            if get_checkpoint_id(config):
+                where.append("checkpoint_id = ?")
+                params.append(get_checkpoint_id(config))
+        if before and get_checkpoint_id(before):
+            where.append("checkpoint_id < ?")
+            params.append(get_checkpoint_id(before))
+        sql = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_id, type, checkpoint, metadata_type, metadata "
+            f"FROM checkpoints {'WHERE ' + ' AND '.join(where) if where else ''} ORDER BY checkpoint_id DESC"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        for thread_id, checkpoint_ns, *row in rows:
+            if limit is not None and limit <= 0:
+                break
+            with self._lock:
+                # Listing does not make a session hot
+                session = self._sessions.get((thread_id, checkpoint_ns)) or _Session()
+                saved = self._tuple(session, thread_id, checkpoint_ns, tuple(row))
+            if filter and any(saved.metadata.get(key) != value for key, value in filter.items()):
+                continue
+            if limit is not None:
+                limit -= 1
+            yield saved
+
+    def _channel_rows(self, session: _Session, thread_id: str, checkpoint_ns: str, channel: str, version: str, value):
+        # (blob row, log rows) storing one channel's new version
+        if channel in self.append_channels and isinstance(value, list):
+            log = self._log(session, thread_id, checkpoint_ns, channel)
+            size = len(log)
+            if len(value) >= size and all(a is b or a == b for a, b in zip(value, log)):
+                rows = [
+                    (thread_id, checkpoint_ns, channel, position, *self.serde.dumps_typed(item))
+                    for position, item in enumerate(value[size:], size)
+                ]
+                log.extend(value[size:])
+                self.stats["appended"] += len(rows)
+                return (thread_id, checkpoint_ns, channel, version, LOG_TYPE, str(len(value))), rows
+            self.stats["rewritten"] += 1
+        return (thread_id, checkpoint_ns, channel, version, *self.serde.dumps_typed(value)), []
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        parent_id = config["configurable"].get("checkpoint_id")
+        values = checkpoint["channel_values"]
+        stored = {key: value for key, value in checkpoint.items() if key != "channel_values"}
+        metadata = get_checkpoint_metadata(config, metadata)
+        saved_config = _config(thread_id, checkpoint_ns, checkpoint["id"])
+        with self._lock:
+            session = self._session(thread_id, checkpoint_ns)
+            blob_rows, log_rows = [], []
+            for channel, version in new_versions.items():
+                if channel in values:
+                    blob_row, rows = self._channel_rows(
+                        session, thread_id, checkpoint_ns, channel, version, values[channel]
+                    )
+                    blob_rows.append(blob_row)
+                    log_rows.extend(rows)
+                else:
+                    blob_rows.append((thread_id, checkpoint_ns, channel, version, "empty", None))
+            try:
+                with self._conn:
+                    self._conn.executemany(INSERT_LOG_SQL, log_rows)
+                    self._conn.executemany(INSERT_BLOB_SQL, blob_rows)
+                    self._conn.execute(INSERT_CHECKPOINT_SQL, (
+                        thread_id, checkpoint_ns, checkpoint["id"], parent_id,
+                        *self.serde.dumps_typed(stored), *self.serde.dumps_typed(metadata),
+                    ))
+            except sqlite3.Error:
+                # The cached log may now be ahead of the database
+                self._sessions.pop((thread_id, checkpoint_ns), None)
+                raise
+            session.latest = CheckpointTuple(
+                saved_config,
+                copy_checkpoint(checkpoint),
+                metadata,
+                _config(thread_id, checkpoint_ns, parent_id) if parent_id else None,
+            )
+            session.pending_writes = {}
+        return saved_config
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows = [
+            (thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, idx),
+             channel, *self.serde.dumps_typed(value), task_path)
+            for idx, (channel, value) in enumerate(writes)
+        ]
+        # Special writes (errors, interrupts) replace earlier ones; others are written once
+        replace = all(channel in WRITES_IDX_MAP for channel, _ in writes)
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(REPLACE_WRITE_SQL if replace else INSERT_WRITE_SQL, rows)
+            session = self._sessions.get((thread_id, checkpoint_ns))
+            if session is None or session.latest is None:
+                return
+            if session.latest.config["configurable"]["checkpoint_id"] != checkpoint_id:
+                return
+            for row, (channel, value) in zip(rows, writes):
+                key = (task_id, row[4])
+                if replace or key not in session.pending_writes:
+                    session.pending_writes[key] = (task_id, channel, value)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            with self._conn:
+                for table in ("checkpoints", "blobs", "logs", "writes"):
+                    self._conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+            for key in [key for key in self._sessions if key[0] == thread_id]:
+                del self._sessions[key]
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        if current is None:
+            current_version = 0
+        elif isinstance(current, int):
+            current_version = current
+        else:
+            current_version = int(current.split(".")[0])
+        return f"{current_version + 1:032}.{random.random():016}"
+
+    # SQLite calls block, so the async methods run them in a worker thread
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ):
+        saved = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in saved:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _config(thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> RunnableConfig:
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}}
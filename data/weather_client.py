@@ -0,0 +1,342 @@
+"""Cached, connection-pooled client for the Open-Meteo forecast API."""
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from data.weather_data import CITY_COORDS, CLIMATOLOGY, WEATHER_MAPPING
+
+OPEN_METEO_URL = os.getenv("OPEN_METEO_URL", "https://api.open-meteo.com/v1/forecast")
+DAILY_FIELDS = "temperature_2m_max,temperature_2m_min,precipitation_sum,weathercode"
+
+
+class WeatherError(Exception):
+    """The forecast could not be fetched; the message is safe to show the user."""
+
+
+class WeatherUnavailable(WeatherError):
+    """The API is down, timing out or the circuit is open."""
+
+    def __init__(self, message: str = "Weather API request failed."):
+        super().__init__(message)
+
+
+def climatology_forecast(city: str, day: str) -> Dict:
+    """A degraded forecast from the city's monthly climate normals."""
+    temp_max, temp_min, precipitation = CLIMATOLOGY[city][date.fromisoformat(day).month - 1]
+    return {
+        "city": city,
+        "date": day,
+        "temp_max": f"{temp_max}°C",
+        "temp_min": f"{temp_min}°C",
+        "precipitation_mm": precipitation,
+        "condition": "Seasonal average (live forecast unavailable)",
+        "degraded": True
+    }
+
+
+class CircuitBreaker:
+    """
+    Fails fast while a dependency is unhealthy.
+
+    After failure_threshold consecutive failures the circuit opens and
+    calls are refused for reset_timeout seconds. Then a single trial call
+    is let through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                return True
+            # Open, or a half-open trial call is already in flight
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+class ForecastCache:
+    """
+    TTL + LRU cache of daily forecasts keyed by (city, date).
+
+    The in-memory tier holds up to max_entries forecasts, evicting the least
+    recently used. When a path is given, forecasts are also written to a
+    SQLite file so they survive restarts; a memory miss that hits the disk
+    tier is promoted back into memory. Expired entries count as misses.
+    """
+
+    def __init__(self, ttl: float = 3600.0, max_entries: int = 1024, path: Optional[Path] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path is not None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS forecasts ("
+                "city TEXT, date TEXT, fetched_at REAL, forecast TEXT, PRIMARY KEY (city, date))"
+            )
+            self._db.commit()
+
+    def get(self, city: str, day: str) -> Optional[Dict]:
+        key = (city, day)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return entry[1]
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT fetched_at, forecast FROM forecasts WHERE city = ? AND date = ?", key
+                ).fetchone()
+                if row is not None and now - row[0] < self.ttl:
+                    forecast = json.loads(row[1])
+                    self._remember(key, row[0], forecast)
+                    self.stats["disk_hits"] += 1
+                    return forecast
+
+            self.stats["misses"] += 1
+            return None
+
+    def put_many(self, city: str, forecasts: Dict[str, Dict]):
+        """Store forecasts for several dates of one city."""
+        now = time.time()
+        with self._lock:
+            for day, forecast in forecasts.items():
+                self._remember((city, day), now, forecast)
+            if self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO forecasts VALUES (?, ?, ?, ?)",
+                    [(city, day, now, json.dumps(forecast)) for day, forecast in forecasts.items()]
+                )
+                self._db.commit()
+
+    def _remember(self, key: Tuple[str, str], fetched_at: float, forecast: Dict):
+        self._entries[key] = (fetched_at, forecast)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class WeatherClient:
+    """
+    Fetches daily forecasts over a pooled HTTP session and caches them.
+
+    A date range is fetched with one request and fanned out into the cache
+    one entry per day, so later lookups for any day of the trip are hits.
+
+    Every request has connect/read timeouts. Timeouts, connection errors
+    and 429/5xx responses are retried up to `retries` times with full
+    jitter backoff; a 200 with a malformed body counts as a failure. With hedge=True, a second identical request is sent
+    when the first has not answered within the p95 of recent latencies,
+    and whichever answers first wins. Repeated failures open a circuit
+    breaker; while it is open (or after retries are exhausted) the client
+    answers immediately from climate normals, marked "degraded", and does
+    not cache them.
+    """
+
+    # Latency samples needed before the hedge delay follows the observed p95
+    HEDGE_MIN_SAMPLES = 20
+
+    def __init__(
+        self,
+        base_url: str = OPEN_METEO_URL,
+        cache: Optional[ForecastCache] = None,
+        pool_size: int = 10,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10.0,
+        retries: int = 2,
+        backoff: float = 0.2,
+        max_backoff: float = 2.0,
+        hedge: bool = False,
+        hedge_delay: float = 1.0,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.base_url = base_url
+        self.cache = cache if cache is not None else ForecastCache()
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge = hedge
+        self.default_hedge_delay = hedge_delay
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.stats = {"requests": 0, "retries": 0, "hedges": 0, "failures": 0, "fallbacks": 0}
+        self._stats_lock = threading.Lock()
+        self._latencies = deque(maxlen=200)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="weather") if hedge else None
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _count(self, field: str):
+        with self._stats_lock:
+            self.stats[field] += 1
+
+    def forecast(self, city: str, day: str) -> Dict:
+        """Return the forecast for one city and date."""
+        return self.forecast_range(city, day, day)[0]
+
+    def forecast_range(self, city: str, start_date: str, end_date: str) -> List[Dict]:
+        """Return one forecast per day from start_date to end_date inclusive."""
+        if city not in CITY_COORDS:
+            raise WeatherError(f"City '{city}' is not supported.")
+        try:
+            start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+        except ValueError:
+            raise WeatherError("Dates must be in YYYY-MM-DD format.")
+        if end < start:
+            raise WeatherError("end_date must not be before the start date.")
+
+        days = [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+        cached = {day: self.cache.get(city, day) for day in days}
+        missing = [day for day, forecast in cached.items() if forecast is None]
+        if missing:
+            # One request covering every missing day
+            try:
+                fetched = self._fetch(city, missing[0], missing[-1])
+            except WeatherUnavailable:
+                if city not in CLIMATOLOGY:
+                    raise
+                self._count("fallbacks")
+                fetched = {day: climatology_forecast(city, day) for day in missing}
+            else:
+                self.cache.put_many(city, fetched)
+            cached.update(fetched)
+
+        if any(cached.get(day) is None for day in days):
+            raise WeatherError("No forecast available for this date.")
+        return [cached[day] for day in days]
+
+    def _fetch(self, city: str, start_date: str, end_date: str) -> Dict[str, Dict]:
+        if not self.breaker.allow():
+            raise WeatherUnavailable()
+
+        lat, lon = CITY_COORDS[city]
+        params = {
+            "latitude": lat,
+            "longitude": lon,
+            "daily": DAILY_FIELDS,
+            "timezone": "auto",
+            "start_date": start_date,
+            "end_date": end_date
+        }
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self._count("retries")
+                time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+            try:
+                response = self._get_hedged(params)
+            except requests.RequestException:
+                continue
+            if response.status_code != 429 and response.status_code < 500:
+                break
+        else:
+            self._count("failures")
+            self.breaker.record_failure()
+            raise WeatherUnavailable()
+
+        if response.status_code != 200:
+            self.breaker.record_success()
+            raise WeatherError("Weather API request failed.")
+
+        try:
+            daily = response.json()["daily"]
+            forecasts = {
+                day: {
+                    "city": city,
+                    "date": day,
+                    "temp_max": f"{daily['temperature_2m_max'][i]}°C",
+                    "temp_min": f"{daily['temperature_2m_min'][i]}°C",
+                    "precipitation_mm": daily["precipitation_sum"][i],
+                    "condition": WEATHER_MAPPING.get(daily["weathercode"][i], "Unknown")
+                }
+                for i, day in enumerate(daily["time"])
+                if daily["temperature_2m_max"][i] is not None
+            }
+        except (ValueError, KeyError, IndexError, TypeError):
+            # A malformed body counts as a failure, like a 5xx
+            self._count("failures")
+            self.breaker.record_failure()
+            raise WeatherUnavailable()
+        self.breaker.record_success()
+        return forecasts
+
+    def _get(self, params: Dict) -> requests.Response:
+        self._count("requests")
+        start = time.perf_counter()
+        response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+        self._latencies.append(time.perf_counter() - start)
+        return response
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait before hedging: the p95 of recent request latencies."""
+        samples = sorted(self._latencies)
+        if len(samples) < self.HEDGE_MIN_SAMPLES:
+            return self.default_hedge_delay
+        return samples[int(len(samples) * 0.95)]
+
+    def _get_hedged(self, params: Dict) -> requests.Response:
+        if not self.hedge:
+            return self._get(params)
+
+        primary = self._executor.submit(self._get, params)
+        done, _ = wait([primary], timeout=self.hedge_delay())
+        if done:
+            return primary.result()
+
+        # The slower request is left to finish in the background
+        self._count("hedges")
+        pending = {primary, self._executor.submit(self._get, params)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+        return primary.result()
+
+    def cache_stats(self) -> Dict:
+        """Hit/miss counters of the cache plus API request, retry and fallback counters."""
+        return {**self.cache.stats, **self.stats, "entries": len(self.cache), "circuit": self.breaker.state}
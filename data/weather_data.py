@@ -38,3 +38,28 @@ WEATHER_MAPPING = {
         96: "Thunderstorm with slight hail",
         99: "Thunderstorm with heavy hail",
     }
+
+# Monthly climate normals (Jan-Dec) as (mean daily max °C, mean daily min °C,
+# mean daily precipitation mm), served when the forecast API is unavailable
+CLIMATOLOGY = {
+    "Paris": [
+        (7, 3, 1.6), (8, 3, 1.5), (12, 5, 1.5), (16, 7, 1.7), (20, 11, 2.0), (23, 14, 1.7),
+        (25, 16, 2.0), (25, 16, 1.7), (21, 13, 1.6), (16, 10, 2.0), (11, 6, 1.7), (8, 3, 1.9),
+    ],
+    "London": [
+        (8, 2, 1.8), (9, 2, 1.4), (11, 4, 1.3), (14, 6, 1.5), (18, 9, 1.5), (21, 12, 1.5),
+        (23, 14, 1.5), (23, 14, 1.6), (20, 12, 1.6), (16, 9, 2.2), (11, 5, 2.0), (9, 3, 1.8),
+    ],
+    "Tokyo": [
+        (10, 1, 1.7), (11, 2, 2.2), (14, 5, 3.8), (19, 10, 4.0), (23, 15, 4.4), (26, 19, 5.6),
+        (30, 23, 5.0), (31, 24, 5.0), (27, 21, 7.2), (22, 15, 6.5), (17, 9, 3.1), (12, 4, 1.9),
+    ],
+    "New York": [
+        (4, -3, 2.9), (6, -2, 2.8), (10, 2, 3.6), (17, 7, 3.8), (22, 12, 3.4), (27, 18, 3.7),
+        (29, 21, 3.8), (28, 20, 3.7), (24, 16, 3.4), (18, 10, 3.5), (12, 5, 3.0), (6, 0, 3.3),
+    ],
+    "Bangkok": [
+        (32, 22, 0.4), (33, 24, 0.7), (34, 26, 1.4), (35, 27, 2.4), (34, 26, 7.3), (33, 26, 5.5),
+        (33, 26, 5.1), (32, 25, 7.0), (32, 25, 10.7), (32, 25, 7.5), (32, 24, 1.6), (31, 22, 0.3),
+    ],
+}
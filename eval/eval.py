@@ -69,7 +69,8 @@ EVAL_DATASET = [
 def run_evaluation():
     print("Running evaluation on travel booking agent...\n")
 
-    graph = create_travel_graph()
+    # Every case must run the agent, not replay an earlier answer
+    graph = create_travel_graph(answer_cache=None)
     results = []
 
     for i, test_case in enumerate(EVAL_DATASET, 1):
@@ -80,7 +81,7 @@ def run_evaluation():
         }
 
         try:
-            final_state = graph.invoke(state)
+            final_state = graph.invoke(state, config={"configurable": {"thread_id": f"eval-{i}"}})
             messages = final_state["messages"]
             last_message = messages[-1]
 
@@ -0,0 +1,149 @@
+"""
+Measure the prompt tokens and latency of flight and hotel search results.
+
+Usage:
+    python -m eval.tool_results                   # estimated tokens, simulated prompt processing
+    python -m eval.tool_results --live            # real calls to the chat model (MODEL)
+
+Each case runs one search and encodes its result twice: as the verbose
+JSON the tools returned before (every itinerary with its legs, field names
+repeated per row, search parameters echoed) and in the current compact
+tables, also with as many rows as before (top 5) to separate the encoding
+from the truncation. Without --live, tokens are estimated at CHARS_PER_TOKEN characters
+each and latency is the encoding time plus the prompt processed at
+--prompt-tps tokens per second. With --live, the model answers the
+customer from each result, and its reported prompt tokens and wall time
+are used.
+"""
+import argparse
+import json
+import time
+from datetime import date, datetime, timedelta
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from history import estimate_tokens
+from tools import get_inventory, search_flights, search_hotels
+
+SYSTEM_PROMPT = "You are a helpful travel booking assistant. Present the best options clearly with prices."
+
+
+def cases():
+    day = date.today() + timedelta(days=14)
+    later = (day + timedelta(days=4)).isoformat()
+    day = day.isoformat()
+    return [
+        ("Flights from JFK to London on {departure_date}?", search_flights,
+         {"origin": "JFK", "destination": "LHR", "departure_date": day}),
+        ("Round trip JFK to London, {departure_date} to {return_date}, for 2 people", search_flights,
+         {"origin": "JFK", "destination": "LHR", "departure_date": day, "return_date": later, "passengers": 2}),
+        ("Cheapest way from LA to London on {departure_date}?", search_flights,
+         {"origin": "LAX", "destination": "LHR", "departure_date": day}),
+        ("Hotels in Paris from {check_in} to {check_out}", search_hotels,
+         {"city": "Paris", "check_in": day, "check_out": later}),
+        ("Best rated hotel in Tokyo with a gym, {check_in} to {check_out}", search_hotels,
+         {"city": "Tokyo", "check_in": day, "check_out": later, "required_amenities": ["Gym"], "sort_by": "rating"}),
+    ]
+
+
+def verbose_flights(origin, destination, departure_date, return_date=None, passengers=1, sort_by="price"):
+    """The search_flights result before the compact encoding, for comparison."""
+    routes = get_inventory().current.routes
+    outbound = routes.find_itineraries(origin, destination, departure_date, sort_by=sort_by)
+    inbound = routes.find_itineraries(destination, origin, return_date, sort_by=sort_by) if return_date else []
+    for itinerary in outbound + inbound:
+        itinerary["total_price"] = itinerary["price"] * passengers
+    return json.dumps({
+        "itineraries": outbound,
+        "return_itineraries": inbound,
+        "total_options": len(outbound) + len(inbound),
+        "search_params": {
+            "origin": origin, "destination": destination, "departure_date": departure_date,
+            "return_date": return_date, "passengers": passengers, "sort_by": sort_by,
+        },
+    })
+
+
+def verbose_hotels(city, check_in, check_out, guests=1, rooms=1, required_amenities=None, sort_by="price"):
+    """The search_hotels result before the compact encoding, for comparison."""
+    nights = (datetime.fromisoformat(check_out) - datetime.fromisoformat(check_in)).days
+    hotels, total = get_inventory().current.hotels.search(
+        city, required_amenities=required_amenities, sort_by=sort_by, limit=5
+    )
+    for hotel in hotels:
+        hotel["total_price"] = hotel["price_per_night"] * nights * rooms
+    return json.dumps({
+        "hotels": hotels,
+        "total_options": total,
+        "search_params": {
+            "city": city, "check_in": check_in, "check_out": check_out,
+            "nights": nights, "guests": guests, "rooms": rooms,
+        },
+    })
+
+
+def prompt(question: str, tool, args: dict, result: str):
+    return [
+        SystemMessage(content=SYSTEM_PROMPT),
+        HumanMessage(content=question),
+        AIMessage(content="", tool_calls=[{"name": tool.name, "args": args, "id": "call_0"}]),
+        ToolMessage(content=result, tool_call_id="call_0", name=tool.name),
+    ]
+
+
+def measure(model, messages, encode_seconds: float, prompt_tps: float):
+    """(prompt tokens, seconds)"""
+    if model is None:
+        tokens = sum(estimate_tokens(message) for message in messages)
+        return tokens, encode_seconds + tokens / prompt_tps
+    start = time.perf_counter()
+    response = model.invoke(messages)
+    elapsed = time.perf_counter() - start
+    tokens = (response.usage_metadata or {}).get("input_tokens") or sum(estimate_tokens(m) for m in messages)
+    return tokens, encode_seconds + elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tool result prompt tokens and latency, before and after")
+    parser.add_argument("--live", action="store_true", help="Call the chat model instead of estimating")
+    parser.add_argument("--prompt-tps", type=float, default=500, help="Simulated prompt tokens processed per second")
+    args = parser.parse_args()
+
+    model = None
+    if args.live:
+        from agent import create_chat_model
+
+        model = create_chat_model()
+    # Loads the inventory before anything is timed
+    get_inventory()
+    verbose = {search_flights.name: verbose_flights, search_hotels.name: verbose_hotels}
+    encodings = {
+        "verbose": lambda tool, tool_args: verbose[tool.name](**tool_args),
+        "compact, top 5": lambda tool, tool_args: tool.invoke({**tool_args, "limit": 5}),
+        "compact": lambda tool, tool_args: tool.invoke(tool_args),
+    }
+
+    totals = {label: [0, 0.0] for label in encodings}
+    print(f"{'case':<62}" + "".join(f"{label:>20}" for label in encodings))
+    for question, tool, tool_args in cases():
+        question = question.format(**tool_args)
+        row = []
+        for label, encode in encodings.items():
+            start = time.perf_counter()
+            result = encode(tool, tool_args)
+            encode_seconds = time.perf_counter() - start
+            tokens, seconds = measure(model, prompt(question, tool, tool_args, result), encode_seconds, args.prompt_tps)
+            totals[label][0] += tokens
+            totals[label][1] += seconds
+            row.append(f"{tokens:>8} tok {seconds * 1000:>6.0f}ms")
+        print(f"{question[:62]:<62}" + "".join(row))
+
+    print(f"{'total':<62}" + "".join(f"{tokens:>8} tok {seconds * 1000:>6.0f}ms" for tokens, seconds in totals.values()))
+    verbose_tokens, verbose_seconds = totals["verbose"]
+    for label in ("compact, top 5", "compact"):
+        tokens, seconds = totals[label]
+        print(f"{label}: prompt tokens -{1 - tokens / verbose_tokens:.0%}, latency -{1 - seconds / verbose_seconds:.0%}"
+              + ("" if args.live else f" (estimated, {args.prompt_tps:.0f} prompt tokens/s)"))
+
+if __name__ == "__main__":
+    main()
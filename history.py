@@ -0,0 +1,149 @@
+"""Token-budgeted compaction of the conversation history sent to the model."""
+import json
+from typing import Dict, List, Optional, Sequence
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+
+# Rough size of one token for Llama-family tokenizers
+CHARS_PER_TOKEN = 4
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a customer and a travel booking assistant.
+Update the summary with the new messages. Keep every fact needed to continue helping the customer: names,
+travel dates, origins and destinations, chosen flights and hotels with prices, booking IDs and open questions.
+Drop search results that were not chosen. Answer with the updated summary only, in at most 200 words."""
+
+
+def estimate_tokens(message: BaseMessage) -> int:
+    """Approximate prompt tokens for a message, including its tool calls."""
+    size = len(message.content) if isinstance(message.content, str) else len(json.dumps(message.content))
+    if isinstance(message, AIMessage) and message.tool_calls:
+        size += len(json.dumps([[call["name"], call["args"]] for call in message.tool_calls]))
+    return size // CHARS_PER_TOKEN + 4
+
+
+def history_tokens(messages: Sequence[BaseMessage]) -> int:
+    return sum(estimate_tokens(message) for message in messages)
+
+
+def turn_starts(messages: Sequence[BaseMessage], start: int = 0) -> List[int]:
+    """Positions of the customer messages that begin each turn from start on."""
+    return [i for i in range(start, len(messages)) if isinstance(messages[i], HumanMessage)]
+
+
+class HistoryCompactor:
+    """
+    Keeps the history sent to the model within token_budget.
+
+    The last recent_turns turns are sent verbatim. In older turns, tool
+    outputs longer than max_tool_chars are replaced by a one-line
+    reference to the call; they are stale by then and the model can call
+    the tool again. When the history is still over budget, the turns
+    before the recent window are folded into a running summary written by
+    the model, which is sent in their place.
+
+    The summary and the number of messages it covers are kept in the
+    graph state, so each turn is summarized once.
+    """
+
+    def __init__(
+        self,
+        model: BaseChatModel,
+        token_budget: int = 2000,
+        recent_turns: int = 3,
+        max_tool_chars: int = 400,
+        max_summary_input_chars: int = 1000,
+    ):
+        self.model = model
+        self.token_budget = token_budget
+        self.recent_turns = recent_turns
+        self.max_tool_chars = max_tool_chars
+        self.max_summary_input_chars = max_summary_input_chars
+        self.stats = {"summaries": 0, "summarized_messages": 0}
+
+    def _reference(self, message: ToolMessage, calls: Dict[str, dict]) -> str:
+        call = calls.get(message.tool_call_id, {})
+        args = ", ".join(f"{key}={value!r}" for key, value in call.get("args", {}).items())
+        return (
+            f"[Earlier result of {message.name or call.get('name', 'tool')}({args}), "
+            f"{len(message.content):,} characters, omitted; call the tool again if needed]"
+        )
+
+    def _collapsed(self, messages: Sequence[BaseMessage], keep_from: int) -> List[BaseMessage]:
+        calls = {
+            call["id"]: call
+            for message in messages if isinstance(message, AIMessage) for call in message.tool_calls
+        }
+        result = []
+        for i, message in enumerate(messages):
+            if (
+                i < keep_from
+                and isinstance(message, ToolMessage)
+                and isinstance(message.content, str)
+                and len(message.content) > self.max_tool_chars
+            ):
+                message = message.model_copy(update={"content": self._reference(message, calls)})
+            result.append(message)
+        return result
+
+    def view(self, messages: Sequence[BaseMessage], summary: str = "", summarized: int = 0) -> List[BaseMessage]:
+        """The messages to send to the model: the summary, then the rest of the history."""
+        history = messages[summarized:]
+        starts = turn_starts(history)
+        keep_from = starts[-self.recent_turns] if len(starts) >= self.recent_turns else 0
+        history = self._collapsed(history, keep_from)
+        if summary:
+            history.insert(0, SystemMessage(content=f"Summary of the earlier conversation:\n{summary}"))
+        return history
+
+    def _fold(self, messages: Sequence[BaseMessage], summary: str, summarized: int) -> Optional[int]:
+        # End of the turns to fold into the summary, or None while within budget
+        if history_tokens(self.view(messages, summary, summarized)) <= self.token_budget:
+            return None
+        starts = turn_starts(messages, summarized)
+        # The current turn is always kept, and the recent window if there is room
+        end = starts[-self.recent_turns] if len(starts) > self.recent_turns else summarized
+        if end == summarized or history_tokens(self.view(messages[end:])) > self.token_budget:
+            end = starts[-1] if starts else summarized
+        return end if end > summarized else None
+
+    def _transcript(self, messages: Sequence[BaseMessage]) -> str:
+        lines = []
+        for message in self._collapsed(messages, len(messages)):
+            text = message.content if isinstance(message.content, str) else json.dumps(message.content)
+            text = text[:self.max_summary_input_chars]
+            if isinstance(message, HumanMessage):
+                lines.append(f"Customer: {text}")
+            elif isinstance(message, ToolMessage):
+                lines.append(f"Tool {message.name}: {text}")
+            elif isinstance(message, AIMessage):
+                for call in message.tool_calls:
+                    lines.append(f"Assistant called {call['name']}({json.dumps(call['args'])})")
+                if text:
+                    lines.append(f"Assistant: {text}")
+        return "\n".join(lines)
+
+    def _prompt(self, summary: str, messages: Sequence[BaseMessage]) -> List[BaseMessage]:
+        return [
+            SystemMessage(content=SUMMARY_PROMPT),
+            HumanMessage(content=f"Summary so far:\n{summary or '(none)'}\n\nNew messages:\n{self._transcript(messages)}"),
+        ]
+
+    def _updated(self, end: int, response: BaseMessage) -> Dict:
+        self.stats["summaries"] += 1
+        return {"summary": str(response.content).strip(), "summarized": end}
+
+    def compact(self, messages: Sequence[BaseMessage], summary: str = "", summarized: int = 0) -> Dict:
+        """State update folding old turns into the summary; empty while within budget."""
+        end = self._fold(messages, summary, summarized)
+        if end is None:
+            return {}
+        self.stats["summarized_messages"] += end - summarized
+        return self._updated(end, self.model.invoke(self._prompt(summary, messages[summarized:end])))
+
+    async def acompact(self, messages: Sequence[BaseMessage], summary: str = "", summarized: int = 0) -> Dict:
+        end = self._fold(messages, summary, summarized)
+        if end is None:
+            return {}
+        self.stats["summarized_messages"] += end - summarized
+        return self._updated(end, await self.model.ainvoke(self._prompt(summary, messages[summarized:end])))
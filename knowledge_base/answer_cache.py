@@ -0,0 +1,212 @@
+"""Semantic cache of answers to standalone knowledge base questions."""
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+# Tools whose results do not depend on the customer or on live inventory
+CACHEABLE_TOOLS = frozenset({"search_knowledge_base"})
+
+PII_PATTERN = re.compile(
+    r"[\w.+-]+@[\w-]+\.[\w.-]+"  # email
+    r"|\+?\d{1,3}[\s.-]?\(?\d{2,4}\)?[\s.-]?\d{3,4}[\s.-]?\d{3,4}\b"  # phone number
+    r"|\b(?:\d[ -]?){13,16}\b"  # card number
+    r"|\bBK[0-9A-Z]{6,}\b",  # booking ID
+    re.IGNORECASE,
+)
+PERSONAL_PATTERN = re.compile(
+    r"\b(?:i|we)(?:'d| would| want| wanna)\b"
+    r"|\bbook (?:a|an|me|my|the|us)\b"
+    r"|\bmy (?:booking|reservation|flight|hotel|trip|order|ticket|account|card|email)s?\b"
+    r"|\b(?:reserve|cancel|change|modify|upgrade|refund) (?:my|our)\b",
+    re.IGNORECASE,
+)
+
+
+def kb_version(persist_directory: Path = Path("chroma_db")) -> str:
+    """Identifies the indexed knowledge base; changes whenever setup_kb updates it."""
+    from knowledge_base.setup_kb import MANIFEST_NAME
+
+    path = Path(persist_directory) / MANIFEST_NAME
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+    except FileNotFoundError:
+        return ""
+
+
+class SemanticAnswerCache:
+    """
+    Reuses the agent's answer when the same question comes up again.
+
+    Only the first turn of a conversation is considered, so the question
+    cannot depend on earlier messages. Questions carrying PII (emails,
+    phone or card numbers, booking IDs) or about the customer's own
+    bookings are never looked up or stored, and an answer is only stored
+    when the turn searched the knowledge base and called no other tools.
+
+    Questions are compared by the cosine similarity of their embeddings;
+    one within `threshold` of a cached question gets its answer. Entries
+    expire after ttl seconds, the least recently used are dropped beyond
+    max_entries, and all are dropped when version() (the knowledge base
+    version and the model) changes.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        threshold: float = 0.95,
+        max_entries: int = 1024,
+        ttl: float = 86400.0,
+        version: Optional[Callable[[], str]] = None,
+    ):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = version or (lambda: f"{os.getenv('MODEL', 'llama3.2')}:{kb_version()}")
+        self.stats = {"hits": 0, "misses": 0, "skipped": 0, "stores": 0, "invalidations": 0, "errors": 0}
+        # question -> (unit vector, answer, stored at)
+        self._entries: "OrderedDict[str, Tuple[np.ndarray, str, float]]" = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None
+        self._keys: List[str] = []
+        self._version: Optional[str] = None
+        self._version_checked = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def question(messages: Sequence[BaseMessage]) -> Optional[str]:
+        """The question if this turn may be answered from the cache."""
+        if len(messages) != 1 or not isinstance(messages[0], HumanMessage):
+            return None
+        text = messages[0].content
+        if not isinstance(text, str):
+            return None
+        text = " ".join(text.split())
+        if PII_PATTERN.search(text) or PERSONAL_PATTERN.search(text):
+            return None
+        return text.casefold()
+
+    def _check_version(self):
+        # Caller holds the lock; the version is re-read at most once a second
+        now = time.monotonic()
+        if now - self._version_checked < 1.0:
+            return
+        self._version_checked = now
+        version = self.version()
+        if version != self._version:
+            if self._entries:
+                self.stats["invalidations"] += 1
+            self._entries.clear()
+            self._matrix = None
+            self._version = version
+
+    def _match(self, vector: np.ndarray) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            self._check_version()
+            if self._matrix is None:
+                self._keys = list(self._entries)
+                self._matrix = np.stack([self._entries[key][0] for key in self._keys]) if self._keys else None
+            if self._matrix is None:
+                return None
+            scores = self._matrix @ vector
+            candidates = np.flatnonzero(scores >= self.threshold)
+            now = time.time()
+            match, expired = None, []
+            # Best match first; expired entries are passed over and dropped
+            for row in candidates[np.argsort(-scores[candidates])]:
+                key = self._keys[row]
+                _, answer, stored_at = self._entries[key]
+                if now - stored_at > self.ttl:
+                    expired.append(key)
+                    continue
+                self._entries.move_to_end(key)
+                match = answer, float(scores[row])
+                break
+            for key in expired:
+                del self._entries[key]
+            if expired:
+                self._matrix = None
+            return match
+
+    def _result(self, vector) -> Tuple[Optional[AIMessage], Optional[np.ndarray]]:
+        vector = np.asarray(vector, dtype=np.float32)
+        vector /= max(float(np.linalg.norm(vector)), 1e-12)
+        match = self._match(vector)
+        if match is None:
+            self._count("misses")
+            return None, vector
+        self._count("hits")
+        answer, similarity = match
+        return AIMessage(content=answer, response_metadata={"answer_cache": {"similarity": round(similarity, 4)}}), None
+
+    def lookup(self, messages: Sequence[BaseMessage]) -> Tuple[Optional[AIMessage], Optional[np.ndarray]]:
+        """
+        (cached answer, None) on a hit. On a miss (None, question vector),
+        to pass to store() with the turn's messages; (None, None) if the
+        turn is not cacheable.
+        """
+        question = self.question(messages)
+        if question is None:
+            self._count("skipped")
+            return None, None
+        try:
+            vector = self.embeddings.embed_query(question)
+        except Exception:
+            self._count("errors")
+            return None, None
+        return self._result(vector)
+
+    async def alookup(self, messages: Sequence[BaseMessage]) -> Tuple[Optional[AIMessage], Optional[np.ndarray]]:
+        question = self.question(messages)
+        if question is None:
+            self._count("skipped")
+            return None, None
+        try:
+            vector = await self.embeddings.aembed_query(question)
+        except Exception:
+            self._count("errors")
+            return None, None
+        return self._result(vector)
+
+    def store(self, messages: Sequence[BaseMessage], new_messages: Sequence[BaseMessage], vector: Optional[np.ndarray]):
+        """Cache the turn's final answer if it was grounded in knowledge base searches alone."""
+        if vector is None or not new_messages:
+            return
+        answer = new_messages[-1]
+        if not isinstance(answer, AIMessage) or answer.tool_calls or not isinstance(answer.content, str):
+            return
+        if not answer.content or PII_PATTERN.search(answer.content):
+            return
+        tools = {message.name for message in new_messages if isinstance(message, ToolMessage)}
+        tools.update(call["name"] for message in new_messages if isinstance(message, AIMessage) for call in message.tool_calls)
+        if not tools or not tools <= CACHEABLE_TOOLS:
+            return
+
+        question = self.question(messages)
+        with self._lock:
+            self._entries[question] = (vector, answer.content, time.time())
+            self._entries.move_to_end(question)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+            self.stats["stores"] += 1
+
+    def _count(self, field: str):
+        with self._lock:
+            self.stats[field] += 1
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def cache_stats(self) -> Dict:
+        return {**self.stats, "hit_ratio": round(self.hit_ratio, 3), "entries": len(self._entries)}
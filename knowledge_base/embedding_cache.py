@@ -0,0 +1,138 @@
+"""Cache of text embeddings keyed by model and text."""
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+
+def normalize_query(text: str) -> str:
+    """Case- and whitespace-insensitive form of a query."""
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that remembers every vector it computed.
+
+    Vectors are keyed by the model name, whether the text was embedded as a
+    query or a document, and a SHA-256 of the text; queries are normalized
+    first, so "Refund policy?" and " refund  policy? " share an entry. Up
+    to max_entries vectors are kept in memory, evicting the least recently
+    used. When a path is given they are also stored in a SQLite file, so
+    they survive restarts; a memory miss that hits the disk tier is
+    promoted back into memory.
+
+    Each vector is stored with the time it took to compute, so stats
+    counts the embedding time hits saved besides hits, disk hits and misses.
+    """
+
+    def __init__(self, embeddings: Embeddings, model: str, max_entries: int = 4096, path: Optional[Path] = None):
+        self.embeddings = embeddings
+        self.model = model
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "seconds_saved": 0.0}
+        # key -> (vector, seconds it took to embed)
+        self._entries: "OrderedDict[str, Tuple[List[float], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path is not None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB, seconds REAL)")
+            self._db.commit()
+
+    def _key(self, kind: str, text: str) -> str:
+        # Models may embed queries and documents differently, so they never share an entry
+        return hashlib.sha256(f"{self.model}\0{kind}:{text}".encode()).hexdigest()
+
+    def _get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                self.stats["seconds_saved"] += entry[1]
+                return entry[0]
+
+            if self._db is not None:
+                row = self._db.execute("SELECT vector, seconds FROM embeddings WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    vector = array("d", row[0]).tolist()
+                    self._remember(key, vector, row[1])
+                    self.stats["disk_hits"] += 1
+                    self.stats["seconds_saved"] += row[1]
+                    return vector
+
+            self.stats["misses"] += 1
+            return None
+
+    def _put_many(self, vectors: Dict[str, List[float]], elapsed: float):
+        # A batch's time is split evenly over its texts
+        seconds = elapsed / len(vectors)
+        with self._lock:
+            for key, vector in vectors.items():
+                self._remember(key, vector, seconds)
+            if self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)",
+                    [(key, array("d", vector).tobytes(), seconds) for key, vector in vectors.items()],
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, vector: List[float], seconds: float):
+        self._entries[key] = (vector, seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key("query", normalize_query(text))
+        vector = self._get(key)
+        if vector is None:
+            start = time.perf_counter()
+            vector = self.embeddings.embed_query(text)
+            self._put_many({key: vector}, time.perf_counter() - start)
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = self._key("query", normalize_query(text))
+        vector = self._get(key)
+        if vector is None:
+            start = time.perf_counter()
+            vector = await self.embeddings.aembed_query(text)
+            self._put_many({key: vector}, time.perf_counter() - start)
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key("doc", text) for text in texts]
+        vectors = [self._get(key) for key in keys]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            start = time.perf_counter()
+            embedded = self.embeddings.embed_documents([texts[i] for i in missing])
+            elapsed = time.perf_counter() - start
+            for i, vector in zip(missing, embedded):
+                vectors[i] = vector
+            self._put_many({keys[i]: vectors[i] for i in missing}, elapsed)
+        return vectors
+
+    @property
+    def hit_ratio(self) -> float:
+        hits = self.stats["hits"] + self.stats["disk_hits"]
+        lookups = hits + self.stats["misses"]
+        return hits / lookups if lookups else 0.0
+
+    def cache_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "seconds_saved": round(self.stats["seconds_saved"], 3),
+            "hit_ratio": round(self.hit_ratio, 3),
+            "entries": len(self._entries),
+        }
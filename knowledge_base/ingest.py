@@ -0,0 +1,111 @@
+"""Batched, concurrent embedding of knowledge base chunks."""
+import itertools
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+# (chunk ID, text, metadata)
+Chunk = Tuple[str, str, Dict]
+# write(ids, embeddings, texts, metadatas)
+Writer = Callable[[List[str], List[List[float]], List[str], List[Dict]], None]
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+class EmbeddingPipeline:
+    """
+    Embeds a stream of chunks in batches and writes them in bulk.
+
+    Chunks are consumed lazily in batches of batch_size, and each batch is
+    embedded by one embed_documents call on a pool of `workers` threads.
+    At most max_pending batches are in flight: once that many are queued
+    the producer waits for the oldest, so loading and splitting never run
+    far ahead of embedding (backpressure) and memory stays bounded.
+    Embedded chunks are written in input order, write_batch_size at a time.
+
+    A failed batch cancels the pending ones and raises; chunks written
+    before it stay written.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        write: Writer,
+        batch_size: int = 32,
+        workers: int = 4,
+        max_pending: Optional[int] = None,
+        write_batch_size: int = 256,
+        progress: Optional[Callable[[Dict], None]] = None,
+        progress_interval: float = 2.0,
+    ):
+        self.embeddings = embeddings
+        self.write = write
+        self.batch_size = batch_size
+        self.workers = workers
+        self.max_pending = max_pending or 2 * workers
+        self.write_batch_size = write_batch_size
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self.stats = {"chunks": 0, "batches": 0, "writes": 0, "seconds": 0.0, "chunks_per_second": 0.0}
+
+    def _embed(self, batch: List[Chunk]) -> Tuple[List[Chunk], List[List[float]]]:
+        return batch, self.embeddings.embed_documents([text for _, text, _ in batch])
+
+    def run(self, chunks: Iterable[Chunk]) -> Dict:
+        """Embed and write every chunk; returns stats."""
+        start = time.perf_counter()
+        last_report = start
+        pending = deque()
+        buffer: List[Tuple[Chunk, List[float]]] = []
+
+        def collect(future):
+            nonlocal last_report
+            batch, vectors = future.result()
+            buffer.extend(zip(batch, vectors))
+            self.stats["chunks"] += len(batch)
+            self.stats["batches"] += 1
+            if len(buffer) >= self.write_batch_size:
+                flush()
+            now = time.perf_counter()
+            if self.progress and now - last_report >= self.progress_interval:
+                last_report = now
+                self._update(now - start)
+                self.progress(self.stats)
+
+        def flush():
+            if not buffer:
+                return
+            self.write(
+                [chunk_id for (chunk_id, _, _), _ in buffer],
+                [vector for _, vector in buffer],
+                [text for (_, text, _), _ in buffer],
+                [metadata for (_, _, metadata), _ in buffer],
+            )
+            self.stats["writes"] += 1
+            buffer.clear()
+
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="embed")
+        try:
+            for batch in batched(chunks, self.batch_size):
+                if len(pending) >= self.max_pending:
+                    collect(pending.popleft())
+                pending.append(executor.submit(self._embed, batch))
+            while pending:
+                collect(pending.popleft())
+            flush()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        self._update(time.perf_counter() - start)
+        return self.stats
+
+    def _update(self, elapsed: float):
+        self.stats["seconds"] = elapsed
+        self.stats["chunks_per_second"] = self.stats["chunks"] / elapsed if elapsed else 0.0
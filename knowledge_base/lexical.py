@@ -0,0 +1,191 @@
+"""BM25 keyword index and hybrid (keyword + vector) retrieval."""
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict, Field, PrivateAttr
+
+LEXICAL_INDEX_NAME = "lexical_index.json"
+INDEX_VERSION = 1
+
+STOPWORDS = frozenset(
+    "a about an and any are as at be can could do does for from have how i if in is it me my "
+    "of on or our should so that the their there this to was what when where which who will "
+    "with would you your".split()
+)
+
+
+def _stem(token: str) -> str:
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens without stopwords, plurals folded ("visas" -> "visa")."""
+    return [_stem(token) for token in re.findall(r"[a-z0-9]+", text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over the knowledge base chunks.
+
+    Postings map each term to the chunks containing it and its frequency
+    there, so a search only scores chunks sharing a term with the query.
+    The chunk texts and metadata are stored too, so keyword results are
+    returned without the vector store.
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        metadatas: Sequence[Dict],
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        self.ids = list(ids)
+        self.texts = list(texts)
+        self.metadatas = list(metadatas)
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.lengths: List[int] = []
+        for doc, text in enumerate(self.texts):
+            counts = Counter(tokenize(text))
+            self.lengths.append(sum(counts.values()))
+            for term, frequency in counts.items():
+                self.postings.setdefault(term, []).append((doc, frequency))
+        self.average_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+        count = len(self.ids)
+        self.idf = {
+            term: math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[int, float, int]]:
+        """Top k chunks as (position, score, query terms matched), best first."""
+        scores: Dict[int, float] = {}
+        matched: Counter = Counter()
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc, frequency in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc] / self.average_length)
+                scores[doc] = scores.get(doc, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+                matched[doc] += 1
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(doc, score, matched[doc]) for doc, score in best]
+
+    def document(self, doc: int) -> Document:
+        return Document(id=self.ids[doc], page_content=self.texts[doc], metadata=self.metadatas[doc])
+
+    def save(self, path: Path):
+        tmp = Path(path).with_suffix(".tmp")
+        tmp.write_text(json.dumps({
+            "version": INDEX_VERSION, "k1": self.k1, "b": self.b,
+            "ids": self.ids, "texts": self.texts, "metadatas": self.metadatas,
+        }), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["BM25Index"]:
+        """The saved index, or None if there is none (or it is outdated)."""
+        path = Path(path)
+        if not path.exists():
+            return None
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("version") != INDEX_VERSION:
+            return None
+        return cls(data["ids"], data["texts"], data["metadatas"], k1=data["k1"], b=data["b"])
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Document]], k: int, constant: int = 60) -> List[Document]:
+    """Merge ranked lists by summing 1 / (constant + rank) per document."""
+    scores: Dict[str, float] = {}
+    documents: Dict[str, Document] = {}
+    for ranking in rankings:
+        for rank, document in enumerate(ranking):
+            key = document.id or document.page_content
+            scores[key] = scores.get(key, 0.0) + 1.0 / (constant + rank + 1)
+            documents.setdefault(key, document)
+    best = sorted(scores, key=scores.get, reverse=True)[:k]
+    return [documents[key] for key in best]
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Keyword (BM25) and vector search fused with reciprocal rank fusion.
+
+    Short keyword queries ("visa Japan", "baggage allowance") whose terms
+    all occur in the best keyword match are answered from BM25 alone,
+    skipping the embedding call, provided that match scores at least
+    `fast_path_min_score` and beats the runner-up by `fast_path_margin`
+    times; broad queries ("travel", "refund") match many chunks about
+    equally and need the vector search. Everything else runs both searches
+    over `candidates` results each and returns the k best fused.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    index: BM25Index
+    vector_retriever: BaseRetriever
+    k: int = 3
+    candidates: int = 10
+    fast_path_max_terms: int = 4
+    fast_path_min_score: float = 2.0
+    fast_path_margin: float = 1.5
+    stats: Dict[str, int] = Field(default_factory=lambda: {"lexical": 0, "hybrid": 0})
+    _stats_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def _count(self, field: str):
+        with self._stats_lock:
+            self.stats[field] += 1
+
+    def _lexical(self, query: str) -> Tuple[List[Document], bool]:
+        hits = self.index.search(query, self.candidates)
+        terms = len(set(tokenize(query)))
+        confident = (
+            bool(hits)
+            and terms <= self.fast_path_max_terms
+            and hits[0][2] == terms
+            and hits[0][1] >= self.fast_path_min_score
+            and (len(hits) == 1 or hits[0][1] >= self.fast_path_margin * hits[1][1])
+        )
+        return [self.index.document(doc) for doc, _, _ in hits], confident
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        lexical, confident = self._lexical(query)
+        if confident:
+            self._count("lexical")
+            return lexical[:self.k]
+        self._count("hybrid")
+        vector = self.vector_retriever.invoke(query, config={"callbacks": run_manager.get_child()})
+        return reciprocal_rank_fusion([lexical, vector], self.k)
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        lexical, confident = self._lexical(query)
+        if confident:
+            self._count("lexical")
+            return lexical[:self.k]
+        self._count("hybrid")
+        vector = await self.vector_retriever.ainvoke(query, config={"callbacks": run_manager.get_child()})
+        return reciprocal_rank_fusion([lexical, vector], self.k)
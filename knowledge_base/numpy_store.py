@@ -0,0 +1,205 @@
+"""In-process vector store over a memory-mapped NumPy matrix."""
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+STORE_VERSION = 1
+VECTORS_NAME = "vectors.npy"
+META_NAME = "vectors.json"
+CENTROIDS_NAME = "centroids.npy"
+SCALES_NAME = "scales.npy"
+# Corpora at least this large get an IVF index by default
+IVF_MIN_ROWS = 20000
+
+
+def _normalized(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _kmeans(vectors: np.ndarray, clusters: int, iterations: int = 10, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Spherical k-means: (unit centroids, cluster of each vector)."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        empty = np.bincount(assignments, minlength=clusters) == 0
+        # Restart empty clusters from random vectors
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+        centroids = _normalized(sums)
+    return centroids, np.argmax(vectors @ centroids.T, axis=1)
+
+
+def write_vector_store(
+    path: Path,
+    ids: Sequence[str],
+    vectors: Any,
+    texts: Sequence[str],
+    metadatas: Sequence[Dict],
+    ivf_lists: Optional[int] = None,
+    quantize: bool = False,
+):
+    """
+    Write normalized vectors and their chunks for NumpyVectorStore.
+
+    ivf_lists > 0 clusters the vectors and stores them grouped by cluster;
+    by default that happens once there are IVF_MIN_ROWS vectors, with about
+    sqrt(rows) clusters. quantize stores int8 vectors with a per-row scale,
+    a quarter of the float32 size.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    matrix = _normalized(vectors) if len(ids) else np.zeros((0, 0), dtype=np.float32)
+    if ivf_lists is None:
+        ivf_lists = int(np.sqrt(len(ids))) if len(ids) >= IVF_MIN_ROWS else 0
+    ivf_lists = min(ivf_lists, len(ids))
+
+    order = np.arange(len(ids))
+    offsets = None
+    if ivf_lists:
+        centroids, assignments = _kmeans(matrix, ivf_lists)
+        order = np.argsort(assignments, kind="stable")
+        offsets = np.searchsorted(assignments[order], np.arange(ivf_lists + 1)).tolist()
+        matrix = matrix[order]
+        np.save(path / CENTROIDS_NAME, centroids)
+
+    if quantize:
+        scales = np.maximum(np.abs(matrix).max(axis=1), 1e-12) / 127
+        np.save(path / SCALES_NAME, scales.astype(np.float32))
+        matrix = np.round(matrix / scales[:, None]).astype(np.int8)
+
+    meta = {
+        "version": STORE_VERSION,
+        "rows": len(ids),
+        "quantized": quantize,
+        "offsets": offsets,
+        "ids": [ids[i] for i in order],
+        "texts": [texts[i] for i in order],
+        "metadatas": [metadatas[i] for i in order],
+    }
+    # Vectors first, then the metadata; loading checks that their rows agree
+    tmp = path / (VECTORS_NAME + ".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, matrix)
+    os.replace(tmp, path / VECTORS_NAME)
+    tmp = path / (META_NAME + ".tmp")
+    tmp.write_text(json.dumps(meta), encoding="utf-8")
+    os.replace(tmp, path / META_NAME)
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    Read-only vector store over vectors written by write_vector_store.
+
+    The vectors are memory-mapped, so opening the store reads only the
+    metadata and the OS pages vectors in on demand. A search embeds the
+    query and takes the top k cosine similarities from one matrix-vector
+    product. With an IVF index only the nprobe clusters whose centroids
+    are closest to the query are scanned.
+    """
+
+    def __init__(self, path: Path, embedding: Embeddings, nprobe: int = 8):
+        path = Path(path)
+        meta = json.loads((path / META_NAME).read_text(encoding="utf-8"))
+        if meta.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported vector store version in {path}")
+        self.path = path
+        self.embedding = embedding
+        self.nprobe = nprobe
+        self.ids: List[str] = meta["ids"]
+        self.texts: List[str] = meta["texts"]
+        self.metadatas: List[Dict] = meta["metadatas"]
+        self.offsets: Optional[List[int]] = meta["offsets"]
+        self.vectors = np.load(path / VECTORS_NAME, mmap_mode="r")
+        if len(self.vectors) != meta["rows"]:
+            raise ValueError(f"Vector store in {path} is incomplete, rebuild it")
+        self.scales = np.load(path / SCALES_NAME) if meta["quantized"] else None
+        self.centroids = np.load(path / CENTROIDS_NAME) if self.offsets else None
+
+    @classmethod
+    def load(cls, path: Path, embedding: Embeddings, nprobe: int = 8) -> "NumpyVectorStore":
+        return cls(path, embedding, nprobe=nprobe)
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _scores(self, rows: slice, query: np.ndarray) -> np.ndarray:
+        scores = self.vectors[rows] @ query
+        if self.scales is not None:
+            scores = scores * self.scales[rows]
+        return scores
+
+    def _top_k(self, query: Sequence[float], k: int) -> List[Tuple[int, float]]:
+        if not self.ids:
+            return []
+        query = _normalized(query)
+        if self.offsets is None:
+            rows = np.arange(len(self.ids))
+            scores = self._scores(slice(None), query)
+        else:
+            probes = np.argsort(self.centroids @ query)[::-1][:self.nprobe]
+            ranges = [(self.offsets[c], self.offsets[c + 1]) for c in probes]
+            rows = np.concatenate([np.arange(start, end) for start, end in ranges])
+            scores = np.concatenate([self._scores(slice(start, end), query) for start, end in ranges])
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [(int(rows[i]), float(scores[i])) for i in best]
+
+    def _document(self, row: int) -> Document:
+        return Document(id=self.ids[row], page_content=self.texts[row], metadata=self.metadatas[row])
+
+    def similarity_search_by_vector_with_score(self, embedding: Sequence[float], k: int = 4) -> List[Tuple[Document, float]]:
+        return [(self._document(row), score) for row, score in self._top_k(embedding, k)]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [document for document, _ in self.similarity_search_by_vector_with_score(embedding, k)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(self.embedding.embed_query(query), k)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return self.similarity_search_by_vector(self.embedding.embed_query(query), k)
+
+    async def asimilarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return self.similarity_search_by_vector(await self.embedding.aembed_query(query), k)
+
+    def _select_relevance_score_fn(self):
+        # Cosine similarity in [-1, 1] -> [0, 1]
+        return lambda score: (score + 1) / 2
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None, **kwargs: Any) -> List[str]:
+        raise NotImplementedError("NumpyVectorStore is read-only; run knowledge_base.setup_kb to update it")
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        path: Optional[Path] = None,
+        **kwargs: Any,
+    ) -> "NumpyVectorStore":
+        """Embed texts, write them to path and open the store."""
+        if path is None:
+            raise ValueError("NumpyVectorStore.from_texts needs a path")
+        ids = ids or [str(i) for i in range(len(texts))]
+        write_vector_store(path, ids, embedding.embed_documents(texts), texts, metadatas or [{} for _ in texts], **kwargs)
+        return cls(path, embedding)
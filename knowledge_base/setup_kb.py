@@ -1,59 +1,205 @@
+import argparse
+import hashlib
+import json
+import os
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
 from dotenv import load_dotenv
-from langchain_community.document_loaders import DirectoryLoader, TextLoader
-from langchain_ollama import OllamaEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import Chroma
+
+if TYPE_CHECKING:
+    from langchain_core.embeddings import Embeddings
 
 load_dotenv()
 
-def setup_knowledge_base():
-    """Initialize the vector store with knowledge base documents."""
-    # Load documents
-    kb_path = Path("")
-    if not kb_path.exists():
+KB_DIR = Path(__file__).resolve().parent
+CHROMA_DIR = Path("chroma_db")
+MANIFEST_NAME = "kb_manifest.json"
+# Must match knowledge_base.lexical.LEXICAL_INDEX_NAME, which is not
+# imported so an up-to-date run stays fast
+LEXICAL_INDEX_NAME = "lexical_index.json"
+# Likewise knowledge_base.numpy_store.META_NAME
+VECTORS_META_NAME = "vectors.json"
+MANIFEST_VERSION = 1
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+EMBED_BATCH_SIZE = int(os.getenv("KB_EMBED_BATCH_SIZE", "32"))
+EMBED_WORKERS = int(os.getenv("KB_EMBED_WORKERS", "4"))
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _source(path: Path, kb_path: Path) -> str:
+    # Sources read "knowledge_base/faq.md", as the agent cites them
+    return str(Path(kb_path.name) / path.relative_to(kb_path))
+
+
+def split_file(text: str, source: str) -> List[Tuple[str, str]]:
+    """(chunk ID, chunk text) for one document; IDs are content hashes."""
+    # Imported here so a run with no changed files skips it
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    chunks, seen = [], {}
+    for chunk in splitter.split_text(text):
+        chunk_id = _hash(f"{source}\0{chunk}")[:32]
+        # The same text twice in one file still needs two IDs
+        seen[chunk_id] = seen.get(chunk_id, -1) + 1
+        if seen[chunk_id]:
+            chunk_id = f"{chunk_id}-{seen[chunk_id]}"
+        chunks.append((chunk_id, chunk))
+    return chunks
+
+
+def load_manifest(persist_directory: Path) -> Optional[Dict]:
+    path = Path(persist_directory) / MANIFEST_NAME
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_manifest(persist_directory: Path, manifest: Dict):
+    # Written after the collection so an interrupted run is redone, not lost
+    path = Path(persist_directory) / MANIFEST_NAME
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def setup_knowledge_base(
+    kb_path: Path = KB_DIR,
+    persist_directory: Path = CHROMA_DIR,
+    embeddings: Optional["Embeddings"] = None,
+    rebuild: bool = False,
+    batch_size: int = EMBED_BATCH_SIZE,
+    workers: int = EMBED_WORKERS,
+) -> bool:
+    """
+    Index the knowledge base documents into the vector store incrementally.
+
+    A manifest next to the collection records each file's hash and its
+    chunks' IDs, which are hashes of their content. Unchanged files are only
+    hashed; changed files are re-split and only chunks whose content is new
+    are embedded, while chunks that no longer exist are deleted. Changing
+    the embedding model or chunking rebuilds everything.
+
+    Changed files are split as the embedding pipeline asks for more chunks,
+    which it embeds batch_size at a time on `workers` threads. The BM25
+    keyword index and the NumPy vector store (VECTOR_STORE=numpy) are then
+    rebuilt from every chunk in the collection.
+    """
+    start = time.perf_counter()
+    kb_path = Path(kb_path)
+    persist_directory = Path(persist_directory)
+    if not kb_path.is_dir():
         print(f"Error: Knowledge base directory '{kb_path}' not found.")
         return False
-    
-    loader = DirectoryLoader(
-        str(kb_path),
-        glob="**/*.md",
-        loader_cls=TextLoader,
-        loader_kwargs={"encoding": "utf-8"}
-    )
-    documents = loader.load()
-    
-    if not documents:
-        print("Warning: No documents found in knowledge_base directory.")
+
+    files = {_source(path, kb_path): path for path in sorted(kb_path.glob("**/*.md"))}
+    if not files:
+        print(f"Warning: No documents found in {kb_path}.")
         return False
-    
-    # Split documents
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200
-    )
-    splits = text_splitter.split_documents(documents)
-    
-    # Create vector store with Ollama embeddings
+
+    model_name = os.getenv("MODEL", "llama3.2")
+    settings = {
+        "version": MANIFEST_VERSION,
+        "model": model_name,
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+    }
+    manifest = None if rebuild else load_manifest(persist_directory)
+    if manifest is not None and any(manifest.get(key) != value for key, value in settings.items()):
+        print("Embedding model or chunking changed, rebuilding the knowledge base")
+        manifest = None
+    rebuild = manifest is None and persist_directory.exists()
+    indexed = {} if manifest is None else manifest["files"]
+
+    hashes = {source: _hash(path.read_text(encoding="utf-8")) for source, path in files.items()}
+    changed = [source for source in files if indexed.get(source, {}).get("hash") != hashes[source]]
+    removed_files = [source for source in indexed if source not in files]
+
+    lexical_path = persist_directory / LEXICAL_INDEX_NAME
+    exports = [lexical_path, persist_directory / VECTORS_META_NAME]
+    if not rebuild and not changed and not removed_files and all(path.exists() for path in exports):
+        chunks = sum(len(entry["chunks"]) for entry in indexed.values())
+        print(f"✓ Knowledge base up to date ({len(files)} files, {chunks} chunks, "
+              f"{time.perf_counter() - start:.2f}s)")
+        return True
+
+    new_files = {source: entry for source, entry in indexed.items() if source in files}
+    to_delete = [chunk_id for source in removed_files for chunk_id in indexed[source]["chunks"]]
+
+    def new_chunks() -> Iterator[Tuple[str, str, Dict]]:
+        # Files are read and split lazily, as the pipeline has room for more
+        for source in changed:
+            text = files[source].read_text(encoding="utf-8")
+            chunks = split_file(text, source)
+            old_ids = set(indexed.get(source, {}).get("chunks", []))
+            new_ids = [chunk_id for chunk_id, _ in chunks]
+            for chunk_id, chunk in chunks:
+                if chunk_id not in old_ids:
+                    yield chunk_id, chunk, {"source": source}
+            to_delete.extend(old_ids.difference(new_ids))
+            new_files[source] = {"hash": _hash(text), "chunks": new_ids}
+
     try:
-        print("Initializing embeddings with Ollama...")
-        print("Make sure Ollama is running (ollama serve)")
-        embeddings = OllamaEmbeddings(model="llama3.2")
-        print("Creating vector store...")
-        vectorstore = Chroma.from_documents(
-            documents=splits,
-            embedding=embeddings,
-            persist_directory="./chroma_db"
+        if embeddings is None:
+            from langchain_ollama import OllamaEmbeddings
+            print("Initializing embeddings with Ollama...")
+            print("Make sure Ollama is running (ollama serve)")
+            embeddings = OllamaEmbeddings(model=model_name)
+        from langchain_chroma import Chroma
+        from knowledge_base.ingest import EmbeddingPipeline
+        from knowledge_base.lexical import BM25Index
+        from knowledge_base.numpy_store import write_vector_store
+
+        vectorstore = Chroma(persist_directory=str(persist_directory), embedding_function=embeddings)
+        if rebuild:
+            # No manifest to diff against, so start from an empty collection
+            vectorstore.reset_collection()
+
+        def write(ids, vectors, texts, metadatas):
+            # An upsert, so chunks left by an interrupted run are not duplicated
+            vectorstore._collection.upsert(ids=ids, embeddings=vectors, documents=texts, metadatas=metadatas)
+
+        if changed:
+            print(f"Embedding {len(changed)} changed files ({batch_size} chunks per batch, {workers} workers)...")
+        stats = EmbeddingPipeline(
+            embeddings, write, batch_size=batch_size, workers=workers,
+            progress=lambda stats: print(f"  {stats['chunks']} chunks ({stats['chunks_per_second']:.0f}/s)"),
+        ).run(new_chunks())
+        if to_delete and not rebuild:
+            vectorstore.delete(ids=to_delete)
+
+        stored = vectorstore._collection.get(include=["documents", "metadatas", "embeddings"])
+        BM25Index(stored["ids"], stored["documents"], stored["metadatas"]).save(lexical_path)
+        write_vector_store(
+            persist_directory, stored["ids"], stored["embeddings"], stored["documents"], stored["metadatas"]
         )
-        print(f"✓ Knowledge base initialized with {len(splits)} chunks")
-        print(f"✓ Vector store saved to ./chroma_db")
-        return True
+        save_manifest(persist_directory, {**settings, "files": new_files})
     except Exception as e:
         print(f"Error initializing knowledge base: {str(e)}")
         print("\nTroubleshooting:")
         print("1. Make sure Ollama is running: ollama serve")
         return False
 
-if __name__ == "__main__":
-    setup_knowledge_base()
+    total = sum(len(entry["chunks"]) for entry in new_files.values())
+    print(f"✓ Knowledge base updated: {stats['chunks']} chunks embedded "
+          f"({stats['chunks_per_second']:.0f}/s), {0 if rebuild else len(to_delete)} removed, "
+          f"{total} total ({time.perf_counter() - start:.1f}s)")
+    print(f"✓ Vector store saved to {persist_directory}")
+    return True
 
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or update the knowledge base vector store")
+    parser.add_argument("--rebuild", action="store_true", help="Re-embed every chunk")
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE, help="Chunks per embedding request")
+    parser.add_argument("--workers", type=int, default=EMBED_WORKERS, help="Concurrent embedding requests")
+    args = parser.parse_args()
+    raise SystemExit(0 if setup_knowledge_base(
+        rebuild=args.rebuild, batch_size=args.batch_size, workers=args.workers
+    ) else 1)
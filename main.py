@@ -1,11 +1,17 @@
 """CLI interface for the travel booking agent."""
+import argparse
+import importlib
 import os
+import signal
 import subprocess
 import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from rich.console import Console
 from rich.panel import Panel
-from agent import run_agent_streaming, create_travel_graph
+from rich.table import Table
 import warnings
 
 load_dotenv()
@@ -19,41 +25,123 @@ warnings.filterwarnings(
 )
 
 def check_setup():
-    """Check if environment is properly set up."""
+    """
+    Check if environment is properly set up.
+
+    Returns the knowledge base build process if one had to be started. It
+    runs in the background so the first prompt is not delayed.
+    """
     model = os.getenv("MODEL", "llama3.2")
 
     console.print(f"Using model: {model}")
     
     if not os.path.exists("./chroma_db"):
         console.print("Warning: Knowledge base not initialized")
-        console.print("Running setup_kb.py to initialize knowledge base...")
-
-        try:
-            subprocess.run([sys.executable, "-m", "knowledge_base.setup_kb"], check=True)
-            console.print("✓ Knowledge base initialized")
-        except subprocess.CalledProcessError:
-            console.print("Error: Failed to initialize knowledge base")
-            return False
-
-    return True
+        console.print("Initializing knowledge base in the background...")
+        return subprocess.Popen(
+            [sys.executable, "-m", "knowledge_base.setup_kb"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True
+        )
+
+    return None
+
+
+def build_graph(kb_process=None):
+    """Wait for the knowledge base build (if any), then create the agent graph."""
+    if kb_process is not None:
+        output, _ = kb_process.communicate()
+        if kb_process.returncode != 0:
+            raise RuntimeError(f"Failed to initialize knowledge base:\n{output}")
+
+    # Imported here so langchain, langgraph and the model clients load
+    # while the user types instead of before the banner
+    from agent import create_answer_cache, create_checkpointer, create_travel_graph
+    return create_travel_graph(answer_cache=create_answer_cache(), checkpointer=create_checkpointer())
+
+
+def watch_inventory():
+    """Hot-reload the inventory on SIGHUP (file changes are polled once it is loaded)."""
+    def reload(signum, frame):
+        # Nothing to reload until the first search has loaded the inventory
+        tools = sys.modules.get("tools")
+        if tools is not None:
+            tools.reload_inventory()
+
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, reload)
+
+
+def profile_startup():
+    """Print how long each import and initialization step takes."""
+    timings = []
+
+    def step(label, func):
+        start = time.perf_counter()
+        result = func()
+        timings.append((label, time.perf_counter() - start))
+        return result
+
+    step("import tools (langchain, pydantic)", lambda: importlib.import_module("tools"))
+    step("import agent (langchain.agents, langgraph)", lambda: importlib.import_module("agent"))
+    step("create agent graph", lambda: build_graph(check_setup()))
+    step("load inventory (first search)", sys.modules["tools"].get_inventory)
+
+    table = Table(title="Startup profile")
+    table.add_column("Step")
+    table.add_column("Seconds", justify="right")
+    for label, seconds in timings:
+        table.add_row(label, f"{seconds:.3f}")
+        if label == "create agent graph":
+            # Model client and retriever are set up concurrently
+            for sub_label, sub_seconds in sys.modules["agent"].STARTUP_TIMINGS.items():
+                table.add_row(f"  {sub_label}", f"{sub_seconds:.3f}")
+    table.add_row("total", f"{sum(seconds for _, seconds in timings):.3f}")
+    console.print(table)
 
 
 def main():
     """Main CLI loop."""
+    parser = argparse.ArgumentParser(description="Travel Booking Assistant")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print an import/initialization time breakdown and exit"
+    )
+    parser.add_argument(
+        "--session",
+        help="Resume the conversation with this session ID"
+    )
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        profile_startup()
+        return
+
     console.print(Panel.fit(
         "Travel Booking Assistant\n"
         "I can help you search for flights, hotels, and answer travel questions.\n"
         "Type 'exit' or 'quit' to leave.",
     ))
 
-    if not check_setup():
-        sys.exit(1)
+    kb_process = check_setup()
 
     if os.getenv("LANGCHAIN_TRACING_V2") == "true":
         console.print("LangSmith tracing enabled\n")
 
-    graph = create_travel_graph() #outer graph
+    watch_inventory()
+
+    # The graph is built in the background; the first question waits for it
+    executor = ThreadPoolExecutor(max_workers=1)
+    graph_future = executor.submit(build_graph, kb_process) #outer graph
+    graph = None
     state = {"messages": []}
+    # Identifies the conversation: its checkpoints are saved under it, and
+    # repeated bookings in it are deduplicated
+    session_id = args.session or uuid.uuid4().hex
+    config = {"configurable": {"thread_id": session_id}}
+    console.print(f"Session: {session_id} (resume with --session {session_id})")
 
     while True:
         try:
@@ -66,17 +154,29 @@ def main():
                 console.print("\nThank you for using Travel Booking Assistant! Safe travels!")
                 break
 
+            if graph is None:
+                if not graph_future.done():
+                    console.print("(Starting up...)")
+                try:
+                    graph = graph_future.result()
+                except Exception as e:
+                    console.print(f"Error: {str(e)}")
+                    sys.exit(1)
+                from agent import run_agent_streaming
+
             response_parts = []
             tool_calls = []
 
             try:
-                for event in run_agent_streaming(graph, user_input, state):
+                for event in run_agent_streaming(graph, user_input, state, config):
                     if event["type"] == "tool_call":
                         tool_calls.append(event)
                         console.print(f"(Using tool: {event['tool']})")
-                    elif event["type"] == "response":
+                    elif event["type"] in ("token", "response"):
+                        if not response_parts:
+                            console.print("Assistant: ", end="")
                         response_parts.append(event["content"])
-                        console.print(f"Assistant: {event['content']}", end="")
+                        console.print(event["content"], end="", markup=False, highlight=False)
 
                 if response_parts:
                     console.print()
@@ -0,0 +1,176 @@
+"""Single-pass PII redaction of the messages the agent's model reads and writes."""
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, List, Optional, Sequence, Tuple
+
+from langchain.agents.middleware import AgentMiddleware, ModelRequest, ModelResponse
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+
+# Every detector in one pattern; the group name labels the replacement
+PII_PATTERN = re.compile(
+    r"(?P<email>\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b)"
+    r"|(?P<credit_card>(?<!\w)\d{4}[\s-]?\d{4}[\s-]?\d{4}[\s-]?\d{4}(?!\w))"
+    # A country code or an area code is required, so bare 7-8 digit runs
+    # and ranges such as "800-1200" are not taken for phone numbers
+    r"|(?P<phone_number>(?<![\w+])(?:\+\d{1,3}[\s.-]?(?:\(?\d{1,4}\)?[\s.-]?)?|\(?\d{2,4}\)?[\s.-]?)"
+    r"\d{3,4}[\s.-]?\d{4}(?!\w))"
+)
+REPLACEMENTS = {name: f"[REDACTED_{name.upper()}]" for name in PII_PATTERN.groupindex}
+
+# Tools whose results carry customer details; other results (knowledge
+# base articles, searches) are passed to the model unchanged
+REDACTED_TOOLS = frozenset({"lookup_booking", "find_customer_bookings", "create_booking"})
+
+
+# Where a match may still be growing at the end of streamed text: the
+# last word (emails) or the last run of digits and separators (phone and
+# card numbers, which may contain spaces)
+_WORD_TAIL = re.compile(r"\S*\Z")
+_NUMBER_TAIL = re.compile(r"[\d\s().+-]*\Z")
+
+
+def redact_text(text: str) -> Optional[str]:
+    """The text with PII replaced by [REDACTED_TYPE], or None if it has none."""
+    redacted, count = PII_PATTERN.subn(lambda match: REPLACEMENTS[match.lastgroup], text)
+    return redacted if count else None
+
+
+def redact_value(value: Any) -> Any:
+    """Strings, also nested in dicts and lists, with PII redacted (e.g. tool call args)."""
+    if isinstance(value, str):
+        return redact_text(value) or value
+    if isinstance(value, dict):
+        return {key: redact_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact_value(item) for item in value]
+    return value
+
+
+class StreamRedactor:
+    """
+    Redacts PII from text that arrives in chunks, such as model tokens.
+
+    The tail that could still turn out to be part of an email, phone or
+    card number is held back until a later chunk ends it, so a match split
+    across chunks is still caught. flush() returns what is held back once
+    the stream ends.
+    """
+
+    def __init__(self):
+        self._pending = ""
+
+    def feed(self, chunk: str) -> str:
+        text = self._pending + chunk
+        cut = min(_WORD_TAIL.search(text).start(), _NUMBER_TAIL.search(text).start())
+        for match in PII_PATTERN.finditer(text):
+            if match.start() < cut < match.end():
+                cut = match.start()
+        self._pending = text[cut:]
+        return redact_text(text[:cut]) or text[:cut]
+
+    def flush(self) -> str:
+        text, self._pending = self._pending, ""
+        return redact_text(text) or text
+
+
+class PIIRedactionMiddleware(AgentMiddleware):
+    """
+    Redacts emails, phone numbers and card numbers for the agent.
+
+    Messages are redacted on their way to the model, so PII from earlier
+    turns never reaches it either. The model's messages and the results
+    of REDACTED_TOOLS are redacted before they are stored. What users see
+    while a reply streams is redacted separately (StreamRedactor for the
+    tokens, redact_value for tool call arguments).
+
+    Results are cached by message ID, up to max_entries messages: each
+    message is scanned once, however often the history is sent again.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        super().__init__()
+        self.max_entries = max_entries
+        # message ID -> (content seen, redacted copy or None if nothing to redact)
+        self._cache: "OrderedDict[str, Tuple[str, Optional[BaseMessage]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"scanned": 0, "cached": 0, "redacted": 0}
+
+    def redact(self, message: BaseMessage, stored: bool = False) -> BaseMessage:
+        """
+        The message with PII redacted. With stored=True the redacted message
+        replaces the original in the state, and gets an ID if it has none.
+        """
+        content = message.content
+        if not isinstance(content, str) or not content:
+            return message
+        if isinstance(message, ToolMessage) and message.name not in REDACTED_TOOLS:
+            return message
+
+        key = message.id
+        if key is not None:
+            with self._lock:
+                cached = self._lookup(message)
+            if cached is not None:
+                self.stats["cached"] += 1
+                return cached
+
+        redacted = redact_text(content)
+        update = {} if redacted is None else {"content": redacted}
+        if stored and key is None:
+            key = update["id"] = str(uuid.uuid4())
+        result = message.model_copy(update=update) if update else message
+        with self._lock:
+            self.stats["scanned"] += 1
+            self.stats["redacted"] += redacted is not None
+            if key is not None:
+                # A stored message is redacted in the state from now on
+                self._cache[key] = (result.content, None) if stored or redacted is None else (content, result)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        return result
+
+    def redact_all(self, messages: Sequence[BaseMessage]) -> List[BaseMessage]:
+        with self._lock:
+            cached = [self._lookup(message) for message in messages]
+            self.stats["cached"] += len(cached) - cached.count(None)
+        return [result or self.redact(message) for result, message in zip(cached, messages)]
+
+    def _lookup(self, message: BaseMessage) -> Optional[BaseMessage]:
+        # The redacted message if this content was seen under its ID; the lock is held
+        entry = self._cache.get(message.id)
+        if entry is None or entry[0] != message.content:
+            return None
+        self._cache.move_to_end(message.id)
+        return entry[1] or message
+
+    def _request(self, request: ModelRequest) -> ModelRequest:
+        return request.override(messages=self.redact_all(request.messages))
+
+    def _response(self, response):
+        if isinstance(response, AIMessage):
+            return self.redact(response, stored=True)
+        return ModelResponse(
+            result=[self.redact(message, stored=True) for message in response.result],
+            structured_response=response.structured_response,
+        )
+
+    def _tool_result(self, result):
+        # Tools may also return a Command, which is passed through
+        if isinstance(result, ToolMessage):
+            return self.redact(result, stored=True)
+        return result
+
+    def wrap_model_call(self, request, handler):
+        return self._response(handler(self._request(request)))
+
+    async def awrap_model_call(self, request, handler):
+        return self._response(await handler(self._request(request)))
+
+    def wrap_tool_call(self, request, handler):
+        return self._tool_result(handler(request))
+
+    async def awrap_tool_call(self, request, handler):
+        return self._tool_result(await handler(request))
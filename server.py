@@ -0,0 +1,296 @@
+"""HTTP server streaming agent turns to many concurrent conversations as Server-Sent Events."""
+import argparse
+import asyncio
+import json
+import os
+import re
+import uuid
+from typing import Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SESSION_PATH = re.compile(r"^/sessions/([A-Za-z0-9_-]{1,64})(/messages)?$")
+MAX_BODY_BYTES = 64 * 1024
+
+
+def _default_graph():
+    from agent import create_answer_cache, create_checkpointer, create_travel_graph
+
+    return create_travel_graph(answer_cache=create_answer_cache(), checkpointer=create_checkpointer())
+
+
+class TravelAgentServer:
+    """
+    ASGI app serving every conversation from one checkpointed graph.
+
+        POST /sessions                  {"session_id": ...}
+        POST /sessions/{id}/messages    {"message": ...} -> text/event-stream
+        GET  /sessions/{id}             {"session_id": ..., "messages": [...]}
+        GET  /health                    load, limits and counters
+
+    A turn streams "tool_call", "token" and "response" events as the agent
+    produces them, then "done" (or "error"). The model client, retriever
+    and caches are shared by all sessions; conversation state lives in the
+    graph's checkpointer, keyed by session ID.
+
+    At most max_concurrency turns run at once. Up to max_queue more wait
+    for a slot, receiving a "queued" event; beyond that requests get 503.
+    A session runs one turn at a time (409 otherwise), and a turn is
+    cancelled when its client disconnects. Only IDs returned by POST
+    /sessions, or with a stored conversation from before a restart, are
+    served; any other ID gets 404.
+    """
+
+    def __init__(
+        self,
+        graph=None,
+        max_concurrency: int = 4,
+        max_queue: int = 64,
+        build_graph: Callable = _default_graph,
+    ):
+        self.graph = graph
+        self.build_graph = build_graph
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._slots = asyncio.Semaphore(max_concurrency)
+        # Turns running or waiting for a slot, counted when admitted
+        self._admitted = 0
+        self._waiting = 0
+        self._running = 0
+        self._busy_sessions = set()
+        self._sessions = set()
+        self.stats = {"turns": 0, "rejected": 0, "conflicts": 0, "errors": 0, "disconnects": 0}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        method, path = scope["method"], scope["path"]
+        if path == "/health" and method == "GET":
+            await _json(send, 200, self.health())
+            return
+        if path == "/sessions" and method == "POST":
+            session_id = uuid.uuid4().hex
+            self._sessions.add(session_id)
+            await _json(send, 201, {"session_id": session_id})
+            return
+        match = SESSION_PATH.match(path)
+        if match is None:
+            await _json(send, 404, {"error": "Not found"})
+            return
+
+        session_id, messages = match.groups()
+        if messages and method == "POST":
+            await self._post_message(session_id, receive, send)
+        elif not messages and method == "GET":
+            await self._get_session(session_id, send)
+        else:
+            await _json(send, 405, {"error": "Method not allowed"})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    if self.graph is None:
+                        # Loads the model client, vector store and checkpointer once for all sessions
+                        self.graph = await asyncio.to_thread(self.build_graph)
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                checkpointer = getattr(self.graph, "checkpointer", None)
+                if hasattr(checkpointer, "close"):
+                    checkpointer.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def health(self) -> Dict:
+        return {
+            "status": "ok" if self.graph is not None else "starting",
+            "running": self._running,
+            "queued": self._waiting,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            **self.stats,
+        }
+
+    async def _known(self, session_id: str) -> bool:
+        """Whether the session was created here, or has a checkpoint from an earlier run."""
+        if session_id in self._sessions:
+            return True
+        state = await self.graph.aget_state({"configurable": {"thread_id": session_id}})
+        if not state.values.get("messages"):
+            return False
+        self._sessions.add(session_id)
+        return True
+
+    async def _get_session(self, session_id: str, send):
+        if self.graph is None:
+            await _starting(send)
+            return
+        if not await self._known(session_id):
+            await _not_found(send, session_id)
+            return
+        state = await self.graph.aget_state({"configurable": {"thread_id": session_id}})
+        roles = {"human": "user", "ai": "assistant"}
+        messages = [
+            {"role": roles[message.type], "content": message.content}
+            for message in state.values.get("messages", [])
+            if message.type in roles and isinstance(message.content, str) and message.content
+        ]
+        await _json(send, 200, {"session_id": session_id, "messages": messages})
+
+    async def _post_message(self, session_id: str, receive, send):
+        body = await _read_body(receive)
+        if body is None:
+            await _json(send, 413, {"error": "Request body too large"})
+            return
+        try:
+            message = json.loads(body)["message"]
+            if not isinstance(message, str) or not message.strip():
+                raise ValueError
+        except (ValueError, KeyError, TypeError):
+            await _json(send, 400, {"error": 'Expected a JSON body {"message": "..."}'})
+            return
+
+        if self.graph is None:
+            await _starting(send)
+            return
+        if not await self._known(session_id):
+            await _not_found(send, session_id)
+            return
+        if session_id in self._busy_sessions:
+            self.stats["conflicts"] += 1
+            await _json(send, 409, {"error": "A turn is already running in this session"})
+            return
+        # Checked and counted before any await, so a burst cannot all pass
+        # the check before the first of its turns is counted
+        if self._admitted >= self.max_concurrency + self.max_queue:
+            self.stats["rejected"] += 1
+            await _json(send, 503, {"error": "Server busy, try again shortly"}, [(b"retry-after", b"1")])
+            return
+
+        self._admitted += 1
+        self._busy_sessions.add(session_id)
+        client_gone = False
+        try:
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                ],
+            })
+            turn = asyncio.ensure_future(self._turn(session_id, message.strip(), send))
+            disconnect = asyncio.ensure_future(_disconnected(receive))
+            done, _ = await asyncio.wait({turn, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+            client_gone = disconnect in done
+            if client_gone:
+                # Frees the slot for clients that are still listening
+                self.stats["disconnects"] += 1
+                turn.cancel()
+            else:
+                disconnect.cancel()
+            await asyncio.gather(turn, disconnect, return_exceptions=True)
+        finally:
+            self._admitted -= 1
+            self._busy_sessions.discard(session_id)
+        if not client_gone:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def _turn(self, session_id: str, message: str, send):
+        from agent import arun_agent_streaming
+
+        if self._slots.locked():
+            self._waiting += 1
+            await _event(send, "queued", {"queued": self._waiting})
+            try:
+                await self._slots.acquire()
+            finally:
+                self._waiting -= 1
+        else:
+            await self._slots.acquire()
+        self._running += 1
+        try:
+            config = {"configurable": {"thread_id": session_id}}
+            async for event in arun_agent_streaming(self.graph, message, {"messages": []}, config):
+                await _event(send, event.pop("type"), event)
+            self.stats["turns"] += 1
+            await _event(send, "done", {"session_id": session_id})
+        except Exception as e:
+            self.stats["errors"] += 1
+            await _event(send, "error", {"error": str(e)})
+        finally:
+            self._running -= 1
+            self._slots.release()
+
+
+async def _read_body(receive) -> Optional[bytes]:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if len(body) > MAX_BODY_BYTES:
+            return None
+        if not message.get("more_body"):
+            return body
+
+
+async def _disconnected(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _starting(send):
+    await _json(send, 503, {"error": "Server starting, try again shortly", "status": "starting"},
+                [(b"retry-after", b"1")])
+
+
+async def _not_found(send, session_id: str):
+    await _json(send, 404, {"error": f"Session {session_id} not found"})
+
+
+async def _json(send, status: int, payload: Dict, headers=()):
+    body = json.dumps(payload).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), *headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _event(send, name: str, data: Dict):
+    payload = f"event: {name}\ndata: {json.dumps(data, default=str)}\n\n".encode()
+    await send({"type": "http.response.body", "body": payload, "more_body": True})
+
+
+def create_app(**kwargs) -> TravelAgentServer:
+    """The server with limits from SERVER_MAX_CONCURRENCY and SERVER_MAX_QUEUE."""
+    kwargs.setdefault("max_concurrency", int(os.getenv("SERVER_MAX_CONCURRENCY", "4")))
+    kwargs.setdefault("max_queue", int(os.getenv("SERVER_MAX_QUEUE", "64")))
+    return TravelAgentServer(**kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Travel Booking Assistant HTTP server")
+    parser.add_argument("--host", default=os.getenv("SERVER_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("SERVER_PORT", "8000")))
+    args = parser.parse_args()
+
+    import uvicorn
+
+    uvicorn.run(create_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -35,6 +35,10 @@ def run():
     ensure_venv()
     run_subprocess([str(venv_python()), "main.py"])
 
+def serve():
+    ensure_venv()
+    run_subprocess([str(venv_python()), "server.py"])
+
 def eval_agent():
     ensure_venv()
     run_subprocess([str(venv_python()), "-m", "eval.eval"])
@@ -62,8 +66,9 @@ def clean():
 def help_message():
     print("""Travel Booking Agent - Python Script Commands
 
-  setup      - Initialize knowledge base
+  setup      - Initialize or update the knowledge base
   run        - Run the CLI agent
+  serve      - Run the HTTP server
   eval       - Run evaluation suite
   clean      - Clean generated files
   help       - Show this help message
@@ -74,12 +79,13 @@ Local Models:
 
 def main():
     parser = argparse.ArgumentParser(description="Travel Booking Agent commands")
-    parser.add_argument("command", help="Command to run", choices=["setup", "run", "eval", "clean", "help"])
+    parser.add_argument("command", help="Command to run", choices=["setup", "run", "serve", "eval", "clean", "help"])
     args = parser.parse_args()
 
     commands = {
         "setup": setup,
         "run": run,
+        "serve": serve,
         "eval": eval_agent,
         "clean": clean,
         "help": help_message
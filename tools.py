@@ -1,19 +1,185 @@
 """Travel booking tools for the agent."""
+import asyncio
+import contextvars
+import functools
 import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-from data.generate_flights import FLIGHTS_DF
-from data.generate_hotels import HOTELS_DF
 from typing import List, Dict, Optional
 from datetime import datetime
-import requests
+from pathlib import Path
 from langchain.tools import tool
+from langchain_core.runnables import RunnableConfig
 from pydantic import BaseModel, Field
 
-from data.weather_data import CITY_COORDS, WEATHER_MAPPING
+# Indexes are built from the memory-mapped inventory files (or the demo data
+# when none were generated) and hot-swapped as immutable snapshots; each
+# search reads one snapshot for its whole duration. The loader (and pandas,
+# NumPy and Arrow with it) is only imported on the first search.
+INVENTORY = None
+_inventory_lock = threading.Lock()
 
-# Mock database for bookings
-BOOKINGS_DB: Dict[str, Dict] = {}
-FLIGHTS_DB: List[Dict] = []
+
+def get_inventory():
+    """Return the shared InventoryLoader, loading and watching it on first use."""
+    global INVENTORY
+    if INVENTORY is None:
+        with _inventory_lock:
+            if INVENTORY is None:
+                from data.inventory_store import InventoryLoader
+                loader = InventoryLoader()
+                loader.start_watching()
+                INVENTORY = loader
+    return INVENTORY
+
+
+def reload_inventory():
+    """Reload the inventory in the background if it has been loaded."""
+    if INVENTORY is not None:
+        INVENTORY.request_reload()
+
+
+# Bookings persist in a SQLite database (BOOKINGS_DB_PATH) shared by every
+# agent process
+BOOKING_STORE = None
+_booking_lock = threading.Lock()
+
+
+def get_booking_store():
+    """Return the shared BookingStore, opening the database on first use."""
+    global BOOKING_STORE
+    if BOOKING_STORE is None:
+        with _booking_lock:
+            if BOOKING_STORE is None:
+                from data.booking_store import BookingStore
+                BOOKING_STORE = BookingStore()
+    return BOOKING_STORE
+
+
+def _inventory_capacity(key) -> int:
+    """Seats of a dated flight or rooms of a hotel; ValueError if it is not in the inventory."""
+    kind, resource_id, day = key
+    inventory = get_inventory().current
+    if kind == "flight":
+        capacity = inventory.flights.seats(resource_id, day)
+        if capacity is None:
+            raise ValueError(f"Flight {resource_id} does not operate on {day}")
+    else:
+        capacity = inventory.hotels.rooms(resource_id)
+        if capacity is None:
+            raise ValueError(f"Unknown hotel {resource_id}")
+    return capacity
+
+
+# Seats per dated flight and rooms per hotel night, held while a booking is
+# written and confirmed once it is stored
+LEDGER = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger():
+    """Return the shared InventoryLedger, creating it on first use."""
+    global LEDGER
+    if LEDGER is None:
+        with _ledger_lock:
+            if LEDGER is None:
+                from data.inventory_ledger import InventoryLedger
+                store = get_booking_store()
+                # What is left after stored bookings, from every process
+                LEDGER = InventoryLedger(capacity=lambda key: _inventory_capacity(key) - store.reserved(*key))
+    return LEDGER
+
+
+# A booking repeated with the same idempotency key (a retried tool call, or
+# the model booking the same items for the same customer twice in one
+# conversation) returns the first confirmation instead of booking again.
+# Calls with no conversation ID and no explicit key are not deduplicated
+IDEMPOTENCY = None
+_idempotency_lock = threading.Lock()
+
+
+def get_idempotency_index():
+    """Return the shared IdempotencyIndex, creating it on first use."""
+    global IDEMPOTENCY
+    if IDEMPOTENCY is None:
+        with _idempotency_lock:
+            if IDEMPOTENCY is None:
+                from data.booking_store import IdempotencyIndex
+                IDEMPOTENCY = IdempotencyIndex(
+                    ttl=float(os.getenv("BOOKING_DEDUP_TTL", "3600")),
+                    max_entries=int(os.getenv("BOOKING_DEDUP_MAX_ENTRIES", "10000")),
+                )
+    return IDEMPOTENCY
+
+
+def _redacted(booking: Dict) -> Dict:
+    # Redact email for privacy
+    return {**booking, "customer_email": "***@***.***"}
+
+
+def _table(rows: List[Dict], columns: List[str]) -> Dict:
+    """
+    Encode result rows for the model as a header and value rows. Values
+    shared by every row are given once in "shared" instead of per row.
+    """
+    shared = {
+        column: rows[0][column] for column in columns
+        if len(rows) > 1 and all(row[column] == rows[0][column] for row in rows)
+    }
+    header = [column for column in columns if column not in shared]
+    table = {"columns": header, "rows": [[row[column] for column in header] for row in rows]}
+    return {"shared": shared, **table} if shared else table
+
+
+def _itinerary_row(itinerary: Dict) -> Dict:
+    legs = itinerary["legs"]
+    departure_date, departure_time = itinerary["departure"].split(" ")
+    arrival_date, arrival_time = itinerary["arrival"].split(" ")
+    days = (datetime.fromisoformat(arrival_date) - datetime.fromisoformat(departure_date)).days
+    return {
+        "flights": "+".join(leg["flight_id"] for leg in legs),
+        "airline": "/".join(dict.fromkeys(leg["airline"] for leg in legs)),
+        "date": departure_date,
+        "depart": departure_time,
+        "arrive": f"{arrival_time}+{days}" if days else arrival_time,
+        "duration": itinerary["total_duration"],
+        "stops": itinerary["stops"],
+        "via": ", ".join(itinerary["layovers"]),
+        "class": "/".join(dict.fromkeys(leg["class"] for leg in legs)),
+        "price": itinerary["price"],
+        "total_price": itinerary["total_price"],
+    }
+
+
+ITINERARY_COLUMNS = ["flights", "airline", "date", "depart", "arrive", "duration", "stops", "via", "class", "price"]
+HOTEL_COLUMNS = ["hotel_id", "name", "rating", "price_per_night", "total_price", "amenities"]
+
+
+# Forecasts are cached for WEATHER_CACHE_TTL seconds, and also on disk when
+# WEATHER_CACHE_PATH is set; the client reuses pooled HTTP connections and
+# falls back to climate normals while the API is failing
+WEATHER_CLIENT = None
+_weather_lock = threading.Lock()
+
+
+def get_weather_client():
+    """Return the shared WeatherClient, creating it on first use."""
+    global WEATHER_CLIENT
+    if WEATHER_CLIENT is None:
+        with _weather_lock:
+            if WEATHER_CLIENT is None:
+                from data.weather_client import ForecastCache, WeatherClient
+                cache_path = os.getenv("WEATHER_CACHE_PATH")
+                WEATHER_CLIENT = WeatherClient(
+                    cache=ForecastCache(
+                        ttl=float(os.getenv("WEATHER_CACHE_TTL", "3600")),
+                        path=Path(cache_path) if cache_path else None,
+                    ),
+                    hedge=os.getenv("WEATHER_HEDGE") == "true",
+                )
+    return WEATHER_CLIENT
 
 
 class FlightSearchParams(BaseModel):
@@ -23,6 +189,9 @@ class FlightSearchParams(BaseModel):
     departure_date: str = Field(description="Departure date in YYYY-MM-DD format")
     return_date: Optional[str] = Field(None, description="Return date in YYYY-MM-DD format (optional)")
     passengers: int = Field(1, description="Number of passengers")
+    sort_by: str = Field("price", description="Rank itineraries by 'price' or 'duration'")
+    limit: int = Field(3, description="Maximum number of itineraries to return per direction")
+    offset: int = Field(0, description="Number of ranked itineraries to skip, to see more options")
 
 @tool
 def search_flights(
@@ -30,10 +199,13 @@ def search_flights(
     destination: str,
     departure_date: str,
     return_date: Optional[str] = None,
-    passengers: int = 1
+    passengers: int = 1,
+    sort_by: str = "price",
+    limit: int = 3,
+    offset: int = 0
 ) -> str:
     """
-    Search for available flights between two cities.
+    Search for flight itineraries between two airports, including connections.
     
     Args:
         origin: Origin airport code (e.g., JFK, LAX, SFO)
@@ -41,53 +213,71 @@ def search_flights(
         departure_date: Departure date in YYYY-MM-DD format
         return_date: Optional return date for round trips
         passengers: Number of passengers
+        sort_by: Rank itineraries by "price" or "duration"
+        limit: Maximum number of itineraries to return per direction
+        offset: Number of ranked itineraries to skip, to see more options
     
     Returns:
-        JSON string with available flight options
-    """
-    df = FLIGHTS_DF[
-        (FLIGHTS_DF["origin"].str.upper() == origin.upper()) &
-        (FLIGHTS_DF["destination"].str.upper() == destination.upper())
-        ]
-
-    flights = []
-    for _, row in df.iterrows():
-        flights.append({
-            "flight_id": row["flight_id"],
-            "airline": row["airline"],
-            "origin": row["origin"],
-            "destination": row["destination"],
-            "departure_time": row["departure_time"],
-            "arrival_time": row["arrival_time"],
-            "duration": row["duration"],
-            "price": row["price"],
-            "stops": row["stops"],
-            "class": row["class"],
-            "departure_date": departure_date,
-        })
+        JSON tables of the best outbound (and return) itineraries; "next_offset"
+        is set when more are available
+    """
+    limit = max(1, min(limit, 20))
+    offset = max(0, offset)
+    routes = get_inventory().current.routes
+    try:
+        # One itinerary past the page tells whether there are more
+        outbound = routes.find_itineraries(origin, destination, departure_date, k=offset + limit + 1, sort_by=sort_by)
+        inbound = (
+            routes.find_itineraries(destination, origin, return_date, k=offset + limit + 1, sort_by=sort_by)
+            if return_date else []
+        )
+    except ValueError as e:
+        return json.dumps({"error": str(e)})
+
+    more = len(outbound) > offset + limit or len(inbound) > offset + limit
+    columns = ITINERARY_COLUMNS + (["total_price"] if passengers > 1 else [])
+    result = {}
+    for direction, itineraries in (("itineraries", outbound), ("return_itineraries", inbound)):
+        page = itineraries[offset:offset + limit]
+        for itinerary in page:
+            itinerary["total_price"] = itinerary["price"] * passengers
+        if page or direction == "itineraries":
+            result[direction] = _table([_itinerary_row(itinerary) for itinerary in page], columns)
+
+    if more:
+        result["next_offset"] = offset + limit
+    return json.dumps(result, separators=(",", ":"))
+
+class FareCalendarInput(BaseModel):
+    origin: str = Field(..., description="Origin airport code (e.g., JFK, LAX)")
+    destination: str = Field(..., description="Destination airport code (e.g., LHR, CDG)")
+    date: str = Field(..., description="Preferred departure date in YYYY-MM-DD format")
+    window_days: int = Field(3, description="Number of days before and after the date to include")
+
+@tool("search_fare_calendar", args_schema=FareCalendarInput)
+def search_fare_calendar(origin: str, destination: str, date: str, window_days: int = 3) -> str:
+    """
+    Find the cheapest fare for each day around a preferred departure date.
 
-    if return_date:
-        # For simplicity, mirror flights back as return flights
-        return_flights = []
-        for f in flights[:2]:
-            return_flights.append({
-                **f,
-                "flight_id": f["flight_id"].replace("FL", "FLR"),
-                "origin": f["destination"],
-                "destination": f["origin"],
-                "departure_date": return_date
-            })
-        flights.extend(return_flights)
+    Use this when the customer's travel dates are flexible instead of
+    searching flights one day at a time.
+
+    Returns a JSON string with one entry per day that has departures.
+    """
+    window_days = max(0, min(window_days, 30))
+    try:
+        calendar = get_inventory().current.flights.fare_calendar(origin, destination, date, window_days)
+    except ValueError as e:
+        return json.dumps({"error": str(e)})
 
     return json.dumps({
-        "flights": flights,
-        "total_options": len(flights),
+        "calendar": calendar,
+        "cheapest": min(calendar, key=lambda d: d["cheapest_price"]) if calendar else None,
         "search_params": {
             "origin": origin,
             "destination": destination,
-            "departure_date": departure_date,
-            "return_date": return_date,
-            "passengers": passengers
+            "date": date,
+            "window_days": window_days
         }
     })
 
@@ -97,31 +287,64 @@ class HotelSearchInput(BaseModel):
     check_out: str = Field(..., description="Check-out date YYYY-MM-DD")
     guests: int = Field(1)
     rooms: int = Field(1)
+    max_price: Optional[float] = Field(None, description="Maximum price per night in USD")
+    min_rating: Optional[float] = Field(None, description="Minimum star rating (e.g., 4.5)")
+    required_amenities: Optional[List[str]] = Field(None, description="Amenities the hotel must have (e.g., ['Pool', 'Gym'])")
+    sort_by: str = Field("price", description="Rank by 'price', 'rating' or 'value'")
+    limit: int = Field(3, description="Maximum number of hotels to return")
+    offset: int = Field(0, description="Number of ranked hotels to skip, to see more options")
 
 @tool("search_hotels", args_schema=HotelSearchInput)
-def search_hotels(city: str, check_in: str, check_out: str, guests: int = 1, rooms: int = 1) -> str:
-    """
-    Search for available hotels in a city using dataframe.
-
-    Returns a JSON string with hotel options.
-    """
-
-    df = HOTELS_DF[HOTELS_DF["city"].str.lower() == city.lower()]
-    hotels = []
-    for _, row in df.iterrows():
-        hotels.append({
-            "hotel_id": row["hotel_id"],
-            "name": row["name"],
-            "city": row["city"],
-            "rating": row["rating"],
-            "price_per_night": row["price_per_night"],
-            "amenities": row["amenities"].split(","),
-            "check_in": check_in,
-            "check_out": check_out,
-            "guests": guests,
-            "rooms": rooms,
-        })
-    return json.dumps({"hotels": hotels, "total_options": len(hotels)})
+def search_hotels(
+    city: str,
+    check_in: str,
+    check_out: str,
+    guests: int = 1,
+    rooms: int = 1,
+    max_price: Optional[float] = None,
+    min_rating: Optional[float] = None,
+    required_amenities: Optional[List[str]] = None,
+    sort_by: str = "price",
+    limit: int = 3,
+    offset: int = 0
+) -> str:
+    """
+    Search for available hotels in a city, with optional price, rating and
+    amenity filters.
+
+    Returns a JSON table of the top hotel options; "next_offset" is set
+    when more are available.
+    """
+    limit = max(1, min(limit, 20))
+    offset = max(0, offset)
+    try:
+        nights = (datetime.fromisoformat(check_out) - datetime.fromisoformat(check_in)).days
+        if nights < 1:
+            raise ValueError("check_out must be after check_in.")
+        hotels, total = get_inventory().current.hotels.search(
+            city,
+            max_price=max_price,
+            min_rating=min_rating,
+            required_amenities=required_amenities,
+            sort_by=sort_by,
+            limit=offset + limit,
+        )
+    except ValueError as e:
+        return json.dumps({"error": str(e)})
+
+    hotels = hotels[offset:]
+    for hotel in hotels:
+        hotel["total_price"] = hotel["price_per_night"] * nights * rooms
+        hotel["amenities"] = ", ".join(hotel["amenities"])
+
+    result = {
+        "hotels": _table(hotels, HOTEL_COLUMNS),
+        "total_options": total,
+        "nights": nights,
+    }
+    if total > offset + limit:
+        result["next_offset"] = offset + limit
+    return json.dumps(result, separators=(",", ":"))
 
 
 @tool
@@ -130,45 +353,110 @@ def create_booking(
     items: str,
     customer_name: str,
     customer_email: str,
-    total_price: float
+    total_price: float,
+    idempotency_key: Optional[str] = None,
+    config: RunnableConfig = None,
 ) -> str:
     """
     Create a new travel booking.
     
     Args:
         booking_type: Type of booking (flight, hotel, package)
-        items: JSON string of items being booked (flight IDs, hotel IDs, etc.)
+        items: JSON string of items being booked. Flights need flight_id,
+            departure_date and passengers; hotels need hotel_id, check_in,
+            check_out and rooms, so seats and rooms can be reserved
         customer_name: Customer full name
         customer_email: Customer email address
         total_price: Total booking price in USD
+        idempotency_key: Optional key identifying this booking request;
+            repeating it returns the original confirmation. Derived from the
+            conversation, items and customer when omitted; without either,
+            repeated bookings are not deduplicated
     
     Returns:
         Booking confirmation with booking ID
     """
-    import json
+    from data.booking_store import idempotency_key as derive_key
+
+    try:
+        parsed_items = json.loads(items) if isinstance(items, str) else items
+    except json.JSONDecodeError as e:
+        return json.dumps({"error": f"Invalid items JSON: {e}"})
+
+    if not idempotency_key:
+        thread_id = ((config or {}).get("configurable") or {}).get("thread_id")
+        if not thread_id:
+            # Without a conversation to scope the key, identical bookings from
+            # unrelated callers would be merged into one
+            return json.dumps(_book(booking_type, parsed_items, customer_name, customer_email, total_price))
+        idempotency_key = derive_key(thread_id, booking_type, parsed_items, customer_email, customer_name)
+
+    result, duplicates = get_idempotency_index().run(
+        idempotency_key,
+        lambda: _book(booking_type, parsed_items, customer_name, customer_email, total_price),
+    )
+    if duplicates:
+        result = {**result, "duplicate": True, "duplicates_suppressed": duplicates}
+    return json.dumps(result)
+
+
+def _book(booking_type: str, items, customer_name: str, customer_email: str, total_price: float) -> Dict:
+    import sqlite3
     import uuid
-    
-    booking_id = f"BK{str(uuid.uuid4())[:8].upper()}"
-    
+    from data.inventory_ledger import HoldExpired, SoldOut, reservation_quantities
+
     booking = {
-        "booking_id": booking_id,
         "booking_type": booking_type,
-        "items": json.loads(items) if isinstance(items, str) else items,
+        "items": items,
         "customer_name": customer_name,
         "customer_email": customer_email,
         "total_price": total_price,
         "status": "confirmed",
         "created_at": datetime.now().isoformat()
     }
-    
-    BOOKINGS_DB[booking_id] = booking
-    
-    return json.dumps({
+
+    # Hold the seats/rooms first so concurrent bookings in this process
+    # cannot oversell; the store checks capacity again as it commits, which
+    # covers other processes sharing the database
+    try:
+        quantities = reservation_quantities(booking["items"])
+        capacities = {key: _inventory_capacity(key) for key in quantities}
+        ledger = get_ledger()
+        hold_id = ledger.hold(quantities)
+    except (SoldOut, ValueError) as e:
+        return {"error": str(e)}
+
+    booking_id = None
+    try:
+        # Short IDs can collide once there are millions of bookings
+        for _ in range(5):
+            candidate = f"BK{str(uuid.uuid4())[:8].upper()}"
+            try:
+                get_booking_store().add({"booking_id": candidate, **booking}, quantities, capacities)
+            except sqlite3.IntegrityError:
+                continue
+            except SoldOut as e:
+                return {"error": str(e)}
+            booking_id = candidate
+            break
+    finally:
+        if booking_id is None:
+            ledger.release(hold_id)
+    if booking_id is None:
+        return {"error": "Could not allocate a booking ID, please try again."}
+    try:
+        ledger.confirm(hold_id)
+    except HoldExpired:
+        # The hold lapsed while the booking was written, but the store's
+        # capacity check passed, so the booking stands
+        pass
+
+    return {
         "booking_id": booking_id,
         "status": "confirmed",
         "message": f"Booking {booking_id} has been confirmed. Confirmation email sent to {customer_email}.",
         "total_price": total_price
-    })
+    }
 
 
 @tool
@@ -182,13 +470,9 @@ def lookup_booking(booking_id: str) -> str:
     Returns:
         Booking details or error message
     """
-    import json
-    
-    if booking_id in BOOKINGS_DB:
-        booking = BOOKINGS_DB[booking_id].copy()
-        # Redact email for privacy
-        booking["customer_email"] = "***@***.***"
-        return json.dumps(booking)
+    booking = get_booking_store().get(booking_id)
+    if booking is not None:
+        return json.dumps(_redacted(booking))
     else:
         return json.dumps({
             "error": "Booking not found",
@@ -196,45 +480,87 @@ def lookup_booking(booking_id: str) -> str:
         })
 
 
+@tool
+def find_customer_bookings(customer_name: str, booking_id: str, limit: int = 10) -> str:
+    """
+    Find a customer's bookings, most recent first.
+
+    The customer must give one of their booking IDs as well as their name;
+    a name alone is not enough to list someone's bookings.
+
+    Args:
+        customer_name: Customer full name
+        booking_id: ID of any one of the customer's bookings
+        limit: Maximum number of bookings to return
+
+    Returns:
+        JSON string with the customer's bookings
+    """
+    store = get_booking_store()
+    booking = store.get(booking_id)
+    if booking is None or booking["customer_name"].strip().lower() != customer_name.strip().lower():
+        return json.dumps({
+            "error": "No booking with this ID for this customer",
+            "booking_id": booking_id,
+            "customer": customer_name
+        })
+    # The verified booking's email identifies the customer; names are not unique
+    customer = booking["customer_email"]
+    limit = max(1, min(limit, 50))
+    bookings = store.find_by_customer(customer, limit)
+    return json.dumps({
+        "bookings": [_redacted(b) for b in bookings],
+        "total_bookings": store.count_by_customer(customer) if len(bookings) == limit else len(bookings),
+        "customer": customer_name
+    })
+
+
 class WeatherInput(BaseModel):
     city: str = Field(..., description="City name")
     date: str = Field(..., description="Date in YYYY-MM-DD format")
+    end_date: Optional[str] = Field(None, description="Last date of a multi-day forecast in YYYY-MM-DD format (optional)")
 
 @tool("get_weather_forecast", args_schema=WeatherInput)
-def get_weather_forecast(city: str, date: str) -> str:
+def get_weather_forecast(city: str, date: str, end_date: Optional[str] = None) -> str:
     """
     Get weather forecast for a destination city and date using Open-Meteo API.
+
+    Pass end_date to get every day of a trip in one call.
     """
-    if city not in CITY_COORDS:
-        return json.dumps({"error": f"City '{city}' is not supported."})
+    from data.weather_client import WeatherError
 
-    lat, lon = CITY_COORDS[city]
+    client = get_weather_client()
+    try:
+        if end_date:
+            return json.dumps({"city": city, "forecasts": client.forecast_range(city, date, end_date)})
+        return json.dumps(client.forecast(city, date))
+    except WeatherError as e:
+        return json.dumps({"error": str(e)})
+
+
+# Tool calls from one model message run concurrently, at most
+# MAX_TOOL_CONCURRENCY at a time. The tools block (mmap index searches, HTTP
+# with retries, the booking store), so their async implementations run the
+# sync ones on this bounded pool instead of the event loop's default executor.
+MAX_TOOL_CONCURRENCY = int(os.getenv("MAX_TOOL_CONCURRENCY", "8"))
+_tool_executor = ThreadPoolExecutor(max_workers=MAX_TOOL_CONCURRENCY, thread_name_prefix="tool")
+
+
+def run_blocking(func):
+    """Wrap a blocking function as a coroutine that runs on the tool pool."""
+    # wraps keeps the signature, so injected arguments such as config are
+    # still passed to the coroutine
+    @functools.wraps(func)
+    async def coroutine(*args, **kwargs):
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            _tool_executor, functools.partial(context.run, func, *args, **kwargs)
+        )
+    return coroutine
 
-    params = {
-        "latitude": lat,
-        "longitude": lon,
-        "daily": "temperature_2m_max,temperature_2m_min,precipitation_sum,weathercode",
-        "timezone": "auto",
-        "start_date": date,
-        "end_date": date
-    }
-    response = requests.get("https://api.open-meteo.com/v1/forecast", params=params)
-    if response.status_code != 200:
-        return json.dumps({"error": "Weather API request failed."})
-
-    data = response.json()
-    if "daily" not in data or not data["daily"]["temperature_2m_max"]:
-        return json.dumps({"error": "No forecast available for this date."})
-
-    weather_code = data["daily"]["weathercode"][0]
-
-    forecast = {
-        "city": city,
-        "date": date,
-        "temp_max": f"{data['daily']['temperature_2m_max'][0]}°C",
-        "temp_min": f"{data['daily']['temperature_2m_min'][0]}°C",
-        "precipitation_mm": data['daily']['precipitation_sum'][0],
-        "condition": WEATHER_MAPPING.get(weather_code, "Unknown")
-    }
 
-    return json.dumps(forecast)
\ No newline at end of file
+for _tool in (
+    search_flights, search_fare_calendar, search_hotels,
+    create_booking, lookup_booking, find_customer_bookings, get_weather_forecast,
+):
+    _tool.coroutine = run_blocking(_tool.func)